@@ -36,6 +36,7 @@ OLLAMA_HTTP="http://127.0.0.1:11434"
 # Models
 MODEL_3B="${MODEL_3B:-llama3.2:3b}"  # Correct default model name for Llama 3.2 3B
 MODEL_7B="${MODEL_7B:-mistral:7b}"  # Correct default model name for Mistral 7B
+MODEL_CLASSIFY="${MODEL_CLASSIFY:-qwen2.5:0.5b-instruct}"  # Small model used for email category routing
 
 # Flags
 FORCE_YES="${FORCE_YES:-no}"
@@ -890,6 +891,13 @@ if [[ "$SKIP_MODEL_PULL" != "yes" ]]; then
       log "Successfully pulled Mistral 7B model: $MODEL_7B."
     fi
     
+    log "Pulling email classifier model ($MODEL_CLASSIFY)..."
+    if ! ollama pull "$MODEL_CLASSIFY"; then
+      err "Failed to pull email classifier model: $MODEL_CLASSIFY. Email categorization will not work until it is pulled."
+    else
+      log "Successfully pulled email classifier model: $MODEL_CLASSIFY."
+    fi
+    
     # List models for verification
     try ollama list || log "Warning: Unable to verify pulled models with 'ollama list'."
   fi
@@ -103,6 +103,8 @@ ollama serve > /dev/null 2>&1 &
 sleep 5
 echo "   Downloading AI model (~4GB, may take 5-10 minutes)..."
 ollama pull qwen2.5:7b-instruct
+echo "   Downloading email classifier model (~400MB)..."
+ollama pull qwen2.5:0.5b-instruct
 
 echo ""
 echo "📁 Step 7/8: Creating data directories..."
@@ -7,6 +7,7 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 import json
+from collections import Counter
 from pathlib import Path
 from typing import Optional, Any, Dict, List
 
@@ -393,16 +394,14 @@ async def categorize_emails(request: CategorizeRequest):
     try:
         categorized = spam_detector.batch_categorize(request.emails)
         
-        spam_count = sum(1 for e in categorized if e.get("category") == "spam")
-        keep_count = sum(1 for e in categorized if e.get("category") == "keep")
-        unsure_count = sum(1 for e in categorized if e.get("category") == "unsure")
+        counts = Counter(e.get("category") for e in categorized)
         
         return {
             "success": True,
             "total": len(categorized),
-            "spam_count": spam_count,
-            "keep_count": keep_count,
-            "unsure_count": unsure_count,
+            "spam_count": counts["spam"],
+            "keep_count": counts["keep"],
+            "unsure_count": counts["unsure"],
             "emails": categorized
         }
     except Exception as e:
@@ -598,12 +597,12 @@ async def chat_with_agent(request: ChatRequest):
         
         if request.reset:
             agent.reset_conversation()
-            if conversation_memory: conversation_memory.store_conversation(user_id, session_id, "system", "Conversation reset")
+            if conversation_memory: conversation_memory.store_conversation_async(user_id, session_id, "system", "Conversation reset")
             return {"status": "success", "message": "Conversation reset. How can I help you?", "session_id": session_id}
         
-        if conversation_memory: conversation_memory.store_conversation(user_id, session_id, "user", request.message)
+        if conversation_memory: conversation_memory.store_conversation_async(user_id, session_id, "user", request.message)
         result = await agent.chat(request.message)
-        if conversation_memory: conversation_memory.store_conversation(user_id, session_id, "assistant", result.get("response", ""), function_calls=result.get("function_calls"))
+        if conversation_memory: conversation_memory.store_conversation_async(user_id, session_id, "assistant", result.get("response", ""), function_calls=result.get("function_calls"))
         
         return {"status": "success", "session_id": session_id, **result}
     except Exception as e:
@@ -701,12 +700,12 @@ async def assistant_command(request: AssistantCommandRequest):
         if hasattr(request, 'reset') and request.reset:
             agent.reset_conversation()
             if conversation_memory:
-                conversation_memory.store_conversation(user_id, session_id, "system", "Conversation reset")
+                conversation_memory.store_conversation_async(user_id, session_id, "system", "Conversation reset")
             return {"status": "success", "message": "Conversation reset", "session_id": session_id}
 
         # Store user message
         if conversation_memory:
-            conversation_memory.store_conversation(user_id, session_id, "user", request.command)
+            conversation_memory.store_conversation_async(user_id, session_id, "user", request.command)
 
         # Process request
         if request.attachment:
@@ -716,7 +715,7 @@ async def assistant_command(request: AssistantCommandRequest):
 
         # Store assistant response
         if conversation_memory:
-            conversation_memory.store_conversation(
+            conversation_memory.store_conversation_async(
                 user_id, session_id, "assistant",
                 result.get("response", ""),
                 function_calls=result.get("function_calls")
@@ -738,6 +737,15 @@ from server.managers.email_manager import EmailManager
 
 email_manager_instance = EmailManager()
 
+@app.on_event("shutdown")
+async def close_email_connections():
+    """Log out of pooled IMAP/SMTP connections"""
+    for mgr in (email_manager_instance, assistant_functions.email_mgr):
+        try:
+            mgr.close()
+        except Exception as e:
+            logger.error(f"Error closing email connections: {e}")
+
 @app.get("/api/drafts/pending", dependencies=[Depends(verify_key)])
 async def get_pending_drafts():
     """Get all pending email drafts"""
@@ -11,12 +11,13 @@ from email import message_from_bytes
 
 from imapclient import IMAPClient
 
-from server.security.credential_vault import CredentialVault
+from server.connectors.base import BaseEmailConnector, IMAPClientFolderMixin, PREVIEW_FETCH_ITEMS, attachment_names
+from server.security.credential_vault import CredentialVault, get_vault
 
 logger = logging.getLogger("apple_connector")
 
 
-class AppleConnector:
+class AppleConnector(IMAPClientFolderMixin, BaseEmailConnector):
     """Apple iCloud email connector using IMAP/SMTP"""
     
     # Apple iCloud server settings
@@ -25,16 +26,19 @@ class AppleConnector:
     SMTP_SERVER = "smtp.mail.me.com"
     SMTP_PORT = 587
     
-    def __init__(self, account_id: str):
+    def __init__(self, account_id: str, vault: Optional[CredentialVault] = None):
         """
         Initialize Apple connector
         
         Args:
             account_id: Account identifier for credential lookup
+            vault: Credential vault (defaults to the shared get_vault() instance)
         """
         self.account_id = account_id
-        self.vault = CredentialVault()
+        self.vault = vault or get_vault()
         self.imap = None
+        # Folder names from LIST, cached per connection (see list_folders)
+        self._folders: Optional[List[str]] = None
         self.email_address = None
         self.app_password = None
         
@@ -63,6 +67,7 @@ class AppleConnector:
             
             # Connect to IMAP
             self.imap = IMAPClient(self.IMAP_SERVER, port=self.IMAP_PORT, ssl=True)
+            self._folders = None
             self.imap.login(self.email_address, self.app_password)
             
             logger.info(f"Connected to iCloud: {self.email_address}")
@@ -72,6 +77,16 @@ class AppleConnector:
             logger.error(f"Apple connection error: {e}")
             return False, str(e)
     
+    def is_alive(self) -> bool:
+        """Check the IMAP connection still works (one NOOP round trip)"""
+        if not self.imap:
+            return False
+        try:
+            self.imap.noop()
+            return True
+        except Exception:
+            return False
+    
     def disconnect(self):
         """Close IMAP connection"""
         try:
@@ -80,13 +95,15 @@ class AppleConnector:
         except Exception as e:
             logger.error(f"Disconnect error: {e}")
     
-    def preview_emails(self, count: int = 100, oldest_first: bool = False) -> List[Dict]:
+    def preview_emails(self, count: int = 100, oldest_first: bool = False,
+                       bulk_size: int = 50) -> List[Dict]:
         """
         Preview emails from inbox
         
         Args:
             count: Number of emails to retrieve
             oldest_first: If True, get oldest first; if False, get newest first
+            bulk_size: Messages per FETCH command
             
         Returns:
             List of email dicts
@@ -108,25 +125,35 @@ class AppleConnector:
             
             # Fetch email data
             emails = []
-            fetch_data = self.imap.fetch(message_ids, ['ENVELOPE', 'BODY.PEEK[]', 'RFC822.SIZE'])
+            fetch_data = {}
+            # Chunked so huge UID sets don't exceed the server's request size limit
+            for i in range(0, len(message_ids), bulk_size):
+                fetch_data.update(self.imap.fetch(message_ids[i:i + bulk_size], PREVIEW_FETCH_ITEMS))
             
             for msg_id, data in fetch_data.items():
                 try:
                     envelope = data[b'ENVELOPE']
-                    raw_email = data[b'BODY[]']
                     
-                    # Parse email
-                    msg = message_from_bytes(raw_email)
+                    # Only the MIME headers and the first PREVIEW_BODY_BYTES of the
+                    # body are fetched; that is enough to decode the text preview
+                    mime_headers = b""
+                    body_start = b""
+                    for key, value in data.items():
+                        if key.startswith(b'BODY[HEADER'):
+                            mime_headers = value or b""
+                        elif key.startswith(b'BODY[TEXT]'):
+                            body_start = value or b""
+                    msg = message_from_bytes(mime_headers + body_start)
                     
                     # Extract body
                     body = ""
                     if msg.is_multipart():
                         for part in msg.walk():
                             if part.get_content_type() == "text/plain":
-                                body = part.get_payload(decode=True).decode('utf-8', errors='ignore')
+                                body = (part.get_payload(decode=True) or b"").decode('utf-8', errors='ignore')
                                 break
                     else:
-                        body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
+                        body = (msg.get_payload(decode=True) or b"").decode('utf-8', errors='ignore')
                     
                     # Parse from address
                     from_addr = ""
@@ -145,7 +172,10 @@ class AppleConnector:
                         "subject": envelope.subject.decode() if envelope.subject else "",
                         "date": str(envelope.date),
                         "body": body[:1000],  # Limit body preview
-                        "snippet": body[:200]
+                        "snippet": body[:200],
+                        "attachments": [
+                            {"filename": name} for name in attachment_names(data.get(b'BODYSTRUCTURE'))
+                        ]
                     })
                     
                 except Exception as e:
@@ -287,10 +317,9 @@ class AppleConnector:
         try:
             self.imap.select_folder('INBOX')
             
-            # Ensure folder exists (iCloud may have different folder structure)
-            folders = [f[2] for f in self.imap.list_folders()]
-            if folder_name not in folders:
-                self.imap.create_folder(folder_name)
+            # Ensure folder exists (checked against the cached LIST)
+            if folder_name not in self.list_folders():
+                self.create_folders([folder_name])
             
             # Convert string IDs to integers
             msg_ids = [int(msg_id) for msg_id in email_ids]
@@ -314,4 +343,4 @@ class AppleConnector:
             
         except Exception as e:
             logger.error(f"Move to folder error: {e}")
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e)}
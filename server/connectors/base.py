@@ -0,0 +1,251 @@
+"""
+Base Email Connector - Interface shared by every provider connector
+Location: server/connectors/base.py
+"""
+import abc
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger("connectors")
+
+# Bytes of message text fetched for IMAP previews (body[:1000] / snippet[:200])
+PREVIEW_BODY_BYTES = 1024
+# MIME headers needed to decode a partial body fetch
+PREVIEW_MIME_HEADERS = 'BODY.PEEK[HEADER.FIELDS (CONTENT-TYPE CONTENT-TRANSFER-ENCODING)]'
+# imapclient FETCH items for a preview: envelope, attachment names and a partial body
+PREVIEW_FETCH_ITEMS = [
+    'ENVELOPE', 'BODYSTRUCTURE', 'RFC822.SIZE', PREVIEW_MIME_HEADERS,
+    f'BODY.PEEK[TEXT]<0.{PREVIEW_BODY_BYTES}>'
+]
+
+
+def attachment_names(bodystructure) -> List[str]:
+    """Attachment filenames from a parsed BODYSTRUCTURE, without fetching any parts"""
+    names = []
+    
+    def walk(node):
+        if isinstance(node, (list, tuple)):
+            for key, value in zip(node, node[1:]):
+                if isinstance(key, bytes) and isinstance(value, bytes) and key.lower() in (b'filename', b'name'):
+                    name = value.decode(errors='ignore')
+                    if name not in names:
+                        names.append(name)
+            for child in node:
+                walk(child)
+    
+    walk(bodystructure)
+    return names
+
+
+class BaseEmailConnector(abc.ABC):
+    """Operations every email connector implements"""
+
+    @abc.abstractmethod
+    def connect(self) -> Tuple[bool, str]:
+        """
+        Open the connection
+
+        Returns:
+            (success, message)
+        """
+
+    @abc.abstractmethod
+    def disconnect(self):
+        """Close the connection"""
+
+    def is_alive(self) -> bool:
+        """Check a connected instance can still be used (override with a real probe)"""
+        return True
+
+    @abc.abstractmethod
+    def preview_emails(self, count: int = 100, *args, **kwargs) -> List[Dict]:
+        """Preview emails from the inbox"""
+
+    @abc.abstractmethod
+    def delete_emails(self, email_ids: List[str], permanent: bool = False) -> Dict[str, Any]:
+        """Delete emails (move to trash unless permanent)"""
+
+    @abc.abstractmethod
+    def move_to_folder(self, email_ids: List[str], folder_name: str) -> Dict[str, Any]:
+        """Move emails to a folder/label"""
+
+    def move_to_folder_bulk(self, email_ids: List[str], folder_name: str) -> Dict[str, Any]:
+        """Move many emails at once (override where the protocol has a bulk command)"""
+        return self.move_to_folder(email_ids, folder_name)
+
+    def list_folders(self) -> List[str]:
+        """Folder/label names in the mailbox (empty where they are created on first move)"""
+        return []
+
+    def create_folders(self, folder_names: List[str]) -> Dict[str, List[str]]:
+        """
+        Create several folders over the open connection
+
+        Connectors that create folders/labels on first move keep this default.
+
+        Returns:
+            {"created": [...], "failed": [...]}
+        """
+        return {"created": [], "failed": []}
+
+
+class IMAPFolderMixin:
+    """
+    Bulk moves and folder management shared by the IMAP connectors
+
+    The connector sets self.imap (None when disconnected) and resets
+    self._folders to None on every connect. It supplies the protocol
+    primitives below for its IMAP library. Each primitive raises on failure.
+    """
+
+    _folders: Optional[List[str]] = None
+
+    def _imap_select_inbox(self):
+        raise NotImplementedError
+
+    def _imap_has_move(self) -> bool:
+        raise NotImplementedError
+
+    def _imap_move(self, email_ids: List[str], folder_name: str):
+        raise NotImplementedError
+
+    def _imap_copy_and_delete(self, email_ids: List[str], folder_name: str):
+        """COPY to folder_name, then flag the originals \\Deleted (expunged later)"""
+        raise NotImplementedError
+
+    def _imap_expunge(self):
+        raise NotImplementedError
+
+    def _imap_list_folder_names(self) -> List[str]:
+        raise NotImplementedError
+
+    def _imap_create_folder(self, folder_name: str):
+        raise NotImplementedError
+
+    def move_to_folder_bulk(self, email_ids: List[str], folder_name: str,
+                            bulk_size: int = 100) -> Dict[str, Any]:
+        """
+        Move emails to a folder with one IMAP command per bulk_size messages
+
+        Uses MOVE when the server advertises it, otherwise COPY plus a
+        silent \\Deleted flag per chunk and a single EXPUNGE.
+
+        Args:
+            email_ids: Message UIDs
+            folder_name: Folder name (created if missing)
+            bulk_size: Messages per command
+
+        Returns:
+            {"success", "moved_count", "moved_ids", "failed_count", "failed_ids"}
+        """
+        if not self.imap:
+            return {"success": False, "error": "Not connected"}
+
+        try:
+            self._imap_select_inbox()
+
+            # Ensure folder exists (checked against the cached LIST)
+            if folder_name not in self.list_folders():
+                self.create_folders([folder_name])
+
+            has_move = self._imap_has_move()
+            moved = []
+            failed = []
+
+            for i in range(0, len(email_ids), bulk_size):
+                batch = [str(email_id) for email_id in email_ids[i:i + bulk_size]]
+                try:
+                    if has_move:
+                        self._imap_move(batch, folder_name)
+                    else:
+                        self._imap_copy_and_delete(batch, folder_name)
+                    moved.extend(batch)
+                except Exception as e:
+                    logger.error(f"Failed to move {len(batch)} emails to {folder_name}: {e}")
+                    failed.extend(batch)
+
+            if moved and not has_move:
+                self._imap_expunge()
+
+            return {
+                "success": True,
+                "moved_count": len(moved),
+                "moved_ids": moved,
+                "failed_count": len(failed),
+                "failed_ids": failed
+            }
+
+        except Exception as e:
+            logger.error(f"Bulk move to folder error: {e}")
+            return {"success": False, "error": str(e)}
+
+    def list_folders(self) -> List[str]:
+        """
+        Folder names, LISTed once per connection and kept up to date by create_folders
+
+        Returns:
+            List of folder names
+        """
+        if self._folders is None:
+            if not self.imap:
+                return []
+            try:
+                self._folders = self._imap_list_folder_names()
+            except Exception as e:
+                logger.warning(f"Could not list folders: {e}")
+                return []
+        return self._folders
+
+    def create_folders(self, folder_names: List[str]) -> Dict[str, List[str]]:
+        """
+        Create folders, one CREATE per name over the existing session
+
+        Args:
+            folder_names: Folder names
+
+        Returns:
+            {"created": [...], "failed": [...]}
+        """
+        if not self.imap:
+            return {"created": [], "failed": list(folder_names)}
+
+        created = []
+        failed = []
+        for folder_name in folder_names:
+            try:
+                self._imap_create_folder(folder_name)
+                created.append(folder_name)
+                if self._folders is not None:
+                    self._folders.append(folder_name)
+            except Exception as e:
+                logger.warning(f"Could not create folder {folder_name}: {e}")
+                failed.append(folder_name)
+
+        return {"created": created, "failed": failed}
+
+
+class IMAPClientFolderMixin(IMAPFolderMixin):
+    """IMAPFolderMixin primitives for connectors built on imapclient.IMAPClient"""
+
+    def _imap_select_inbox(self):
+        self.imap.select_folder('INBOX')
+
+    def _imap_has_move(self) -> bool:
+        return self.imap.has_capability('MOVE')
+
+    def _imap_move(self, email_ids: List[str], folder_name: str):
+        self.imap.move([int(email_id) for email_id in email_ids], folder_name)
+
+    def _imap_copy_and_delete(self, email_ids: List[str], folder_name: str):
+        msg_ids = [int(email_id) for email_id in email_ids]
+        self.imap.copy(msg_ids, folder_name)
+        self.imap.delete_messages(msg_ids, silent=True)
+
+    def _imap_expunge(self):
+        self.imap.expunge()
+
+    def _imap_list_folder_names(self) -> List[str]:
+        return [name for _flags, _delimiter, name in self.imap.list_folders()]
+
+    def _imap_create_folder(self, folder_name: str):
+        self.imap.create_folder(folder_name)
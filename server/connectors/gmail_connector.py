@@ -11,24 +11,32 @@ from datetime import datetime
 
 import httpx
 
-from server.security.credential_vault import CredentialVault
+from server.connectors.base import BaseEmailConnector
+from server.security.credential_vault import CredentialVault, get_vault
 from server.security.oauth2_handler import OAuth2Handler
 
 logger = logging.getLogger("gmail_connector")
 
+# messages.batchModify accepts at most 1000 ids per request
+BATCH_MODIFY_SIZE = 1000
 
-class GmailConnector:
+
+class GmailConnector(BaseEmailConnector):
     """Gmail connector using OAuth2 and Gmail API"""
     
-    def __init__(self, account_id: str):
+    # Characters of body text kept on previews (same cap as the IMAP connectors)
+    PREVIEW_BODY_CHARS = 1000
+    
+    def __init__(self, account_id: str, vault: Optional[CredentialVault] = None):
         """
         Initialize Gmail connector
         
         Args:
             account_id: Account identifier for credential lookup
+            vault: Credential vault (defaults to the shared get_vault() instance)
         """
         self.account_id = account_id
-        self.vault = CredentialVault()
+        self.vault = vault or get_vault()
         self.access_token = None
         self.email_address = None
         self.client = httpx.Client(timeout=30.0)
@@ -75,6 +83,10 @@ class GmailConnector:
             logger.error(f"Gmail connection error: {e}")
             return False, str(e)
     
+    def is_alive(self) -> bool:
+        """Check the connection can still be used without re-authorizing"""
+        return self.access_token is not None and not self.vault.is_token_expired(self.account_id)
+    
     def disconnect(self):
         """Close connection"""
         self.client.close()
@@ -206,7 +218,7 @@ class GmailConnector:
                 "to": headers.get("To", ""),
                 "subject": headers.get("Subject", ""),
                 "date": headers.get("Date", ""),
-                "body": body,
+                "body": body[:self.PREVIEW_BODY_CHARS],
                 "snippet": msg.get("snippet", ""),
                 "labels": msg.get("labelIds", [])
             }
@@ -245,6 +257,10 @@ class GmailConnector:
         """
         Delete emails
         
+        Trash requests go out as one batchModify (TRASH label) per
+        BATCH_MODIFY_SIZE ids; a chunk whose batch call fails is retried
+        one message at a time.
+        
         Args:
             email_ids: List of message IDs
             permanent: If True, permanently delete; if False, move to trash
@@ -256,7 +272,27 @@ class GmailConnector:
             deleted = []
             errors = []
             
-            for msg_id in email_ids:
+            if permanent:
+                pending = list(email_ids)
+            else:
+                pending = []
+                for i in range(0, len(email_ids), BATCH_MODIFY_SIZE):
+                    batch = email_ids[i:i + BATCH_MODIFY_SIZE]
+                    try:
+                        response = self.client.post(
+                            "https://gmail.googleapis.com/gmail/v1/users/me/messages/batchModify",
+                            headers={"Authorization": f"Bearer {self.access_token}"},
+                            json={"ids": batch, "addLabelIds": ["TRASH"]}
+                        )
+                        if response.status_code in [200, 204]:
+                            deleted.extend(batch)
+                            continue
+                        logger.warning(f"Batch trash failed with status {response.status_code}, retrying per message")
+                    except Exception as e:
+                        logger.warning(f"Batch trash failed: {e}, retrying per message")
+                    pending.extend(batch)
+            
+            for msg_id in pending:
                 try:
                     if permanent:
                         # Permanent delete
@@ -285,6 +321,7 @@ class GmailConnector:
                 "success": True,
                 "deleted_count": len(deleted),
                 "deleted_ids": deleted,
+                "failed_count": len(errors),
                 "errors": errors
             }
             
@@ -419,6 +456,59 @@ class GmailConnector:
             logger.error(f"Move to folder error: {e}")
             return {"success": False, "error": str(e)}
     
+    def move_to_folder_bulk(self, email_ids: List[str], folder_label: str,
+                            bulk_size: int = BATCH_MODIFY_SIZE) -> Dict[str, Any]:
+        """
+        Move emails to a folder (Gmail label) with one batchModify per bulk_size ids
+        
+        Args:
+            email_ids: List of message IDs
+            folder_label: Label name
+            bulk_size: Message IDs per request
+            
+        Returns:
+            Result dict
+        """
+        try:
+            label_id = self._get_or_create_label(folder_label)
+            if not label_id:
+                return {"success": False, "error": "Failed to get/create label"}
+            
+            moved = []
+            errors = []
+            
+            for i in range(0, len(email_ids), bulk_size):
+                batch = email_ids[i:i + bulk_size]
+                try:
+                    response = self.client.post(
+                        "https://gmail.googleapis.com/gmail/v1/users/me/messages/batchModify",
+                        headers={"Authorization": f"Bearer {self.access_token}"},
+                        json={
+                            "ids": batch,
+                            "addLabelIds": [label_id],
+                            "removeLabelIds": ["INBOX"]
+                        }
+                    )
+                    
+                    if response.status_code in [200, 204]:
+                        moved.extend(batch)
+                    else:
+                        errors.extend({"id": msg_id, "error": f"Status {response.status_code}"} for msg_id in batch)
+                        
+                except Exception as e:
+                    errors.extend({"id": msg_id, "error": str(e)} for msg_id in batch)
+            
+            return {
+                "success": True,
+                "moved_count": len(moved),
+                "moved_ids": moved,
+                "errors": errors
+            }
+            
+        except Exception as e:
+            logger.error(f"Bulk move to folder error: {e}")
+            return {"success": False, "error": str(e)}
+    
     def _get_or_create_label(self, label_name: str) -> Optional[str]:
         """Get label ID or create if doesn't exist"""
         try:
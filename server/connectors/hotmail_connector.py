@@ -9,24 +9,29 @@ import base64
 
 import httpx
 
-from server.security.credential_vault import CredentialVault
+from server.connectors.base import BaseEmailConnector
+from server.security.credential_vault import CredentialVault, get_vault
 from server.security.oauth2_handler import OAuth2Handler
 
 logger = logging.getLogger("hotmail_connector")
 
 
-class HotmailConnector:
+class HotmailConnector(BaseEmailConnector):
     """Hotmail/Outlook connector using OAuth2 and Microsoft Graph API"""
     
-    def __init__(self, account_id: str):
+    # Characters of body text kept on previews (same cap as the IMAP connectors)
+    PREVIEW_BODY_CHARS = 1000
+    
+    def __init__(self, account_id: str, vault: Optional[CredentialVault] = None):
         """
         Initialize Hotmail connector
         
         Args:
             account_id: Account identifier for credential lookup
+            vault: Credential vault (defaults to the shared get_vault() instance)
         """
         self.account_id = account_id
-        self.vault = CredentialVault()
+        self.vault = vault or get_vault()
         self.access_token = None
         self.email_address = None
         self.client = httpx.Client(timeout=30.0)
@@ -74,6 +79,10 @@ class HotmailConnector:
             logger.error(f"Hotmail connection error: {e}")
             return False, str(e)
     
+    def is_alive(self) -> bool:
+        """Check the connection can still be used without re-authorizing"""
+        return self.access_token is not None and not self.vault.is_token_expired(self.account_id)
+    
     def disconnect(self):
         """Close connection"""
         self.client.close()
@@ -152,7 +161,11 @@ class HotmailConnector:
             
             response = self.client.get(
                 url,
-                headers={"Authorization": f"Bearer {self.access_token}"},
+                headers={
+                    "Authorization": f"Bearer {self.access_token}",
+                    # Plain-text bodies instead of full marketing HTML
+                    "Prefer": 'outlook.body-content-type="text"'
+                },
                 params=params
             )
             
@@ -172,7 +185,7 @@ class HotmailConnector:
                                     for r in msg.get("toRecipients", [])]),
                     "subject": msg.get("subject", ""),
                     "date": msg.get("receivedDateTime", ""),
-                    "body": msg.get("body", {}).get("content", ""),
+                    "body": msg.get("body", {}).get("content", "")[:self.PREVIEW_BODY_CHARS],
                     "snippet": msg.get("bodyPreview", "")
                 })
             
@@ -10,20 +10,30 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import re
 
+from server.connectors.base import BaseEmailConnector, IMAPFolderMixin
+
 logger = logging.getLogger("yahoo_connector")
 
-class YahooConnector:
+_UID_RE = re.compile(r'UID (\d+)')
+_SIZE_RE = re.compile(r'RFC822\.SIZE (\d+)')
+# LIST response line: (flags) "delimiter"|NIL "quoted name"|atom
+_LIST_RE = re.compile(rb'\(([^)]*)\) (?:"[^"]*"|NIL) (?:"((?:[^"\\]|\\.)*)"|(\S+))')
+
+class YahooConnector(IMAPFolderMixin, BaseEmailConnector):
     """Real Yahoo IMAP connector for spam cleanup"""
     
     def __init__(self, email_address: str, app_password: str):
         self.email = email_address
         self.password = app_password
         self.imap = None
+        # Folder names from LIST, cached per connection (see list_folders)
+        self._folders: Optional[List[str]] = None
         
     def connect(self) -> Tuple[bool, str]:
         """Connect to Yahoo IMAP"""
         try:
             self.imap = imaplib.IMAP4_SSL("imap.mail.yahoo.com", 993)
+            self._folders = None
             self.imap.login(self.email, self.password)
             logger.info(f"✅ Connected to Yahoo for {self.email}")
             return True, "Connected successfully"
@@ -36,6 +46,16 @@ class YahooConnector:
             logger.error(error_msg)
             return False, error_msg
     
+    def is_alive(self) -> bool:
+        """Check the IMAP connection still works (one NOOP round trip)"""
+        if not self.imap:
+            return False
+        try:
+            status, _ = self.imap.noop()
+            return status == "OK"
+        except Exception:
+            return False
+    
     def disconnect(self):
         """Safely close connection"""
         if self.imap:
@@ -71,9 +91,10 @@ class YahooConnector:
             return {"error": str(e)}
     
     def preview_emails(self, count: int = 100, folder: str = "INBOX", 
-                       oldest_first: bool = True) -> List[Dict]:
+                       oldest_first: bool = True, bulk_size: int = 50) -> List[Dict]:
         """
         Preview emails for categorization
+        Fetches bulk_size messages per UID FETCH instead of one round trip each
         Returns: [{id, from, subject, date, size_kb}]
         """
         if not self.imap:
@@ -98,45 +119,44 @@ class YahooConnector:
             else:
                 target_ids = all_ids[-count:]
             
-            emails = []
-            for msg_id in target_ids:
+            by_uid = {}
+            for i in range(0, len(target_ids), bulk_size):
+                batch = target_ids[i:i + bulk_size]
                 try:
-                    # Fetch headers + size
-                    status, data = self.imap.uid("fetch", msg_id, "(RFC822.SIZE BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)])")
+                    # Fetch headers + size for the whole batch
+                    status, data = self.imap.uid("fetch", b",".join(batch), "(UID RFC822.SIZE BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)])")
                     if status != "OK":
                         continue
                     
-                    # Parse size
-                    size_bytes = 0
+                    # Responses interleave (b'N (UID x RFC822.SIZE y BODY[...] {n}', headers) and b')'
                     for item in data:
-                        if isinstance(item, bytes):
+                        if not isinstance(item, tuple):
                             continue
-                        item_str = item.decode() if isinstance(item, bytes) else str(item)
-                        if "RFC822.SIZE" in item_str:
-                            match = re.search(r'RFC822.SIZE (\d+)', item_str)
-                            if match:
-                                size_bytes = int(match.group(1))
-                    
-                    # Parse headers
-                    for item in data:
-                        if isinstance(item, tuple):
-                            header_data = item[1]
-                            msg = email.message_from_bytes(header_data)
+                        try:
+                            meta = item[0].decode(errors="ignore")
+                            uid_match = _UID_RE.search(meta)
+                            if not uid_match:
+                                continue
+                            size_match = _SIZE_RE.search(meta)
+                            size_bytes = int(size_match.group(1)) if size_match else 0
                             
-                            emails.append({
-                                "id": msg_id.decode(),
+                            msg = email.message_from_bytes(item[1])
+                            by_uid[uid_match.group(1)] = {
+                                "id": uid_match.group(1),
                                 "from": self._decode_header(msg.get("From", "")),
                                 "subject": self._decode_header(msg.get("Subject", "")),
                                 "date": msg.get("Date", ""),
                                 "size_kb": round(size_bytes / 1024, 2)
-                            })
-                            break
+                            }
+                        except Exception as e:
+                            logger.error(f"Error parsing email {item[0][:40]}: {e}")
                 
                 except Exception as e:
-                    logger.error(f"Error parsing email {msg_id}: {e}")
+                    logger.error(f"Error fetching batch starting at {batch[0]}: {e}")
                     continue
             
-            return emails
+            # Keep the requested ordering
+            return [by_uid[uid.decode()] for uid in target_ids if uid.decode() in by_uid]
         
         except Exception as e:
             logger.error(f"Error previewing emails: {e}")
@@ -265,6 +285,51 @@ class YahooConnector:
             logger.error(f"Move operation failed: {e}")
             return {"success": False, "error": str(e)}
 
+    def _imap_select_inbox(self):
+        self.imap.select("INBOX")
+
+    def _imap_has_move(self) -> bool:
+        return "MOVE" in self.imap.capabilities
+
+    def _imap_uid(self, *args):
+        """UID command that raises unless the server answers OK"""
+        status, data = self.imap.uid(*args)
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"UID {args[0]} failed: {data}")
+
+    def _imap_move(self, email_ids: List[str], folder_name: str):
+        self._imap_uid("MOVE", ",".join(email_ids), folder_name)
+
+    def _imap_copy_and_delete(self, email_ids: List[str], folder_name: str):
+        uid_set = ",".join(email_ids)
+        self._imap_uid("copy", uid_set, folder_name)
+        self._imap_uid("store", uid_set, '+FLAGS.SILENT', '(\\Deleted)')
+
+    def _imap_expunge(self):
+        self.imap.expunge()
+
+    def _imap_list_folder_names(self) -> List[str]:
+        """LIST parsed for quoted, atom and literal ({n}) mailbox names"""
+        status, data = self.imap.list()
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"LIST failed: {data}")
+        folders = []
+        for item in data:
+            if isinstance(item, tuple):
+                # Name sent as a literal: (b'(flags) "/" {n}', b'name')
+                folders.append(item[1].decode(errors="ignore"))
+                continue
+            match = _LIST_RE.match(item or b"")
+            if match:
+                raw = match.group(2) if match.group(2) is not None else match.group(3)
+                folders.append(raw.replace(b'\\"', b'"').replace(b'\\\\', b'\\').decode(errors="ignore"))
+        return folders
+
+    def _imap_create_folder(self, folder_name: str):
+        status, data = self.imap.create(folder_name)
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"CREATE failed: {data}")
+
     def send_message(
         self, 
         to: str, 
@@ -0,0 +1,11 @@
+-- Store conversation embeddings as half-precision vectors (pgvector >= 0.7)
+-- Halves storage and wire size per 384-dim embedding
+
+DROP INDEX IF EXISTS conversations_embedding_idx;
+
+ALTER TABLE conversations
+ALTER COLUMN embedding TYPE halfvec(384) USING embedding::halfvec(384);
+
+CREATE INDEX IF NOT EXISTS conversations_embedding_idx
+ON conversations USING ivfflat (embedding halfvec_cosine_ops)
+WITH (lists = 100);
@@ -0,0 +1,10 @@
+-- Embedding cache keyed by message content hash
+-- Identical message texts are only sent to the embedding model once
+
+CREATE TABLE IF NOT EXISTS message_hashes (
+    content_digest BYTEA PRIMARY KEY,
+    embedding vector(384) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE message_hashes IS 'blake2b-128 digest of message text -> embedding';
@@ -9,7 +9,7 @@ CREATE TABLE IF NOT EXISTS conversations (
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     role VARCHAR(20) NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
     message_text TEXT NOT NULL,
-    embedding vector(384),
+    embedding halfvec(384),
     function_calls JSONB,
     metadata JSONB
 );
@@ -20,9 +20,16 @@ CREATE INDEX IF NOT EXISTS idx_timestamp ON conversations(timestamp);
 
 -- Vector similarity index
 CREATE INDEX IF NOT EXISTS conversations_embedding_idx 
-ON conversations USING ivfflat (embedding vector_cosine_ops)
+ON conversations USING ivfflat (embedding halfvec_cosine_ops)
 WITH (lists = 100);
 
+-- Embedding cache keyed by message content hash
+CREATE TABLE IF NOT EXISTS message_hashes (
+    content_digest BYTEA PRIMARY KEY,
+    embedding vector(384) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Meetings table
 CREATE TABLE IF NOT EXISTS meetings (
     id SERIAL PRIMARY KEY,
@@ -10,6 +10,7 @@ import os
 import subprocess
 import json
 import logging
+import threading
 
 import httpx
 
@@ -17,12 +18,29 @@ logger = logging.getLogger("ollama_adapter")
 OLLAMA_HTTP = os.environ.get("OLLAMA_HTTP", "http://127.0.0.1:11434")
 OLLAMA_CLI = os.environ.get("OLLAMA_BIN", "ollama")
 HTTP_TIMEOUT = float(os.environ.get("OLLAMA_HTTP_TIMEOUT", "120.0"))
+# Idle connections kept open to the daemon; sized for parallel per-account work
+HTTP_KEEPALIVE_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY = 60.0
+# How long the daemon keeps a model loaded after a request, avoids cold loads between calls
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "10m")
+# Concurrent generate requests across the whole process (email categorization,
+# spam detection). Ollama only serves them in parallel with OLLAMA_NUM_PARALLEL > 1;
+# set OLLAMA_MAX_LOADED_MODELS >= 2 so the classify and draft models stay resident together.
+LLM_MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+LLM_SLOTS = threading.BoundedSemaphore(LLM_MAX_IN_FLIGHT)
 
 
 class OllamaAdapter:
     def __init__(self, base_url: str = None):
         self.base_url = base_url or OLLAMA_HTTP
-        self.client = httpx.Client(base_url=self.base_url, timeout=HTTP_TIMEOUT)
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
 
     def ping(self) -> bool:
         """Check Ollama HTTP health endpoint. Fallback to CLI list."""
@@ -82,7 +100,8 @@ class OllamaAdapter:
         payload = {
             "model": model,
             "prompt": prompt,
-            "stream": False  # Important: disable streaming for simple response
+            "stream": False,  # Important: disable streaming for simple response
+            "keep_alive": OLLAMA_KEEP_ALIVE
         }
         payload.update(kwargs)
         
@@ -2,30 +2,107 @@
 Account Manager - Multi-account orchestration and management
 Location: server/managers/account_manager.py
 """
+import importlib
 import logging
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import os
 
-from server.security.credential_vault import CredentialVault
+from server.security.credential_vault import get_vault
 from server.security.oauth2_handler import OAuth2Handler
-from server.connectors.yahoo_connector import YahooConnector
-from server.connectors.gmail_connector import GmailConnector
-from server.connectors.hotmail_connector import HotmailConnector
-from server.connectors.comcast_connector import ComcastConnector
-from server.connectors.apple_connector import AppleConnector
 
 logger = logging.getLogger("account_manager")
 
+def _app_password_builder(connector_cls):
+    """Connector(email_address, app_password)"""
+    return lambda account_id, metadata, app_password, vault: connector_cls(metadata.get("email"), app_password)
+
+
+def _account_id_builder(connector_cls):
+    """Connector(account_id, vault), credentials looked up on connect()"""
+    return lambda account_id, metadata, app_password, vault: connector_cls(account_id, vault=vault)
+
+
+# provider -> (connector module, class name, builder factory for its constructor)
+# Modules are imported on first use, so only providers actually configured get loaded
+_CONNECTOR_REGISTRY = {
+    "yahoo": ("server.connectors.yahoo_connector", "YahooConnector", _app_password_builder),
+    "gmail": ("server.connectors.gmail_connector", "GmailConnector", _account_id_builder),
+    "hotmail": ("server.connectors.hotmail_connector", "HotmailConnector", _account_id_builder),
+    "comcast": ("server.connectors.comcast_connector", "ComcastConnector", _account_id_builder),
+    "apple": ("server.connectors.apple_connector", "AppleConnector", _account_id_builder),
+}
+# Alternative provider names -> canonical registry key
+PROVIDER_ALIASES = {
+    "outlook": "hotmail", "live": "hotmail", "microsoft": "hotmail",
+    "icloud": "apple", "me": "apple", "mac": "apple",
+}
+# (module, class name) -> imported connector class
+_CLASS_CACHE: Dict[Tuple[str, str], type] = {}
+# provider -> builder(account_id, metadata, app_password, vault) bound to its class
+_DISPATCH: Dict[str, Any] = {}
+
+
+def canonical_provider(provider: Optional[str]) -> str:
+    """Lowercased provider name with aliases resolved to their registry key"""
+    provider = (provider or "").lower()
+    return PROVIDER_ALIASES.get(provider, provider)
+
+
+def _load_connector_class(module_name: str, class_name: str) -> type:
+    """Import a connector class on first use and memoize it"""
+    cls = _CLASS_CACHE.get((module_name, class_name))
+    if cls is None:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        _CLASS_CACHE[(module_name, class_name)] = cls
+    return cls
+
+
+def _uses_app_password(provider_key: str) -> bool:
+    """True if the provider's connector is constructed with an app password"""
+    entry = _CONNECTOR_REGISTRY.get(provider_key)
+    return entry is not None and entry[2] is _app_password_builder
+
+
+def _dispatch_for(provider_key: str):
+    """Connector builder for a provider, bound on first use (None if unknown)"""
+    builder = _DISPATCH.get(provider_key)
+    if builder is None:
+        entry = _CONNECTOR_REGISTRY.get(provider_key)
+        if entry is None:
+            return None
+        module_name, class_name, builder_factory = entry
+        builder = builder_factory(_load_connector_class(module_name, class_name))
+        _DISPATCH[provider_key] = builder
+    return builder
+
+
+# Connected connectors kept for reuse between operations
+POOL_MAX_IDLE_PER_ACCOUNT = 2
+POOL_IDLE_TIMEOUT = 300.0     # seconds before an idle connection is closed
+POOL_KEEPALIVE_INTERVAL = 25.0  # seconds between NOOPs on idle IMAP connections
+POOL_VALIDATE_AFTER = 5.0     # idle seconds after which a connector is health-checked on reuse
+POOL_CLOSE_WORKERS = 32
+CONNECTOR_BUILD_WORKERS = 16
+
 
 class AccountManager:
     """Manages multiple email accounts and their connectors"""
     
     def __init__(self):
-        self.vault = CredentialVault()
+        self.vault = get_vault()
         self.active_connectors = {}  # Cache of active connections
+        # account_id -> [(connected connector, last used)], see acquire_connector
+        self._pool: Dict[str, List[Tuple[Any, float]]] = {}
+        self._pool_lock = threading.Lock()
+        self._keepalive_thread = None
+        # account_id -> canonical provider key, resolved on first connector build
+        self._provider_keys: Dict[str, str] = {}
         
     def add_account_oauth(self, account_id: str, provider: str, email: str,
                          client_id: str, client_secret: str) -> Dict[str, Any]:
@@ -176,6 +253,11 @@ class AccountManager:
             if account_id in self.active_connectors:
                 self.active_connectors[account_id].disconnect()
                 del self.active_connectors[account_id]
+            with self._pool_lock:
+                pooled = self._pool.pop(account_id, [])
+            self._provider_keys.pop(account_id, None)
+            for connector, _ in pooled:
+                self._disconnect_quietly(connector)
             
             # Delete credentials
             success = self.vault.delete_credentials(account_id)
@@ -224,12 +306,28 @@ class AccountManager:
             logger.error(f"Error listing accounts: {e}")
             return {"status": "error", "error": str(e)}
     
-    def _get_connector(self, account_id: str):
+    def _provider_key(self, account_id: str, metadata: Dict) -> str:
+        """Canonical provider key for an account, resolved once"""
+        provider_key = self._provider_keys.get(account_id)
+        if provider_key is None:
+            provider_key = canonical_provider(metadata.get("provider"))
+            self._provider_keys[account_id] = provider_key
+        return provider_key
+    
+    def _needs_app_password(self, account_id: str) -> bool:
+        """True if the account's connector is constructed with an app password"""
+        metadata = self.vault.get_account_metadata(account_id)
+        if not metadata:
+            return False
+        return _uses_app_password(self._provider_key(account_id, metadata))
+    
+    def _get_connector(self, account_id: str, app_password: Optional[str] = None):
         """
         Get appropriate connector for account
         
         Args:
             account_id: Account identifier
+            app_password: Already-fetched app password, skips the vault lookup
             
         Returns:
             Connector instance
@@ -238,22 +336,19 @@ class AccountManager:
         if not metadata:
             raise ValueError(f"Account {account_id} not found")
         
-        provider = metadata.get("provider")
+        provider_key = self._provider_key(account_id, metadata)
+        builder = _dispatch_for(provider_key)
+        if builder is None:
+            logger.warning(f"Unknown provider '{metadata.get('provider')}' for {account_id}")
+            raise ValueError(f"Unknown provider: {metadata.get('provider')}")
         
-        if provider == "yahoo":
-            email = metadata.get("email")
-            app_password = self.vault.get_credentials(account_id, "app_password")
-            return YahooConnector(email_address=email, app_password=app_password)
-        elif provider == "gmail":
-            return GmailConnector(account_id=account_id)
-        elif provider == "hotmail":
-            return HotmailConnector(account_id=account_id)
-        elif provider == "comcast":
-            return ComcastConnector(account_id=account_id)
-        elif provider == "apple":
-            return AppleConnector(account_id=account_id)
-        else:
-            raise ValueError(f"Unknown provider: {provider}")
+        # Only app-password providers touch the vault here; OAuth connectors read tokens on connect()
+        if _uses_app_password(provider_key):
+            if app_password is None:
+                app_password = self.vault.get_credentials(account_id, "app_password")
+            if not app_password:
+                raise ValueError(f"No app password stored for {account_id}")
+        return builder(account_id, metadata, app_password, self.vault)
     
     def get_connector(self, account_id: str, cache: bool = True):
         """
@@ -276,6 +371,147 @@ class AccountManager:
         
         return connector
     
+    def get_connectors(self, account_ids: List[str]) -> Dict[str, Any]:
+        """
+        Build (unconnected) connectors for several accounts
+        
+        Expired OAuth tokens are refreshed and app passwords fetched with one
+        batched vault call each, then the connectors are constructed concurrently.
+        
+        Args:
+            account_ids: Account identifiers
+            
+        Returns:
+            Dict of account_id -> connector (accounts that fail are logged and left out)
+        """
+        if not account_ids:
+            return {}
+        # Refresh expired OAuth tokens together rather than one per connector connect
+        self.vault.refresh_expired_tokens(account_ids)
+        # OAuth providers never use an app password, so don't look one up for them
+        app_passwords = self.vault.get_credentials_batch(
+            [account_id for account_id in account_ids if self._needs_app_password(account_id)],
+            "app_password"
+        )
+        
+        def build(account_id):
+            try:
+                return self._get_connector(account_id, app_passwords.get(account_id))
+            except Exception as e:
+                logger.error(f"Failed to get connector for {account_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(CONNECTOR_BUILD_WORKERS, len(account_ids))) as pool:
+            built = pool.map(build, account_ids)
+            return {
+                account_id: connector
+                for account_id, connector in zip(account_ids, built)
+                if connector is not None
+            }
+    
+    def acquire_connector(self, account_id: str, connector=None) -> Tuple[Any, bool, str]:
+        """
+        Get a connected connector, reusing an idle pooled one when available
+        
+        Hand it back with release_connector() when done so the next operation
+        skips the TLS handshake and login.
+        
+        Args:
+            account_id: Account identifier
+            connector: Unconnected connector to use if nothing is pooled
+            
+        Returns:
+            (connector, success, message)
+        """
+        while True:
+            with self._pool_lock:
+                idle = self._pool.get(account_id)
+                if not idle:
+                    break
+                pooled, last_used = idle.pop()
+            
+            # Expired or dropped by the server since the last keepalive: replace it
+            idle_for = time.monotonic() - last_used
+            if idle_for <= POOL_IDLE_TIMEOUT and (idle_for < POOL_VALIDATE_AFTER or self._is_alive(pooled)):
+                return pooled, True, "Reused pooled connection"
+            self._disconnect_quietly(pooled)
+        
+        if connector is None:
+            connector = self._get_connector(account_id)
+        success, message = connector.connect()
+        return connector, success, message
+    
+    def release_connector(self, account_id: str, connector):
+        """Return a connected connector to the pool"""
+        with self._pool_lock:
+            idle = self._pool.setdefault(account_id, [])
+            if len(idle) < POOL_MAX_IDLE_PER_ACCOUNT:
+                idle.append((connector, time.monotonic()))
+                connector = None
+            if self._keepalive_thread is None:
+                self._keepalive_thread = threading.Thread(
+                    target=self._keepalive_loop, name="connector-keepalive", daemon=True
+                )
+                self._keepalive_thread.start()
+        
+        if connector is not None:
+            # Pool is full for this account
+            self._disconnect_quietly(connector)
+    
+    def close_connectors(self):
+        """Disconnect every pooled connector"""
+        with self._pool_lock:
+            pooled = [c for idle in self._pool.values() for c, _ in idle]
+            self._pool.clear()
+        if pooled:
+            # LOGOUT is a network round trip per connection; overlap them
+            with ThreadPoolExecutor(max_workers=min(POOL_CLOSE_WORKERS, len(pooled))) as pool:
+                list(pool.map(self._disconnect_quietly, pooled))
+    
+    def _keepalive_loop(self):
+        """NOOP idle IMAP connections and close ones idle too long"""
+        while True:
+            time.sleep(POOL_KEEPALIVE_INTERVAL)
+            
+            # Take idle connectors out while checking so nobody acquires them mid-NOOP
+            with self._pool_lock:
+                checking = [(acc_id, entry) for acc_id, idle in self._pool.items() for entry in idle]
+                for idle in self._pool.values():
+                    idle.clear()
+            
+            now = time.monotonic()
+            for account_id, (connector, last_used) in checking:
+                if now - last_used > POOL_IDLE_TIMEOUT:
+                    self._disconnect_quietly(connector)
+                    continue
+                if not self._is_alive(connector):
+                    logger.debug(f"Dropping stale connection for {account_id}")
+                    self._disconnect_quietly(connector)
+                    continue
+                with self._pool_lock:
+                    idle = self._pool.setdefault(account_id, [])
+                    if len(idle) < POOL_MAX_IDLE_PER_ACCOUNT:
+                        idle.append((connector, last_used))
+                        connector = None
+                if connector is not None:
+                    self._disconnect_quietly(connector)
+    
+    @staticmethod
+    def _is_alive(connector) -> bool:
+        """Health check for a pooled connector (NOOP for IMAP, token expiry for OAuth)"""
+        try:
+            return connector.is_alive()
+        except Exception as e:
+            logger.debug(f"Health check failed: {e}")
+            return False
+    
+    @staticmethod
+    def _disconnect_quietly(connector):
+        try:
+            connector.disconnect()
+        except Exception as e:
+            logger.debug(f"Error disconnecting: {e}")
+    
     def test_all_accounts(self) -> Dict[str, Any]:
         """
         Test connectivity for all accounts
@@ -22,6 +22,8 @@ class CalendarManager:
     
     def __init__(self):
         self.events = self._load_events()
+        # Bumped on every change to self.events so callers can tell cached results are stale
+        self.revision = 0
         self.timezone = pytz.timezone('America/New_York')  # TODO: Make configurable
         
     def _load_events(self) -> List[Dict]:
@@ -37,6 +39,7 @@ class CalendarManager:
     
     def _save_events(self):
         """Save events to local storage"""
+        self.revision += 1
         try:
             CALENDAR_FILE.parent.mkdir(parents=True, exist_ok=True)
             with open(CALENDAR_FILE, 'w') as f:
@@ -3,42 +3,65 @@ Contact Manager - Contact information management
 Location: server/managers/contact_manager.py
 """
 import logging
-import json
 import os
+import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger("contact_manager")
 
 # Data paths
 DATA_DIR = Path(os.path.expanduser("~/Library/Application Support/ExecutiveAssistant/data"))
 CONTACTS_FILE = DATA_DIR / "contacts" / "contacts.json"
 
+# Joins searchable fields so a query can never match across two fields
+SEARCH_FIELD_SEP = "\x00"
+
 
 class ContactManager:
     """Manages contact information with learning capabilities"""
     
     def __init__(self):
         self.contacts = self._load_contacts()
+        # Bumped whenever names/emails change so callers can tell cached lookups are stale
+        self.revision = 0
+        self._rebuild_soa()
         
     def _load_contacts(self) -> List[Dict]:
         """Load contacts from local storage"""
         try:
             if CONTACTS_FILE.exists():
-                with open(CONTACTS_FILE, 'r') as f:
-                    return json.load(f)
+                with open(CONTACTS_FILE, 'rb') as f:
+                    return orjson.loads(f.read())
             return []
         except Exception as e:
             logger.error(f"Error loading contacts: {e}")
             return []
     
+    def _rebuild_soa(self):
+        """
+        Rebuild the flat per-field views of self.contacts used for scans.
+        Must be called after any change to names, emails, phones or notes.
+        """
+        self.revision += 1
+        self._ids = [c["id"] for c in self.contacts]
+        self._names_lc = [c["name"].lower() for c in self.contacts]
+        self._emails_lc = [[e.lower() for e in c.get("emails", [])] for c in self.contacts]
+        # name, emails, phones and notes in one string so a search is one regex call
+        self._search_lc = [
+            SEARCH_FIELD_SEP.join([name, *emails, *c.get("phones", []), (c.get("notes") or "").lower()])
+            for c, name, emails in zip(self.contacts, self._names_lc, self._emails_lc)
+        ]
+    
     def _save_contacts(self):
         """Save contacts to local storage"""
         try:
             CONTACTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(CONTACTS_FILE, 'w') as f:
-                json.dump(self.contacts, f, indent=2)
+            with open(CONTACTS_FILE, 'wb') as f:
+                f.write(orjson.dumps(self.contacts, option=orjson.OPT_INDENT_2))
         except Exception as e:
             logger.error(f"Error saving contacts: {e}")
     
@@ -91,6 +114,7 @@ class ContactManager:
             }
             
             self.contacts.append(contact)
+            self._rebuild_soa()
             self._save_contacts()
             
             logger.info(f"Added contact: {name}")
@@ -116,33 +140,48 @@ class ContactManager:
         """
         try:
             query = query.lower()
+            pattern = re.compile(re.escape(query))
+            matches = [self.contacts[i] for i, hay in enumerate(self._search_lc) if pattern.search(hay)]
+            
+            return {
+                "status": "success",
+                "contacts": matches,
+                "count": len(matches),
+                "query": query
+            }
+            
+        except Exception as e:
+            logger.error(f"Error searching contacts: {e}")
+            return {"status": "error", "error": str(e)}
+    
+    def search_contacts_multi(self, queries: List[str], **kwargs) -> Dict[str, Any]:
+        """
+        Search contacts for several terms in a single pass
+        
+        Args:
+            queries: Search terms
+            
+        Returns:
+            Matching contacts, each tagged with the query that hit it
+        """
+        try:
+            queries = [q.lower() for q in queries if q]
+            if not queries:
+                return {"status": "success", "contacts": [], "count": 0, "queries": []}
+            
+            pattern = re.compile("|".join(re.escape(q) for q in queries))
             matches = []
             
-            for contact in self.contacts:
-                # Search in name
-                if query in contact["name"].lower():
-                    matches.append(contact)
-                    continue
-                
-                # Search in emails
-                if any(query in email.lower() for email in contact.get("emails", [])):
-                    matches.append(contact)
-                    continue
-                
-                # Search in phones
-                if any(query in phone for phone in contact.get("phones", [])):
-                    matches.append(contact)
-                    continue
-                
-                # Search in notes
-                if contact.get("notes") and query in contact["notes"].lower():
-                    matches.append(contact)
+            for i, hay in enumerate(self._search_lc):
+                match = pattern.search(hay)
+                if match:
+                    matches.append({"contact": self.contacts[i], "query": match.group(0)})
             
             return {
                 "status": "success",
                 "contacts": matches,
                 "count": len(matches),
-                "query": query
+                "queries": queries
             }
             
         except Exception as e:
@@ -163,27 +202,27 @@ class ContactManager:
             identifier = identifier.lower()
             
             # Try exact name match first
-            for contact in self.contacts:
-                if contact["name"].lower() == identifier:
+            for i, name in enumerate(self._names_lc):
+                if name == identifier:
                     return {
                         "status": "success",
-                        "contact": contact
+                        "contact": self.contacts[i]
                     }
             
             # Try email match
-            for contact in self.contacts:
-                if any(identifier in email.lower() for email in contact.get("emails", [])):
+            for i, emails in enumerate(self._emails_lc):
+                if any(identifier in email for email in emails):
                     return {
                         "status": "success",
-                        "contact": contact
+                        "contact": self.contacts[i]
                     }
             
             # Try ID match
-            for contact in self.contacts:
-                if contact["id"] == identifier:
+            for i, contact_id in enumerate(self._ids):
+                if contact_id == identifier:
                     return {
                         "status": "success",
-                        "contact": contact
+                        "contact": self.contacts[i]
                     }
             
             return {
@@ -227,6 +266,7 @@ class ContactManager:
                     contact[key] = value
             
             contact["updated_at"] = datetime.now().isoformat()
+            self._rebuild_soa()
             self._save_contacts()
             
             return {
@@ -240,12 +280,21 @@ class ContactManager:
     
     def record_interaction(self, identifier: str):
         """Record an interaction with a contact (for learning)"""
+        self.record_interactions([identifier])
+    
+    def record_interactions(self, identifiers: List[str]):
+        """Record an interaction with each contact, saving the contacts file once"""
         try:
-            result = self.get_contact(identifier)
-            if result["status"] == "success":
-                contact = result["contact"]
-                contact["interaction_count"] = contact.get("interaction_count", 0) + 1
-                contact["last_interaction"] = datetime.now().isoformat()
+            now = datetime.now().isoformat()
+            updated = False
+            for identifier in identifiers:
+                result = self.get_contact(identifier)
+                if result["status"] == "success":
+                    contact = result["contact"]
+                    contact["interaction_count"] = contact.get("interaction_count", 0) + 1
+                    contact["last_interaction"] = now
+                    updated = True
+            if updated:
                 self._save_contacts()
         except Exception as e:
             logger.error(f"Error recording interaction: {e}")
@@ -253,9 +302,9 @@ class ContactManager:
     def get_contact_by_email(self, email: str) -> Optional[Dict]:
         """Get contact by email address"""
         email = email.lower()
-        for contact in self.contacts:
-            if any(email in e.lower() for e in contact.get("emails", [])):
-                return contact
+        for i, emails in enumerate(self._emails_lc):
+            if any(email in e for e in emails):
+                return self.contacts[i]
         return None
     
     def get_all_contacts(self) -> List[Dict]:
@@ -2,15 +2,31 @@
 Conversation Memory Manager for JARVIS
 Stores and retrieves conversations with semantic search using pgvector
 """
+import hashlib
 import logging
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any
 from sqlalchemy import text, desc
 import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DIM = 384
+# Rows fetched per round trip when streaming history results
+STREAM_BATCH_SIZE = 500
+# In-process embeddings kept by content hash
+EMBEDDING_CACHE_SIZE = 256
+# Background workers for store_conversation_async, and how many stores may queue
+EMBED_WORKERS = 4
+EMBED_MAX_PENDING = 64
+# Messages shorter than this are stored without an embedding
+MIN_EMBED_CHARS = 16
+
 
 class ConversationMemory:
     """Manages conversation storage and retrieval with semantic search"""
@@ -19,6 +35,16 @@ class ConversationMemory:
         from server.database.connection import get_db_session
         self.get_db_session = get_db_session
         self._embedding_model = None
+        # content hash -> embedding, most recently used last
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # one requests.Session per thread, reused across embedding calls
+        self._http = threading.local()
+        self._embed_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+        self._pending = threading.BoundedSemaphore(EMBED_MAX_PENDING)
+        # Whether the message_hashes table (migration 004) exists; None = not checked yet
+        self._hash_cache_enabled: Optional[bool] = None
+        self._hash_cache_lock = threading.Lock()
     
     def _get_embedding_model(self):
         """Lazy load embedding model (uses Ollama)"""
@@ -27,31 +53,132 @@ class ConversationMemory:
             self._embedding_model = OllamaAdapter()
         return self._embedding_model
     
-    def _generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding vector for text using Ollama"""
+    def _get_http_session(self):
+        """requests.Session for the current thread"""
+        session = getattr(self._http, "session", None)
+        if session is None:
+            import requests
+            session = self._http.session = requests.Session()
+        return session
+    
+    def _generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate float32 embedding vector for text using Ollama
+        
+        Identical texts are embedded once: results are cached by content hash,
+        in-process first and then in the message_hashes table.
+        """
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        
+        with self._cache_lock:
+            cached = self._embedding_cache.get(digest)
+            if cached is not None:
+                self._embedding_cache.move_to_end(digest)
+                return cached
+        
+        embedding = self._lookup_cached_embedding(digest)
+        if embedding is None:
+            embedding = self._request_embedding(text)
+            if embedding is None:
+                return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+            self._store_cached_embedding(digest, embedding)
+        
+        with self._cache_lock:
+            self._embedding_cache[digest] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+    
+    def _request_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Call Ollama's embedding endpoint, None on failure"""
         try:
             model = self._get_embedding_model()
             # Use Ollama's embedding endpoint
-            import requests
-            response = requests.post(
+            response = self._get_http_session().post(
                 "http://127.0.0.1:11434/api/embeddings",
                 json={"model": "nomic-embed-text", "prompt": text},
                 timeout=30
             )
             if response.status_code == 200:
-                embedding = response.json()["embedding"]
+                embedding = np.asarray(response.json()["embedding"], dtype=np.float32)
                 # Pad or truncate to 384 dimensions
-                if len(embedding) > 384:
-                    return embedding[:384]
-                elif len(embedding) < 384:
-                    return embedding + [0.0] * (384 - len(embedding))
+                if embedding.shape[0] > EMBEDDING_DIM:
+                    return embedding[:EMBEDDING_DIM]
+                elif embedding.shape[0] < EMBEDDING_DIM:
+                    return np.pad(embedding, (0, EMBEDDING_DIM - embedding.shape[0]))
                 return embedding
             else:
                 logger.warning(f"Embedding generation failed, using zero vector")
-                return [0.0] * 384
+                return None
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return [0.0] * 384
+            return None
+    
+    def _hash_cache_available(self) -> bool:
+        """True once message_hashes is known to exist; checked once per process"""
+        if self._hash_cache_enabled is None:
+            with self._hash_cache_lock:
+                if self._hash_cache_enabled is None:
+                    try:
+                        with self.get_db_session() as session:
+                            exists = session.execute(text("""
+                                SELECT EXISTS (
+                                    SELECT FROM information_schema.tables
+                                    WHERE table_name = 'message_hashes'
+                                )
+                            """)).scalar()
+                    except Exception as e:
+                        # Database unreachable: check again on the next embedding
+                        logger.debug(f"Embedding cache table check failed: {e}")
+                        return False
+                    if not exists:
+                        logger.warning("message_hashes table missing (migration 004 not applied); "
+                                       "persistent embedding cache disabled")
+                    self._hash_cache_enabled = bool(exists)
+        return self._hash_cache_enabled
+    
+    def _lookup_cached_embedding(self, digest: bytes) -> Optional[np.ndarray]:
+        """Fetch a previously computed embedding by content hash"""
+        if not self._hash_cache_available():
+            return None
+        try:
+            with self.get_db_session() as session:
+                # As text so the result doesn't depend on a registered pgvector adapter
+                row = session.execute(
+                    text("SELECT embedding::text AS embedding FROM message_hashes WHERE content_digest = :h"),
+                    {"h": digest}
+                ).fetchone()
+            if row is None:
+                return None
+            return np.array(row.embedding.strip("[]").split(","), dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"Embedding cache lookup failed: {e}")
+            return None
+    
+    def _store_cached_embedding(self, digest: bytes, embedding: np.ndarray):
+        """Remember an embedding by content hash"""
+        if not self._hash_cache_available():
+            return
+        try:
+            with self.get_db_session() as session:
+                session.execute(
+                    text("""
+                        INSERT INTO message_hashes (content_digest, embedding)
+                        VALUES (:h, CAST(:embedding AS vector(384)))
+                        ON CONFLICT DO NOTHING
+                    """),
+                    {"h": digest, "embedding": self._to_pgvector(embedding)}
+                )
+        except Exception as e:
+            logger.debug(f"Embedding cache insert failed: {e}")
+    
+    @staticmethod
+    def _to_pgvector(embedding: np.ndarray) -> str:
+        """Format a vector as a pgvector literal ('[x,y,...]')"""
+        if embedding.dtype == np.float16:
+            # halfvec only keeps ~3 significant digits, don't send more
+            return "[" + ",".join(f"{x:.4g}" for x in embedding.tolist()) + "]"
+        return "[" + ",".join(f"{x:.9g}" for x in embedding.tolist()) + "]"
     
     def store_conversation(
         self,
@@ -60,7 +187,8 @@ class ConversationMemory:
         role: str,
         message_text: str,
         function_calls: Optional[Dict] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        force_embed: bool = False
     ) -> int:
         """
         Store a conversation message with embedding
@@ -72,30 +200,94 @@ class ConversationMemory:
             message_text: The actual message
             function_calls: JSON of function calls made (if any)
             metadata: Additional metadata
+            force_embed: Embed even system/short messages normally skipped
             
         Returns:
             conversation_id (int)
         """
+        return self._store_sync(user_id, session_id, role, message_text, function_calls, metadata, force_embed)
+    
+    def store_conversation_async(
+        self,
+        user_id: str,
+        session_id: str,
+        role: str,
+        message_text: str,
+        function_calls: Optional[Dict] = None,
+        metadata: Optional[Dict] = None,
+        force_embed: bool = False
+    ) -> Future:
+        """
+        Store a conversation message on the background embedding pool
+        
+        Never blocks (safe to call from async endpoints). The message is
+        timestamped now, so turns keep their order however the pool
+        commits them. With EMBED_MAX_PENDING stores already queued, the
+        message is stored without an embedding rather than waiting.
+        
+        Returns:
+            Future resolving to the conversation_id (int)
+        """
+        timestamp = datetime.now()
+        if not self._pending.acquire(blocking=False):
+            logger.warning(f"{EMBED_MAX_PENDING} conversation stores pending; storing {role} message without embedding")
+            return self._embed_pool.submit(
+                self._store_sync, user_id, session_id, role, message_text, function_calls, metadata,
+                timestamp=timestamp, embed=False
+            )
+        try:
+            future = self._embed_pool.submit(
+                self._store_sync, user_id, session_id, role, message_text, function_calls, metadata,
+                force_embed, timestamp=timestamp
+            )
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+    
+    def _store_sync(
+        self,
+        user_id: str,
+        session_id: str,
+        role: str,
+        message_text: str,
+        function_calls: Optional[Dict] = None,
+        metadata: Optional[Dict] = None,
+        force_embed: bool = False,
+        timestamp: Optional[datetime] = None,
+        embed: bool = True
+    ) -> int:
+        """Embed and insert a conversation message"""
         try:
-            # Generate embedding
-            embedding = self._generate_embedding(message_text)
+            # System notices and one-word replies are never worth recalling;
+            # leave their embedding NULL (recall skips NULL embeddings)
+            should_embed = embed and (force_embed or (
+                role != "system" and len(message_text or "") >= MIN_EMBED_CHARS
+            ))
+            embedding = None
+            if should_embed:
+                # Generate embedding, stored as halfvec (float16) in Postgres
+                embedding = self._to_pgvector(self._generate_embedding(message_text).astype(np.float16))
             
             with self.get_db_session() as session:
                 result = session.execute(
                     text("""
                         INSERT INTO conversations 
-                        (user_id, session_id, role, message_text, embedding, function_calls, metadata)
-                        VALUES (:user_id, :session_id, :role, :message_text, :embedding, :function_calls, :metadata)
+                        (user_id, session_id, timestamp, role, message_text, embedding, function_calls, metadata)
+                        VALUES (:user_id, :session_id, :timestamp, :role, :message_text, :embedding, :function_calls, :metadata)
                         RETURNING id
                     """),
                     {
                         "user_id": user_id,
                         "session_id": session_id,
+                        # Time of the call, not of the insert (async stores commit out of order)
+                        "timestamp": timestamp or datetime.now(),
                         "role": role,
                         "message_text": message_text,
-                        "embedding": str(embedding),  # pgvector format
-                        "function_calls": function_calls,
-                        "metadata": metadata
+                        "embedding": embedding,
+                        "function_calls": orjson.dumps(function_calls).decode() if function_calls is not None else None,
+                        "metadata": orjson.dumps(metadata).decode() if metadata is not None else None
                     }
                 )
                 conv_id = result.scalar()
@@ -125,26 +317,35 @@ class ConversationMemory:
             List of matching conversations with similarity scores
         """
         try:
-            # Generate query embedding
+            # Generate query embedding (kept float32, cast to halfvec server-side)
             query_embedding = self._generate_embedding(query)
             
             with self.get_db_session() as session:
                 results = session.execute(
+                    # Nearest rows first (ORDER BY matches the index operator),
+                    # distance computed once per row, threshold applied after
                     text("""
-                        SELECT 
-                            id, role, message_text, timestamp,
-                            function_calls, metadata,
-                            1 - (embedding <=> :query_embedding::vector) as similarity
-                        FROM conversations
-                        WHERE user_id = :user_id
-                          AND embedding IS NOT NULL
-                          AND (1 - (embedding <=> :query_embedding::vector)) > :threshold
-                        ORDER BY similarity DESC
-                        LIMIT :limit
+                        WITH scored AS (
+                            SELECT 
+                                id, role, message_text, timestamp,
+                                function_calls, metadata,
+                                embedding <=> CAST(:query_embedding AS halfvec(384)) as distance
+                            FROM conversations
+                            WHERE user_id = :user_id
+                              AND embedding IS NOT NULL
+                            ORDER BY embedding <=> CAST(:query_embedding AS halfvec(384))
+                            LIMIT :limit
+                        )
+                        SELECT id, role, message_text, timestamp,
+                               function_calls, metadata,
+                               1 - distance as similarity
+                        FROM scored
+                        WHERE 1 - distance > :threshold
+                        ORDER BY distance
                     """),
                     {
                         "user_id": user_id,
-                        "query_embedding": str(query_embedding),
+                        "query_embedding": self._to_pgvector(query_embedding),
                         "threshold": similarity_threshold,
                         "limit": limit
                     }
@@ -176,37 +377,44 @@ class ConversationMemory:
     ) -> List[Dict[str, Any]]:
         """Get all messages from a specific session"""
         try:
-            with self.get_db_session() as session:
-                query = """
-                    SELECT id, role, message_text, timestamp, function_calls, metadata
-                    FROM conversations
-                    WHERE user_id = :user_id AND session_id = :session_id
-                    ORDER BY timestamp ASC
-                """
-                if limit:
-                    query += f" LIMIT {limit}"
-                
-                results = session.execute(
-                    text(query),
-                    {"user_id": user_id, "session_id": session_id}
-                )
-                
-                history = []
-                for row in results:
-                    history.append({
-                        "id": row.id,
-                        "role": row.role,
-                        "message": row.message_text,
-                        "timestamp": row.timestamp.isoformat(),
-                        "function_calls": row.function_calls,
-                        "metadata": row.metadata
-                    })
-                
-                return history
+            return list(self.iter_session_history(user_id, session_id, limit))
         except Exception as e:
             logger.error(f"Error getting session history: {e}")
             return []
     
+    def iter_session_history(
+        self,
+        user_id: str,
+        session_id: str,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream messages from a specific session without building a list"""
+        with self.get_db_session() as session:
+            query = """
+                SELECT id, role, message_text, timestamp, function_calls, metadata
+                FROM conversations
+                WHERE user_id = :user_id AND session_id = :session_id
+                ORDER BY timestamp ASC
+            """
+            if limit:
+                query += f" LIMIT {limit}"
+            
+            results = session.execute(
+                text(query),
+                {"user_id": user_id, "session_id": session_id},
+                execution_options={"stream_results": True}
+            ).yield_per(STREAM_BATCH_SIZE)
+            
+            for row in results:
+                yield {
+                    "id": row.id,
+                    "role": row.role,
+                    "message": row.message_text,
+                    "timestamp": row.timestamp.isoformat(),
+                    "function_calls": row.function_calls,
+                    "metadata": row.metadata
+                }
+    
     def get_recent_conversations(
         self,
         user_id: str,
@@ -215,35 +423,42 @@ class ConversationMemory:
     ) -> List[Dict[str, Any]]:
         """Get recent conversations for a user"""
         try:
-            with self.get_db_session() as session:
-                results = session.execute(
-                    text("""
-                        SELECT id, session_id, role, message_text, timestamp, function_calls
-                        FROM conversations
-                        WHERE user_id = :user_id
-                          AND timestamp > NOW() - INTERVAL ':days days'
-                        ORDER BY timestamp DESC
-                        LIMIT :limit
-                    """),
-                    {"user_id": user_id, "days": days, "limit": limit}
-                )
-                
-                conversations = []
-                for row in results:
-                    conversations.append({
-                        "id": row.id,
-                        "session_id": str(row.session_id),
-                        "role": row.role,
-                        "message": row.message_text,
-                        "timestamp": row.timestamp.isoformat(),
-                        "function_calls": row.function_calls
-                    })
-                
-                return conversations
+            return list(self.iter_recent_conversations(user_id, days, limit))
         except Exception as e:
             logger.error(f"Error getting recent conversations: {e}")
             return []
     
+    def iter_recent_conversations(
+        self,
+        user_id: str,
+        days: int = 7,
+        limit: int = 50
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream recent conversations for a user without building a list"""
+        with self.get_db_session() as session:
+            results = session.execute(
+                text("""
+                    SELECT id, session_id, role, message_text, timestamp, function_calls
+                    FROM conversations
+                    WHERE user_id = :user_id
+                      AND timestamp > NOW() - INTERVAL ':days days'
+                    ORDER BY timestamp DESC
+                    LIMIT :limit
+                """),
+                {"user_id": user_id, "days": days, "limit": limit},
+                execution_options={"stream_results": True}
+            ).yield_per(STREAM_BATCH_SIZE)
+            
+            for row in results:
+                yield {
+                    "id": row.id,
+                    "session_id": str(row.session_id),
+                    "role": row.role,
+                    "message": row.message_text,
+                    "timestamp": row.timestamp.isoformat(),
+                    "function_calls": row.function_calls
+                }
+    
     def search_by_keyword(
         self,
         user_id: str,
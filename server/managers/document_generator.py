@@ -2,9 +2,10 @@
 Document Generator - PowerPoint, Memos, and Drawings
 Location: server/managers/document_generator.py
 """
+import functools
 import logging
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -23,6 +24,35 @@ DATA_DIR = Path(os.path.expanduser("~/Library/Application Support/ExecutiveAssis
 DOCS_DIR = DATA_DIR / "documents"
 TEMPLATES_DIR = DATA_DIR / "templates"
 
+DRAWING_FONT_PATH = "/System/Library/Fonts/Helvetica.ttc"
+
+# Slide size and content-slide geometry (left, top, width, height) and font sizes
+SLIDE_WIDTH = Inches(10)
+SLIDE_HEIGHT = Inches(7.5)
+SLIDE_TITLE_BOX = (Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+SLIDE_CONTENT_BOX = (Inches(0.5), Inches(1.75), Inches(9), Inches(5))
+SLIDE_TITLE_SIZE = Pt(32)
+SLIDE_CONTENT_SIZE = Pt(18)
+MEMO_MARGIN = DocxInches(1)
+
+
+@functools.lru_cache(maxsize=1)
+def _drawing_fonts() -> Tuple[Any, Any]:
+    """(body, title) fonts for PNG drawings, loaded from disk once per process"""
+    try:
+        return ImageFont.truetype(DRAWING_FONT_PATH, 24), ImageFont.truetype(DRAWING_FONT_PATH, 32)
+    except Exception:
+        default = ImageFont.load_default()
+        return default, default
+
+
+def _iter_paragraphs(content: str) -> Iterator[str]:
+    """Stripped, non-empty paragraphs of text separated by blank lines"""
+    for para in content.split('\n\n'):
+        stripped = para.strip()
+        if stripped:
+            yield stripped
+
 
 class DocumentGenerator:
     """Generates PowerPoint presentations, memos, and drawings"""
@@ -50,27 +80,31 @@ class DocumentGenerator:
             Created presentation info
         """
         try:
+            now = datetime.now()
             prs = Presentation()
             
             # Set slide size (16:9)
-            prs.slide_width = Inches(10)
-            prs.slide_height = Inches(7.5)
+            prs.slide_width = SLIDE_WIDTH
+            prs.slide_height = SLIDE_HEIGHT
             
-            # Title slide
+            # Layouts resolved once, not per slide
             title_slide_layout = prs.slide_layouts[0]
+            bullet_slide_layout = prs.slide_layouts[1]
+            content_slide_layout = prs.slide_layouts[5]  # Blank layout
+            
+            # Title slide
             slide = prs.slides.add_slide(title_slide_layout)
             title_shape = slide.shapes.title
             subtitle = slide.placeholders[1]
             
             title_shape.text = title
-            subtitle.text = f"Generated by Executive Assistant\n{datetime.now().strftime('%B %d, %Y')}"
+            subtitle.text = f"Generated by Executive Assistant\n{now.strftime('%B %d, %Y')}"
             
             # Content slides
             for slide_data in slides:
                 # Choose layout based on content type
                 if "bullets" in slide_data:
                     # Bullet point layout
-                    bullet_slide_layout = prs.slide_layouts[1]
                     slide = prs.slides.add_slide(bullet_slide_layout)
                     
                     title_shape = slide.shapes.title
@@ -92,32 +126,21 @@ class DocumentGenerator:
                         
                 elif "content" in slide_data:
                     # Title and content layout
-                    content_slide_layout = prs.slide_layouts[5]  # Blank layout
                     slide = prs.slides.add_slide(content_slide_layout)
                     
                     # Add title
-                    left = Inches(0.5)
-                    top = Inches(0.5)
-                    width = Inches(9)
-                    height = Inches(1)
-                    
-                    title_box = slide.shapes.add_textbox(left, top, width, height)
+                    title_box = slide.shapes.add_textbox(*SLIDE_TITLE_BOX)
                     title_frame = title_box.text_frame
                     title_frame.text = slide_data.get("title", "")
-                    title_frame.paragraphs[0].font.size = Pt(32)
+                    title_frame.paragraphs[0].font.size = SLIDE_TITLE_SIZE
                     title_frame.paragraphs[0].font.bold = True
                     
                     # Add content
-                    left = Inches(0.5)
-                    top = Inches(1.75)
-                    width = Inches(9)
-                    height = Inches(5)
-                    
-                    content_box = slide.shapes.add_textbox(left, top, width, height)
+                    content_box = slide.shapes.add_textbox(*SLIDE_CONTENT_BOX)
                     content_frame = content_box.text_frame
                     content_frame.text = slide_data["content"]
                     content_frame.word_wrap = True
-                    content_frame.paragraphs[0].font.size = Pt(18)
+                    content_frame.paragraphs[0].font.size = SLIDE_CONTENT_SIZE
             
             # Save presentation
             filename = self._sanitize_filename(title) + ".pptx"
@@ -132,7 +155,7 @@ class DocumentGenerator:
                 "filename": filename,
                 "path": str(filepath),
                 "slide_count": len(prs.slides),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             
         except Exception as e:
@@ -153,15 +176,16 @@ class DocumentGenerator:
             Created memo info
         """
         try:
+            now = datetime.now()
             doc = Document()
             
             # Set margins
             sections = doc.sections
             for section in sections:
-                section.top_margin = DocxInches(1)
-                section.bottom_margin = DocxInches(1)
-                section.left_margin = DocxInches(1)
-                section.right_margin = DocxInches(1)
+                section.top_margin = MEMO_MARGIN
+                section.bottom_margin = MEMO_MARGIN
+                section.left_margin = MEMO_MARGIN
+                section.right_margin = MEMO_MARGIN
             
             # Title
             title = doc.add_heading('MEMORANDUM', 0)
@@ -182,7 +206,7 @@ class DocumentGenerator:
             
             date_para = doc.add_paragraph()
             date_para.add_run('DATE: ').bold = True
-            date_para.add_run(datetime.now().strftime('%B %d, %Y'))
+            date_para.add_run(now.strftime('%B %d, %Y'))
             
             subject_para = doc.add_paragraph()
             subject_para.add_run('SUBJECT: ').bold = True
@@ -193,12 +217,9 @@ class DocumentGenerator:
             
             doc.add_paragraph()
             
-            # Body content
-            # Split content into paragraphs
-            paragraphs = content.split('\n\n')
-            for para_text in paragraphs:
-                if para_text.strip():
-                    doc.add_paragraph(para_text.strip())
+            # Body content, one paragraph per blank-line-separated block
+            for para_text in _iter_paragraphs(content):
+                doc.add_paragraph(para_text)
             
             # Save document
             filename = self._sanitize_filename(f"memo_{subject}") + ".docx"
@@ -212,7 +233,7 @@ class DocumentGenerator:
                 "subject": subject,
                 "filename": filename,
                 "path": str(filepath),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             
         except Exception as e:
@@ -253,13 +274,8 @@ class DocumentGenerator:
             img = Image.new('RGB', (width, height), color='white')
             draw = ImageDraw.Draw(img)
             
-            # Try to load a font, fall back to default
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-                title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 32)
-            except:
-                font = ImageFont.load_default()
-                title_font = ImageFont.load_default()
+            # Helvetica if available, else PIL's default font
+            font, title_font = _drawing_fonts()
             
             # Draw title
             draw.text((20, 20), "Drawing", fill='black', font=title_font)
@@ -3,22 +3,48 @@ Updated Email Manager with multi-connector support
 Location: server/managers/email_manager.py (REPLACE EXISTING)
 """
 import logging
-import json
 import os
-from typing import Dict, Any, List, Optional
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 from server.managers.account_manager import AccountManager
 from server.spam_detector import SpamDetector
-from server.llm.ollama_adapter import OllamaAdapter
+from server.llm.ollama_adapter import OllamaAdapter, LLM_MAX_IN_FLIGHT, LLM_SLOTS
 
 logger = logging.getLogger("email_manager")
 
 # Data paths
 DATA_DIR = Path(os.path.expanduser("~/Library/Application Support/ExecutiveAssistant/data"))
+SENDER_DB_FILE = DATA_DIR / "intelligence" / "sender_history.db"
+# Legacy JSON history, imported into SENDER_DB_FILE on first run
 LEARNING_FILE = DATA_DIR / "intelligence" / "sender_history.json"
 
+# Upper bound on accounts processed concurrently (IMAP work is network bound)
+MAX_ACCOUNT_WORKERS = 16
+# Seconds to wait on one account's connection release during cleanup
+CONNECTOR_RELEASE_TIMEOUT = 5
+# Message IDs per delete request, keeps UID lists under server command limits
+SPAM_DELETE_BATCH_SIZE = 100
+# Sender history rows kept in memory
+SENDER_CACHE_SIZE = 4096
+SENDER_QUERY_CHUNK = 500
+# Learned categories buffered before an automatic flush
+SENDER_FLUSH_THRESHOLD = 200
+# Senders whose recent (subject -> category) decisions are remembered
+CATEGORY_CACHE_SIZE = 1024
+# Emails per LLM request in categorize_all_accounts
+CATEGORIZE_BATCH_SIZE = 15
+
 # Email categories (18 total)
 EMAIL_CATEGORIES = [
     "Priority",
@@ -41,35 +67,219 @@ EMAIL_CATEGORIES = [
     "Inbox"
 ]
 
+# Finds every category name inside a lowercased folder name in one scan; the
+# lookahead lets overlapping names all match
+_FOLDER_CATEGORY_RE = re.compile(
+    "(?=(" + "|".join(re.escape(c.lower()) for c in EMAIL_CATEGORIES) + "))"
+)
+_CATEGORY_BY_LOWER = {c.lower(): c for c in EMAIL_CATEGORIES}
+# O(1) validation of model answers
+_CATEGORY_SET = frozenset(EMAIL_CATEGORIES)
+# Token budget for one category name; a token covers at least one character,
+# so the longest name's length is a safe upper bound
+_CATEGORY_MAX_TOKENS = max(len(c) for c in EMAIL_CATEGORIES)
+
+# Cheap rule-based categories, checked before falling back to the LLM
+_NEWSLETTER_RE = re.compile(r'unsubscribe|mailing list|view in browser|newsletter', re.I)
+_RECEIPT_RE = re.compile(r'order (#|confirmation)|receipt|invoice|your (payment|purchase)', re.I)
+_SOCIAL_RE = re.compile(r'facebook|linkedin|instagram|twitter|\bx\.com|tiktok', re.I)
+
+# Subject keywords -> tag, all matched in a single scan of the subject
+_SUBJECT_KEYWORDS = {
+    "urgent": "urgent",
+    "asap": "urgent",
+    "important": "urgent",
+    "action required": "urgent",
+    "immediate": "urgent",
+    "invite": "invite",
+    "meeting": "meeting",
+}
+_SUBJECT_KEYWORD_RE = re.compile("|".join(re.escape(k) for k in _SUBJECT_KEYWORDS))
+
+# Attachment extensions that decide a category on their own
+_PHOTO_EXTS = frozenset({"jpg", "jpeg", "png", "gif", "mp4", "mov"})
+_DOC_EXTS = frozenset({"docx", "pptx", "xlsx", "pdf"})
+
+# Leading "1." / "2)" numbering on batch categorization answers
+_LIST_NUMBER_RE = re.compile(r'^\s*\d+\s*[.):-]?\s*')
+
+# Body characters included per email in categorization prompts
+PROMPT_PREVIEW_CHARS = 200
+
+# Static part of the categorization prompt
+_PROMPT_PREFIX = f"""Categorize this email into ONE of these categories:
+{', '.join(EMAIL_CATEGORIES)}
+
+Email details:
+"""
+
+
+def _subject_tags(subject: str) -> set:
+    """Tags of all _SUBJECT_KEYWORDS found in a lowercased subject"""
+    return {_SUBJECT_KEYWORDS[m.group(0)] for m in _SUBJECT_KEYWORD_RE.finditer(subject)}
+
+
+def _priority_kernel_numpy(urgent, meeting, reply, boosted) -> np.ndarray:
+    """Priority scores from per-email feature flags"""
+    scores = 5.0 + 3.0 * boosted + 2.0 * urgent + 1.5 * meeting + 1.0 * reply
+    return np.minimum(scores, 10.0)
+
+
+def _compile_priority_kernel():
+    """JIT-compile the priority kernel with numba, or fall back to numpy (numba is optional)"""
+    try:
+        from numba import njit
+    except Exception:
+        return _priority_kernel_numpy
+
+    # Serial on purpose: batches are ~50 emails, and parallel=True would use numba's
+    # workqueue threading layer (no TBB/OpenMP on macOS), which aborts the process
+    # when the per-account threads enter the kernel concurrently
+    @njit(fastmath=True, cache=True)
+    def kernel(urgent, meeting, reply, boosted):
+        n = urgent.shape[0]
+        out = np.empty(n, np.float64)
+        for i in range(n):
+            s = 5.0 + 3.0 * boosted[i] + 2.0 * urgent[i] + 1.5 * meeting[i] + 1.0 * reply[i]
+            out[i] = s if s < 10.0 else 10.0
+        return out
+    return kernel
+
+
+# numba takes ~0.2s to import, so it is only loaded the first time scores are needed
+_priority_kernel = None
+_priority_kernel_lock = threading.Lock()
+
+
+def _get_priority_kernel():
+    """The priority kernel, compiled on first use"""
+    global _priority_kernel
+    if _priority_kernel is None:
+        with _priority_kernel_lock:
+            if _priority_kernel is None:
+                _priority_kernel = _compile_priority_kernel()
+    return _priority_kernel
+
 
 class EmailManager:
     """Manages all email operations across multiple accounts"""
     
-    def __init__(self):
+    # Category routing only has to pick one of 18 labels; drafting needs the larger model
+    _CLASSIFY_MODEL = "qwen2.5:0.5b-instruct"
+    _DRAFT_MODEL = "qwen2.5:7b-instruct"
+    # Greedy, short decoding so the classifier answers with just a category name
+    _CLASSIFY_OPTIONS = {"num_predict": _CATEGORY_MAX_TOKENS, "temperature": 0.0, "stop": ["\n"]}
+    
+    def __init__(self, classify_model: Optional[str] = None, draft_model: Optional[str] = None):
+        self.classify_model = classify_model or self._CLASSIFY_MODEL
+        self.draft_model = draft_model or self._DRAFT_MODEL
         self.account_mgr = AccountManager()
         self.spam_detector = SpamDetector()
         self.ollama = OllamaAdapter()
-        self.sender_history = self._load_sender_history()
+        # Guards the sender history DB and cache when accounts are processed in parallel
+        self._history_lock = threading.RLock()
+        self._sender_db = self._open_sender_db()
+        # sender -> history row (or None), dropped whenever the sender is updated
+        self._sender_cache: Dict[str, Optional[Dict]] = {}
+        # (sender, category) pairs learned since the last _flush_sender_history
+        self._pending_learns: List[Tuple[str, str]] = []
+        # sender -> {subject hash: category}, LRU by sender, dropped when the sender's history is written
+        self._category_cache: "OrderedDict[str, Dict[int, str]]" = OrderedDict()
         
+    def _open_sender_db(self) -> sqlite3.Connection:
+        """Open (and create if needed) the sender history database"""
+        try:
+            SENDER_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(SENDER_DB_FILE), isolation_level=None, check_same_thread=False)
+        except Exception as e:
+            logger.error(f"Error opening sender history DB, using in-memory history: {e}")
+            db = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS sender_history (
+                sender TEXT PRIMARY KEY,
+                category TEXT,
+                confidence REAL DEFAULT 0.5,
+                count INTEGER DEFAULT 1,
+                priority_boost INTEGER DEFAULT 0
+            )
+        """)
+        
+        if db.execute("SELECT 1 FROM sender_history LIMIT 1").fetchone() is None:
+            legacy = self._load_sender_history()
+            if legacy:
+                db.executemany(
+                    "INSERT OR IGNORE INTO sender_history VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (sender, h.get("category"), h.get("confidence", 0.5),
+                         h.get("count", 1), 1 if h.get("priority_boost") else 0)
+                        for sender, h in legacy.items()
+                    ]
+                )
+                logger.info(f"Imported {len(legacy)} senders from {LEARNING_FILE.name}")
+        
+        return db
+    
     def _load_sender_history(self) -> Dict:
-        """Load sender history for learning"""
+        """Load legacy JSON sender history (read once, when migrating it into the DB)"""
         try:
-            if LEARNING_FILE.exists():
-                with open(LEARNING_FILE, 'r') as f:
-                    return json.load(f)
-            return {}
+            if not LEARNING_FILE.exists():
+                return {}
+            with open(LEARNING_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         except Exception as e:
             logger.error(f"Error loading sender history: {e}")
             return {}
     
-    def _save_sender_history(self):
-        """Save updated sender history"""
-        try:
-            LEARNING_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(LEARNING_FILE, 'w') as f:
-                json.dump(self.sender_history, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving sender history: {e}")
+    def _get_sender_history(self, sender: str) -> Optional[Dict]:
+        """Learned history for a sender, or None if never seen"""
+        return self._get_sender_histories([sender])[sender]
+    
+    def _get_sender_histories(self, senders: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Learned history for several senders, reading uncached ones in one query
+        
+        Args:
+            senders: Lowercased sender addresses (duplicates allowed)
+            
+        Returns:
+            sender -> history dict, or None if never seen
+        """
+        with self._history_lock:
+            found = {}
+            missing = []
+            for sender in set(senders):
+                if sender in self._sender_cache:
+                    found[sender] = self._sender_cache[sender]
+                else:
+                    missing.append(sender)
+            
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(missing), SENDER_QUERY_CHUNK):
+                chunk = missing[start:start + SENDER_QUERY_CHUNK]
+                rows = self._sender_db.execute(
+                    "SELECT sender, category, confidence, count, priority_boost FROM sender_history "
+                    f"WHERE sender IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for sender in chunk:
+                    found[sender] = None
+                for row in rows:
+                    found[row[0]] = {
+                        "category": row[1],
+                        "confidence": row[2],
+                        "count": row[3],
+                        "priority_boost": bool(row[4])
+                    }
+            
+            if missing:
+                if len(self._sender_cache) + len(missing) > SENDER_CACHE_SIZE:
+                    self._sender_cache.clear()
+                for sender in missing:
+                    self._sender_cache[sender] = found[sender]
+            return found
 
     def get_primary_account(self) -> str:
         """Get the primary email account for sending"""
@@ -95,64 +305,63 @@ class EmailManager:
         Returns:
             Category name
         """
+        category = self._cached_category(email)
+        if category:
+            return category
+        category = self._categorize_by_rules(email)
+        if category:
+            self._remember_category(email, category)
+            return category
+        return self._categorize_by_llm(email)
+    
+    def _cached_category(self, email: Dict) -> Optional[str]:
+        """Category already decided for this sender and subject, if any"""
         sender = email.get("from", "").lower()
-        subject = email.get("subject", "").lower()
-        
-        # Check if spam
-        spam_result = self.spam_detector.categorize_email(email)
-        if spam_result.get("category") == "spam":
-            return "Spam"
-        
-        # Check learned patterns
-        if sender in self.sender_history:
-            history = self.sender_history[sender]
-            if history.get("category") and history.get("confidence", 0) > 0.8:
-                return history["category"]
-        
-        # Check for calendar invites
-        if "invite" in subject or ".ics" in str(email.get("attachments", [])):
-            return "Calendar_Events"
-        
-        # Check for attachments
-        attachments = email.get("attachments", [])
-        if attachments:
-            extensions = [att.get("filename", "").split(".")[-1].lower() for att in attachments]
-            if any(ext in ["jpg", "jpeg", "png", "gif", "mp4", "mov"] for ext in extensions):
-                return "Photos_Media"
-            if any(ext in ["docx", "pptx", "xlsx", "pdf"] for ext in extensions):
-                return "Productivity"
+        with self._history_lock:
+            by_subject = self._category_cache.get(sender)
+            if by_subject is None:
+                return None
+            self._category_cache.move_to_end(sender)
+            return by_subject.get(hash(email.get("subject", "").lower()[:64]))
+    
+    def _remember_category(self, email: Dict, category: str):
+        """Cache a decided category for repeat sender/subject pairs (newsletters, notifications)"""
+        sender = email.get("from", "").lower()
+        with self._history_lock:
+            by_subject = self._category_cache.get(sender)
+            if by_subject is None:
+                by_subject = self._category_cache[sender] = {}
+            else:
+                self._category_cache.move_to_end(sender)
+            by_subject[hash(email.get("subject", "").lower()[:64])] = category
+            if len(self._category_cache) > CATEGORY_CACHE_SIZE:
+                self._category_cache.popitem(last=False)
+    
+    def _categorize_by_llm(self, email: Dict) -> str:
+        """
+        Categorize a single email with the LLM (no rule checks)
         
-        # Use AI for categorization
-        prompt = f"""Categorize this email into ONE of these categories:
-{', '.join(EMAIL_CATEGORIES)}
-
-Email details:
-From: {email.get('from', '')}
+        Args:
+            email: Email dict
+            
+        Returns:
+            Category name ("Inbox" if the model's answer is unusable)
+        """
+        prompt = _PROMPT_PREFIX + f"""From: {email.get('from', '')}
 Subject: {email.get('subject', '')}
-Preview: {email.get('body', '')[:200]}
+Preview: {(email.get('body') or '')[:PROMPT_PREVIEW_CHARS]}
 
 Respond with ONLY the category name, nothing else."""
         
         try:
-            response = self.ollama.generate("qwen2.5:7b-instruct", prompt)
+            with LLM_SLOTS:
+                response = self.ollama.generate(self.classify_model, prompt, options=self._CLASSIFY_OPTIONS)
             category = response.strip()
             
             # Validate category
-            if category in EMAIL_CATEGORIES:
-                # Update learning
-                if sender not in self.sender_history:
-                    self.sender_history[sender] = {
-                        "category": category,
-                        "confidence": 0.5,
-                        "count": 1
-                    }
-                else:
-                    hist = self.sender_history[sender]
-                    if hist.get("category") == category:
-                        hist["confidence"] = min(1.0, hist["confidence"] + 0.1)
-                        hist["count"] = hist.get("count", 0) + 1
-                
-                self._save_sender_history()
+            if category in _CATEGORY_SET:
+                self._learn_sender_category(email.get("from", "").lower(), category)
+                self._remember_category(email, category)
                 return category
             
         except Exception as e:
@@ -161,41 +370,252 @@ Respond with ONLY the category name, nothing else."""
         # Default to Inbox
         return "Inbox"
     
-    def _calculate_priority_score(self, email: Dict) -> float:
+    def _categorize_emails_batch(self, emails: List[Dict],
+                                 spam_categories: Optional[List[Optional[str]]] = None) -> List[str]:
         """
-        Calculate priority score (0-10) for an email
+        Categorize several emails with at most one LLM request
+        
+        Cached decisions and cheap rules run first, then one batched spam check
+        on what is left; only the remaining emails are sent to the model,
+        numbered, in a single prompt.
+        
+        Args:
+            emails: Email dicts
+            spam_categories: Known SpamDetector categories, one per email; skips the spam check
+            
+        Returns:
+            Category names, in the same order as emails
+        """
+        categories = [self._cached_category(email) for email in emails]
+        uncached = [i for i, category in enumerate(categories) if category is None]
+        
+        if uncached:
+            histories = self._get_sender_histories([emails[i].get("from", "").lower() for i in uncached])
+            for i in uncached:
+                categories[i] = self._cheap_rules(emails[i], histories)
+                if categories[i]:
+                    self._remember_category(emails[i], categories[i])
+        
+        undecided = [i for i in uncached if categories[i] is None]
+        if undecided:
+            if spam_categories is None:
+                spam_results = self.spam_detector.batch_categorize([emails[i] for i in undecided])
+                verdicts = [spam_result.get("category") for spam_result in spam_results]
+            else:
+                verdicts = [spam_categories[i] for i in undecided]
+            for i, verdict in zip(undecided, verdicts):
+                if verdict == "spam":
+                    categories[i] = "Spam"
+                    self._remember_category(emails[i], "Spam")
+        residual = [i for i in undecided if categories[i] is None]
+        
+        if residual:
+            entries = "\n".join(
+                f"{n}. From: {emails[i].get('from', '')} | Subject: {emails[i].get('subject', '')} | "
+                f"Preview: {(emails[i].get('body') or '')[:PROMPT_PREVIEW_CHARS]}"
+                for n, i in enumerate(residual, 1)
+            )
+            prompt = f"""Categorize each of the following {len(residual)} emails into ONE of these categories:
+{', '.join(EMAIL_CATEGORIES)}
+
+Emails:
+{entries}
+
+Respond with exactly {len(residual)} lines, one category name per line, in the same order, nothing else."""
+            
+            answers = []
+            try:
+                # One line per email (plus room for numbering), so no newline stop here
+                with LLM_SLOTS:
+                    response = self.ollama.generate(self.classify_model, prompt, options={
+                        "num_predict": (self._CLASSIFY_OPTIONS["num_predict"] + 4) * len(residual),
+                        "temperature": 0.0
+                    })
+                answers = [
+                    _LIST_NUMBER_RE.sub("", line).strip()
+                    for line in response.strip().splitlines() if line.strip()
+                ]
+            except Exception as e:
+                logger.error(f"AI batch categorization failed: {e}")
+            
+            if len(answers) == len(residual):
+                for i, category in zip(residual, answers):
+                    if category in _CATEGORY_SET:
+                        self._learn_sender_category(emails[i].get("from", "").lower(), category)
+                        self._remember_category(emails[i], category)
+                        categories[i] = category
+                    else:
+                        categories[i] = "Inbox"
+            else:
+                # Misaligned answer, categorize the residual individually (concurrently, capped by LLM_SLOTS)
+                logger.warning(f"Batch categorization returned {len(answers)} lines for {len(residual)} emails")
+                with ThreadPoolExecutor(max_workers=min(LLM_MAX_IN_FLIGHT, len(residual))) as pool:
+                    for i, category in zip(residual, pool.map(self._categorize_by_llm, [emails[i] for i in residual])):
+                        categories[i] = category
+        
+        return categories
+    
+    def _categorize_by_rules(self, email: Dict,
+                             histories: Optional[Dict[str, Optional[Dict]]] = None,
+                             spam_category: Optional[str] = None) -> Optional[str]:
+        """
+        Categorize an email without the categorization LLM (cheap rules,
+        then the spam check)
         
         Args:
             email: Email dict
+            histories: Prefetched sender histories from _get_sender_histories
+            spam_category: Precomputed SpamDetector category, skips the per-email check
             
         Returns:
-            Priority score (higher = more urgent)
+            Category name, or None if the email needs the LLM
         """
-        score = 5.0  # Base score
+        category = self._cheap_rules(email, histories)
+        if category:
+            return category
         
+        # Spam detection is itself an LLM call, so it only runs when no rule decided
+        if spam_category is None:
+            spam_category = self.spam_detector.categorize_email(email).get("category")
+        if spam_category == "spam":
+            return "Spam"
+        return None
+    
+    def _cheap_rules(self, email: Dict,
+                     histories: Optional[Dict[str, Optional[Dict]]] = None) -> Optional[str]:
+        """
+        Categorize an email from learned senders, invites, attachments and
+        keyword rules (no model calls)
+        
+        Args:
+            email: Email dict
+            histories: Prefetched sender histories from _get_sender_histories
+            
+        Returns:
+            Category name, or None if undecidable
+        """
         sender = email.get("from", "").lower()
         subject = email.get("subject", "").lower()
+        attachments = email.get("attachments") or ()
         
-        # Check sender history
-        if sender in self.sender_history:
-            history = self.sender_history[sender]
-            if history.get("priority_boost"):
-                score += 3.0
+        # Check learned patterns
+        history = histories[sender] if histories is not None else self._get_sender_history(sender)
+        if history and history["category"] and history["confidence"] > 0.8:
+            return history["category"]
         
-        # Urgency keywords in subject
-        urgent_keywords = ["urgent", "asap", "important", "action required", "immediate"]
-        if any(keyword in subject for keyword in urgent_keywords):
-            score += 2.0
+        # Check for calendar invites
+        if "invite" in _subject_tags(subject) or any(
+            att.get("filename", "").lower().endswith(".ics") for att in attachments
+        ):
+            return "Calendar_Events"
         
-        # Calendar invite
-        if "invite" in subject or "meeting" in subject:
-            score += 1.5
+        # Check for attachments
+        for att in attachments:
+            ext = att.get("filename", "").rpartition(".")[2].lower()
+            if ext in _PHOTO_EXTS:
+                return "Photos_Media"
+            if ext in _DOC_EXTS:
+                return "Productivity"
         
-        # Reply to existing thread (user was engaged)
-        if subject.startswith("re:"):
-            score += 1.0
+        # Rule-based categories avoid an LLM round trip
+        signal = f"{subject} {sender}"
+        if _RECEIPT_RE.search(signal):
+            return "Receipts_Confirmations"
+        if _SOCIAL_RE.search(signal):
+            return "Social_Media"
+        if _NEWSLETTER_RE.search(signal):
+            return "Newsletters"
         
-        return min(10.0, score)
+        return None
+    
+    def _learn_sender_category(self, sender: str, category: str):
+        """Record an AI-assigned category for a sender (written on the next flush)"""
+        with self._history_lock:
+            self._pending_learns.append((sender, category))
+            if len(self._pending_learns) >= SENDER_FLUSH_THRESHOLD:
+                self._flush_sender_history()
+    
+    def _flush_sender_history(self):
+        """Write buffered learned categories in a single transaction"""
+        with self._history_lock:
+            if not self._pending_learns:
+                return
+            pending, self._pending_learns = self._pending_learns, []
+            try:
+                self._sender_db.execute("BEGIN")
+                # New sender starts at 0.5; agreeing with the known category raises confidence
+                self._sender_db.executemany(
+                    """
+                    INSERT INTO sender_history (sender, category, confidence, count)
+                    VALUES (?, ?, 0.5, 1)
+                    ON CONFLICT(sender) DO UPDATE SET
+                        confidence = MIN(1.0, confidence + 0.1),
+                        count = count + 1
+                    WHERE category = excluded.category
+                    """,
+                    pending
+                )
+                self._sender_db.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"Error saving sender history: {e}")
+                if self._sender_db.in_transaction:
+                    self._sender_db.execute("ROLLBACK")
+            for sender, _ in pending:
+                self._sender_cache.pop(sender, None)
+                self._category_cache.pop(sender, None)
+    
+    def _calculate_priority_score(self, email: Dict) -> float:
+        """
+        Calculate priority score (0-10) for an email
+        
+        Args:
+            email: Email dict
+            
+        Returns:
+            Priority score (higher = more urgent)
+        """
+        return float(self._calculate_priority_scores_batch([email])[0])
+    
+    def _calculate_priority_scores_batch(self, emails: List[Dict]) -> np.ndarray:
+        """
+        Calculate priority scores (0-10) for many emails at once
+        
+        Base 5, +3 boosted sender, +2 urgency keyword, +1.5 invite/meeting,
+        +1 reply; keyword checks run as numpy string ops over all subjects,
+        the arithmetic in _priority_kernel (JIT-compiled when numba is installed).
+        
+        Args:
+            emails: Email dicts
+            
+        Returns:
+            float array of scores, aligned with emails
+        """
+        n = len(emails)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        
+        subjects = np.array([email.get("subject", "").lower() for email in emails], dtype=str)
+        senders = [email.get("from", "").lower() for email in emails]
+        
+        urgent = np.zeros(n, dtype=bool)
+        meeting = np.zeros(n, dtype=bool)
+        for keyword, tag in _SUBJECT_KEYWORDS.items():
+            found = np.char.find(subjects, keyword) >= 0
+            if tag == "urgent":
+                urgent |= found
+            else:
+                meeting |= found
+        reply = np.char.startswith(subjects, "re:")
+        boosted = np.isin(np.array(senders, dtype=str), list(self._priority_boost_senders(senders)))
+        
+        return _get_priority_kernel()(urgent, meeting, reply, boosted)
+    
+    def _priority_boost_senders(self, senders: List[str]) -> set:
+        """Subset of senders whose history carries a priority boost"""
+        return {
+            sender for sender, history in self._get_sender_histories(senders).items()
+            if history and history["priority_boost"]
+        }
     
     def check_all_accounts(self) -> Dict[str, Any]:
         """Check all email accounts for new messages"""
@@ -207,52 +627,74 @@ Respond with ONLY the category name, nothing else."""
         }
         
         accounts = self.account_mgr.vault.list_accounts()
+        if not accounts:
+            return results
         
-        for account_id, metadata in accounts.items():
-            try:
-                connector = self.account_mgr.get_connector(account_id, cache=False)
-                success, message = connector.connect()
-                
-                if not success:
-                    results["by_account"][account_id] = {"error": message}
-                    continue
-                
-                # Get new messages
-                emails = connector.preview_emails(count=50, oldest_first=False)
-                connector.disconnect()
-                
-                new_count = len(emails)
-                results["total_new"] += new_count
-                
-                # Categorize and check priority
-                priority_emails = []
-                for email in emails:
-                    category = self._categorize_email(email)
-                    priority_score = self._calculate_priority_score(email)
-                    
-                    if priority_score >= 8.0:
-                        priority_emails.append({
-                            "account": account_id,
-                            "email": metadata.get("email"),
-                            "subject": email.get("subject"),
-                            "from": email.get("from"),
-                            "priority_score": priority_score,
-                            "category": category
-                        })
-                
-                results["by_account"][account_id] = {
-                    "email": metadata.get("email"),
-                    "new_messages": new_count,
-                    "priority_count": len(priority_emails)
-                }
-                results["priority_messages"].extend(priority_emails)
-                
-            except Exception as e:
-                logger.error(f"Error checking account {account_id}: {e}")
-                results["by_account"][account_id] = {"error": str(e)}
+        # Accounts are independent, so overlap their IMAP round trips
+        with ThreadPoolExecutor(max_workers=min(MAX_ACCOUNT_WORKERS, len(accounts))) as pool:
+            futures = {
+                pool.submit(self._check_one, account_id, metadata): account_id
+                for account_id, metadata in accounts.items()
+            }
+            for future in as_completed(futures):
+                account_id = futures[future]
+                try:
+                    account_result, new_count, priority_emails = future.result()
+                    results["by_account"][account_id] = account_result
+                    results["total_new"] += new_count
+                    results["priority_messages"].extend(priority_emails)
+                except Exception as e:
+                    logger.error(f"Error checking account {account_id}: {e}")
+                    results["by_account"][account_id] = {"error": str(e)}
         
+        self._flush_sender_history()
         return results
     
+    def _check_one(self, account_id: str, metadata: Dict) -> Tuple[Dict[str, Any], int, List[Dict]]:
+        """
+        Check a single account for new messages
+        
+        Returns:
+            (account result, new message count, priority emails)
+        """
+        connector, success, message = self.account_mgr.acquire_connector(account_id)
+        
+        if not success:
+            return {"error": message}, 0, []
+        
+        # Get new messages
+        try:
+            emails = connector.preview_emails(count=50, oldest_first=False)
+        finally:
+            self.account_mgr.release_connector(account_id, connector)
+        
+        new_count = len(emails)
+        
+        # Categorize and check priority
+        account_email = metadata.get("email")
+        priority_emails = []
+        priority_scores = self._calculate_priority_scores_batch(emails)
+        categories = []
+        for start in range(0, len(emails), CATEGORIZE_BATCH_SIZE):
+            categories.extend(self._categorize_emails_batch(emails[start:start + CATEGORIZE_BATCH_SIZE]))
+        for email, priority_score, category in zip(emails, priority_scores.tolist(), categories):
+            if priority_score >= 8.0:
+                priority_emails.append({
+                    "account": account_id,
+                    "email": account_email,
+                    "subject": email.get("subject"),
+                    "from": email.get("from"),
+                    "priority_score": priority_score,
+                    "category": category
+                })
+        
+        account_result = {
+            "email": account_email,
+            "new_messages": new_count,
+            "priority_count": len(priority_emails)
+        }
+        return account_result, new_count, priority_emails
+    
     def send_email(self, to: str, subject: str, body: str, 
                   from_account: Optional[str] = None,
                   cc: Optional[List[str]] = None,
@@ -292,14 +734,15 @@ Respond with ONLY the category name, nothing else."""
                 account_id = list(accounts.keys())[0]
             
             # Get connector and send
-            connector = self.account_mgr.get_connector(account_id, cache=False)
-            success, message = connector.connect()
+            connector, success, message = self.account_mgr.acquire_connector(account_id)
             
             if not success:
                 return {"status": "error", "error": message}
             
-            result = connector.send_message(to, subject, body, cc=cc, bcc=bcc)
-            connector.disconnect()
+            try:
+                result = connector.send_message(to, subject, body, cc=cc, bcc=bcc)
+            finally:
+                self.account_mgr.release_connector(account_id, connector)
             
             if result.get("success"):
                 return {
@@ -342,7 +785,7 @@ Context: {context}
 
 Write a clear, professional email. Include appropriate greeting and closing."""
             
-            body = self.ollama.generate(prompt, model="qwen2.5:7b-instruct")
+            body = self.ollama.generate(self.draft_model, prompt)
             
             return {
                 "status": "success",
@@ -390,154 +833,98 @@ Write a clear, professional email. Include appropriate greeting and closing."""
         }
         
         accounts = self.account_mgr.vault.list_accounts()
+        if not accounts:
+            return results
         
-        for account_id, metadata in accounts.items():
-            try:
-                connector = self.account_mgr.get_connector(account_id, cache=False)
-                success, message = connector.connect()
-                
-                if not success:
+        with ThreadPoolExecutor(max_workers=min(MAX_ACCOUNT_WORKERS, len(accounts))) as pool:
+            futures = {
+                pool.submit(self._categorize_one, account_id): account_id
+                for account_id in accounts
+            }
+            for future in as_completed(futures):
+                account_id = futures[future]
+                try:
+                    account_results = future.result()
+                except Exception as e:
+                    logger.error(f"Error categorizing account {account_id}: {e}")
                     continue
                 
-                # Get inbox messages
-                emails = connector.preview_emails(count=100, oldest_first=True)
-                
-                account_results = {cat: 0 for cat in EMAIL_CATEGORIES}
-                
-                for email in emails:
-                    category = self._categorize_email(email)
-                    results["by_category"][category] += 1
-                    account_results[category] += 1
-                    results["total_categorized"] += 1
-                    
-                    # Move to folder if connector supports it
-                    if hasattr(connector, 'move_to_folder') and category != "Inbox":
-                        try:
-                            connector.move_to_folder([email["id"]], category)
-                        except Exception as e:
-                            logger.warning(f"Failed to move email to {category}: {e}")
-                
-                connector.disconnect()
+                if account_results is None:
+                    continue
                 
+                for category, count in account_results.items():
+                    results["by_category"][category] += count
+                categorized = sum(account_results.values())
+                results["total_categorized"] += categorized
                 results["by_account"][account_id] = {
-                    "email": metadata.get("email"),
-                    "categorized": sum(account_results.values()),
+                    "email": accounts[account_id].get("email"),
+                    "categorized": categorized,
                     "by_category": account_results
                 }
-                
-            except Exception as e:
-                logger.error(f"Error categorizing account {account_id}: {e}")
         
+        self._flush_sender_history()
         return results
-    def ensure_folders_exist(self, account_id: str) -> Dict[str, Any]:
+    
+    def _categorize_one(self, account_id: str) -> Optional[Dict[str, int]]:
         """
-        Create email folders/labels for all categories if they don't exist
-        Works with IMAP (Yahoo, Apple, Comcast) - creates folders
-        Gmail/Hotmail use labels (handled differently)
+        Categorize and file the inbox of a single account
         
-        Args:
-            account_id: Email account to set up folders for
-            
         Returns:
-            {
-                "status": "success"|"error",
-                "account_id": str,
-                "folders_created": [list of new folders],
-                "folders_existing": [list of existing folders],
-                "provider": "yahoo"|"gmail"|etc
-            }
+            Per-category counts, or None if the account could not connect
         """
+        connector, success, message = self.account_mgr.acquire_connector(account_id)
+        
+        if not success:
+            return None
+        
         try:
-            connector = self.account_mgr.get_connector(account_id)
-            success, msg = connector.connect()
+            # Get inbox messages
+            emails = connector.preview_emails(count=100, oldest_first=True)
             
-            if not success:
-                return {"status": "error", "error": msg}
-            
-            provider = connector.provider if hasattr(connector, 'provider') else 'unknown'
+            account_results = {cat: 0 for cat in EMAIL_CATEGORIES}
             
-            # Get existing folders
-            if hasattr(connector, 'list_folders'):
-                existing_folders = connector.list_folders()
-            else:
-                # Fallback for connectors without list_folders
-                try:
-                    import imaplib
-                    if hasattr(connector, 'imap'):
-                        _, folder_list = connector.imap.list()
-                        existing_folders = [f.decode().split('"')[-2] for f in folder_list]
-                    else:
-                        existing_folders = []
-                except:
-                    existing_folders = []
+            # Moves run on their own thread so IMAP work on one batch overlaps
+            # the LLM categorizing the next
+            move_q: "queue.Queue[Optional[Tuple[str, List[str]]]]" = queue.Queue()
+            mover = threading.Thread(
+                target=self._move_worker, args=(connector, move_q),
+                name=f"move-{account_id}", daemon=True
+            )
+            mover.start()
             
-            folders_created = []
-            folders_existing = []
-            
-            # Create folders for each category (except Inbox - that always exists)
-            for category in EMAIL_CATEGORIES:
-                if category == "Archive":
-                    continue  # Archive is usually built-in
-                
-                # Check if folder exists (case-insensitive)
-                folder_exists = any(category.lower() in str(f).lower() for f in existing_folders)
-                
-                if folder_exists:
-                    folders_existing.append(category)
-                else:
-                    # Create folder
-                    try:
-                        if hasattr(connector, 'create_folder'):
-                            connector.create_folder(category)
-                        elif hasattr(connector, 'imap'):
-                            # Direct IMAP folder creation
-                            connector.imap.create(category)
-                        folders_created.append(category)
-                        logger.info(f"Created folder: {category} in {account_id}")
-                    except Exception as e:
-                        logger.warning(f"Could not create folder {category}: {e}")
-            
-            connector.disconnect()
-            
-            return {
-                "status": "success",
-                "account_id": account_id,
-                "provider": provider,
-                "folders_created": folders_created,
-                "folders_existing": folders_existing,
-                "total_folders": len(EMAIL_CATEGORIES),
-                "message": f"Setup complete: {len(folders_created)} folders created, {len(folders_existing)} already existed"
-            }
-            
-        except Exception as e:
-            logger.error(f"Folder setup error for {account_id}: {e}")
-            return {
-                "status": "error",
-                "account_id": account_id,
-                "error": str(e)
-            }
-    
-    
-    def setup_all_accounts(self) -> Dict[str, Any]:
-        """
-        Ensure folders exist for ALL configured accounts
-        Run this on first launch or when adding new accounts
-        """
-        accounts = self.account_mgr.vault.list_accounts()
-        results = []
-        
-        for account_id in accounts:
-            result = self.ensure_folders_exist(account_id)
-            results.append(result)
-        
-        total_created = sum(len(r.get('folders_created', [])) for r in results)
+            try:
+                for start in range(0, len(emails), CATEGORIZE_BATCH_SIZE):
+                    batch = emails[start:start + CATEGORIZE_BATCH_SIZE]
+                    to_move: Dict[str, List[str]] = {}
+                    for email, category in zip(batch, self._categorize_emails_batch(batch)):
+                        account_results[category] += 1
+                        if category != "Inbox":
+                            to_move.setdefault(category, []).append(email["id"])
+                    
+                    # Move to folders, one command per folder
+                    for category, ids in to_move.items():
+                        move_q.put((category, ids))
+            finally:
+                move_q.put(None)
+                mover.join()
+        finally:
+            self.account_mgr.release_connector(account_id, connector)
         
-        return {
-            "status": "success",
-            "accounts_processed": len(accounts),
-            "total_folders_created": total_created,
-            "results": results
-        }
+        return account_results
+
+    @staticmethod
+    def _move_worker(connector, move_q: "queue.Queue[Optional[Tuple[str, List[str]]]]"):
+        """Drain (folder, email_ids) pairs from move_q until a None sentinel"""
+        while True:
+            item = move_q.get()
+            if item is None:
+                return
+            category, email_ids = item
+            try:
+                connector.move_to_folder_bulk(email_ids, category)
+            except Exception as e:
+                logger.warning(f"Failed to move {len(email_ids)} emails to {category}: {e}")
+    
     def ensure_folders_exist(self, account_id: str) -> Dict[str, Any]:
         """
         Create email folders/labels for all categories if they don't exist
@@ -550,51 +937,40 @@ Write a clear, professional email. Include appropriate greeting and closing."""
             {"status": "success", "folders_created": [...], "folders_existing": [...]}
         """
         try:
-            connector = self.account_mgr.get_connector(account_id)
-            success, msg = connector.connect()
+            connector, success, msg = self.account_mgr.acquire_connector(account_id)
             
             if not success:
                 return {"status": "error", "error": msg}
             
-            provider = connector.provider if hasattr(connector, 'provider') else 'unknown'
-            
-            # Get existing folders
-            existing_folders = []
             try:
-                if hasattr(connector, 'list_folders'):
+                provider = connector.provider if hasattr(connector, 'provider') else 'unknown'
+            
+                # Get existing folders
+                existing_folders = []
+                try:
                     existing_folders = connector.list_folders()
-                elif hasattr(connector, 'imap'):
-                    _, folder_list = connector.imap.list()
-                    existing_folders = [f.decode().split('"')[-2] for f in folder_list]
-            except:
-                pass
-            
-            folders_created = []
-            folders_existing = []
-            
-            # Create folders for each category (except Inbox/Archive - built-in)
-            for category in EMAIL_CATEGORIES:
-                if category in ["Archive"]:
-                    continue
-                
-                # Check if folder exists (case-insensitive)
-                folder_exists = any(category.lower() in str(f).lower() for f in existing_folders)
-                
-                if folder_exists:
-                    folders_existing.append(category)
-                else:
-                    # Create folder
-                    try:
-                        if hasattr(connector, 'create_folder'):
-                            connector.create_folder(category)
-                        elif hasattr(connector, 'imap'):
-                            connector.imap.create(category)
-                        folders_created.append(category)
-                        logger.info(f"Created folder: {category} in {account_id}")
-                    except Exception as e:
-                        logger.warning(f"Could not create folder {category}: {e}")
+                except Exception as e:
+                    logger.warning(f"Could not list folders for {account_id}: {e}")
+            
+                # Categories whose name appears in any existing folder (case-insensitive)
+                matched = {
+                    _CATEGORY_BY_LOWER[m.group(1)]
+                    for f in existing_folders
+                    for m in _FOLDER_CATEGORY_RE.finditer(str(f).lower())
+                }
             
-            connector.disconnect()
+                # Every category except Archive (built-in) needs a folder
+                wanted = [category for category in EMAIL_CATEGORIES if category != "Archive"]
+                folders_existing = [category for category in wanted if category in matched]
+                missing = [category for category in wanted if category not in matched]
+                
+                # Create all missing folders in one call over the open session
+                folders_created = connector.create_folders(missing)["created"] if missing else []
+                if folders_created:
+                    logger.info(f"Created {len(folders_created)} folders in {account_id}: {folders_created}")
+            finally:
+                # Back to the pool even if folder listing/creation raises
+                self.account_mgr.release_connector(account_id, connector)
             
             return {
                 "status": "success",
@@ -619,9 +995,9 @@ Write a clear, professional email. Include appropriate greeting and closing."""
         accounts = self.account_mgr.vault.list_accounts()
         results = []
         
-        for account_id in accounts:
-            result = self.ensure_folders_exist(account_id)
-            results.append(result)
+        if accounts:
+            with ThreadPoolExecutor(max_workers=min(MAX_ACCOUNT_WORKERS, len(accounts))) as pool:
+                results = list(pool.map(self.ensure_folders_exist, accounts))
         
         total_created = sum(len(r.get('folders_created', [])) for r in results)
         
@@ -642,10 +1018,6 @@ Write a clear, professional email. Include appropriate greeting and closing."""
         
         Returns all 3 categories: spam, keep, unsure
         """
-        from server.spam_detector import SpamDetector
-        import logging
-        
-        logger = logging.getLogger("email_manager")
         max_emails = int(max_emails)  # Ensure integer
         
         try:
@@ -659,136 +1031,121 @@ Write a clear, professional email. Include appropriate greeting and closing."""
                         "message": f"No accounts found matching '{account_id}'. Available: {', '.join(available)}"
                     }
             else:
-                account_matches = []
-                for acc_id in self.account_mgr.vault.list_accounts().keys():
-                    try:
-                        connector = self.account_mgr.get_connector(acc_id, cache=False)
-                        if connector:
-                            account_matches.append((acc_id, connector))
-                    except Exception as e:
-                        logger.error(f"Failed to get connector for {acc_id}: {e}")
+                account_ids = list(self.account_mgr.vault.list_accounts().keys())
+                account_matches = list(self.account_mgr.get_connectors(account_ids).items())
             
             logger.info(f"Processing {len(account_matches)} account(s)")
             
-            all_emails = []
             connectors = {}
+            emails_to_check = []
+            categorized = []
+            tally = {"spam": 0, "keep": 0, "unsure": 0}
+            trashed_count = 0
+            failed_count = 0
             
-            for acc_id, connector in account_matches:
-                try:
-                    logger.info(f"Fetching from {acc_id}...")
-                    success, msg = connector.connect()
-                    if not success:
-                        logger.error(f"Connect failed {acc_id}: {msg}")
-                        continue
-                    
-                    logger.info(f"✅ Connected to {acc_id}")
-                    
-                    try:
-                        emails = connector.preview_emails(count=min(int(max_emails), 3000), oldest_first=True)
-                    except TypeError:
-                        emails = connector.preview_emails(count=min(int(max_emails), 3000), folder="INBOX")
-                    
-                    logger.info(f"Retrieved {len(emails)} from {acc_id}")
-                    
-                    for email in emails:
-                        email["account_id"] = acc_id
-                    
-                    all_emails.extend(emails)
-                    connectors[acc_id] = connector
-                    
-                except Exception as e:
-                    logger.error(f"Error fetching {acc_id}: {e}", exc_info=True)
-            
-            if not all_emails:
-                self._cleanup_connectors(connectors)
-                return {"status": "success", "total_checked": 0, "message": "No emails to process"}
-            
-            emails_to_check = all_emails[:max_emails]
-            
-            # AI Detection - returns spam/keep/unsure
-            logger.info(f"🤖 AI detection on {len(emails_to_check)} emails...")
-            # Define incremental progress callback
+            # Define incremental progress callback (counts carry over between accounts)
             def spam_progress(counts):
                 if kwargs.get('update_progress_callback'):
                     logger.info(f"📞 spam_progress called: {counts}")
                     kwargs['update_progress_callback']({
-                        'processed_count': counts['current'],
-                        'total_emails': counts['total'],
-                        'spam_count': counts.get('spam_count', 0),
-                        'keep_count': counts.get('keep_count', 0),
-                        'unsure_count': counts.get('unsure_count', 0)
-                    })
-            detector = SpamDetector()
-            categorized = detector.batch_categorize(emails_to_check, progress_callback=spam_progress)
-            
-            # Separate into 3 categories
-            spam_emails = [e for e in categorized if e.get("category") == "spam"]
-            keep_emails = [e for e in categorized if e.get("category") == "keep"]
-            unsure_emails = [e for e in categorized if e.get("category") == "unsure"]
-            
-            logger.info(f"🎯 Results: {len(spam_emails)} spam, {len(keep_emails)} keep, {len(unsure_emails)} unsure")
-
-            # Update progress in DB if this is part of organization
-            if kwargs.get('update_progress_callback'):
-                logger.info(f"📊 Calling progress callback with counts: {len(emails_to_check)} processed")
-                try:
-                    kwargs['update_progress_callback']({
-                        'processed_count': len(emails_to_check),
-                        'spam_count': len(spam_emails),
-                        'keep_count': len(keep_emails),
-                        'unsure_count': len(unsure_emails)
+                        'processed_count': len(emails_to_check) + counts['current'],
+                        'total_emails': len(emails_to_check) + counts['total'],
+                        'spam_count': tally["spam"] + counts.get('spam_count', 0),
+                        'keep_count': tally["keep"] + counts.get('keep_count', 0),
+                        'unsure_count': tally["unsure"] + counts.get('unsure_count', 0)
                     })
-                except Exception as e:
-                    logger.error(f"Progress update failed: {e}")
             
-            # Delete spam
-            trashed_count = 0
-            failed_count = 0
-            
-            if spam_emails:
-                spam_by_account = {}
-                for email in spam_emails:
-                    acc_id = email.get("account_id")
-                    if acc_id not in spam_by_account:
-                        spam_by_account[acc_id] = []
-                    spam_by_account[acc_id].append(email)
-                
-                for acc_id, spam_list in spam_by_account.items():
-                    try:
-                        connector = connectors.get(acc_id)
-                        if not connector:
-                            failed_count += len(spam_list)
-                            continue
+            # (acc_id, fetch future); every connector they hand out is released in the finally
+            fetches = []
+            try:
+                if account_matches:
+                    workers = min(MAX_ACCOUNT_WORKERS, len(account_matches))
+                    with ThreadPoolExecutor(max_workers=workers) as fetch_pool, \
+                            ThreadPoolExecutor(max_workers=workers) as delete_pool:
+                        # All accounts fetch concurrently; each one is classified (in
+                        # account order) as soon as its fetch lands, while later
+                        # accounts are still fetching, and its spam is trashed in
+                        # the background while the next account is classified
+                        fetches.extend(
+                            (acc_id, fetch_pool.submit(self._fetch_for_cleanup, acc_id, connector, max_emails))
+                            for acc_id, connector in account_matches
+                        )
+                        deletes = []
+                        for acc_id, future in fetches:
+                            result = future.result()
+                            if result is None:
+                                continue
+                            connector, emails = result
+                            connectors[acc_id] = connector
                         
-                        spam_ids = [e['id'] for e in spam_list]
-                        logger.debug(f"Spam IDs to delete: {spam_ids[:3]}...")  # Show first 3
-                        logger.info(f"🗑️  Deleting {len(spam_ids)} spam from {acc_id}...")
+                            emails = emails[:max_emails - len(emails_to_check)]
+                            if not emails:
+                                continue
                         
-                        result = connector.delete_emails(spam_ids, permanent=False)
+                            # AI Detection - returns spam/keep/unsure
+                            logger.info(f"🤖 AI detection on {len(emails)} emails from {acc_id}...")
+                            account_categorized = self.spam_detector.batch_categorize(emails, progress_callback=spam_progress)
+                            emails_to_check.extend(emails)
+                            categorized.extend(account_categorized)
+                            for e in account_categorized:
+                                if e.get("category") in tally:
+                                    tally[e.get("category")] += 1
                         
-                        if result.get('success'):
-                            deleted = result.get('deleted_count', 0)
-                            failed = result.get('failed_count', 0)
+                            spam_list = [e for e in account_categorized if e.get("category") == "spam"]
+                            if spam_list:
+                                deletes.append(delete_pool.submit(self._delete_spam_for_account, acc_id, spam_list, connector))
+                    
+                        for future in deletes:
+                            deleted, failed = future.result()
                             trashed_count += deleted
                             failed_count += failed
-                            logger.info(f"✅ Deleted {deleted} from {acc_id}")
-                        else:
-                            failed_count += len(spam_ids)
-                            logger.error(f"❌ Delete failed {acc_id}: {result.get('error')}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error deleting {acc_id}: {e}", exc_info=True)
-                        failed_count += len(spam_list)
-            
-            # Auto-categorize "keep" emails if requested
-            categorized_count = 0
-            if auto_categorize and keep_emails:
-                logger.info(f"📁 Auto-categorizing {len(keep_emails)} keep emails...")
-                for email in keep_emails:
+            
+                if not emails_to_check:
+                    return {"status": "success", "total_checked": 0, "message": "No emails to process"}
+            
+                # Separate into 3 categories (one pass)
+                spam_emails, keep_emails, unsure_emails = [], [], []
+                by_category = {"spam": spam_emails, "keep": keep_emails, "unsure": unsure_emails}
+                for e in categorized:
+                    bucket = by_category.get(e.get("category"))
+                    if bucket is not None:
+                        bucket.append(e)
+            
+                logger.info(f"🎯 Results: {len(spam_emails)} spam, {len(keep_emails)} keep, {len(unsure_emails)} unsure")
+
+                # Update progress in DB if this is part of organization
+                if kwargs.get('update_progress_callback'):
+                    logger.info(f"📊 Calling progress callback with counts: {len(emails_to_check)} processed")
                     try:
-                        category = self._categorize_email(email)
-                        email["auto_category"] = category
-                        categorized_count += 1
+                        kwargs['update_progress_callback']({
+                            'processed_count': len(emails_to_check),
+                            'spam_count': len(spam_emails),
+                            'keep_count': len(keep_emails),
+                            'unsure_count': len(unsure_emails)
+                        })
+                    except Exception as e:
+                        logger.error(f"Progress update failed: {e}")
+            
+                # Auto-categorize "keep" emails if requested, a batch at a time
+                # (the spam pass already ruled them out, so no second spam check)
+                categorized_count = 0
+                moved_count = 0
+                if auto_categorize and keep_emails:
+                    logger.info(f"📁 Auto-categorizing {len(keep_emails)} keep emails...")
+                    # account_id -> folder -> email ids
+                    to_move: Dict[str, Dict[str, List[str]]] = {}
+                    for start in range(0, len(keep_emails), CATEGORIZE_BATCH_SIZE):
+                        batch = keep_emails[start:start + CATEGORIZE_BATCH_SIZE]
+                        try:
+                            categories = self._categorize_emails_batch(batch, spam_categories=["keep"] * len(batch))
+                        except Exception as e:
+                            logger.error(f"Failed to categorize {len(batch)} emails: {e}")
+                            continue
+                        for email, category in zip(batch, categories):
+                            email["auto_category"] = category
+                            if category != "Inbox" and email.get("account_id") in connectors:
+                                to_move.setdefault(email["account_id"], {}).setdefault(category, []).append(email["id"])
+                        categorized_count += len(batch)
                         # Report categorization progress
                         if kwargs.get("update_progress_callback"):
                             kwargs["update_progress_callback"]({
@@ -796,92 +1153,165 @@ Write a clear, professional email. Include appropriate greeting and closing."""
                                 "categorizing_count": categorized_count,
                                 "categorizing_total": len(keep_emails)
                             })
-                    except Exception as e:
-                        logger.error(f"Failed to categorize email: {e}")
-            moved_count = 0
-            if auto_categorize and keep_emails:
-                for email in keep_emails:
-                    category = email.get("auto_category")
-                    if category and category != "Inbox":
-                        try:
-                            acc_id = email.get("account_id")
-                            if acc_id in connectors:
-                                connector = connectors[acc_id]
-                                if hasattr(connector, 'move_to_folder'):
-                                    connector.move_to_folder([email["id"]], category)
-                                    moved_count += 1
-                                    logger.info(f"📂 Moved to {category}: {email.get('subject', 'No subject')[:50]}")
-                                    # Update moved count in real-time
-                                    if kwargs.get("update_progress_callback"):
-                                        kwargs["update_progress_callback"]({
-                                            "moved_count": moved_count
-                                        })
-                        except Exception as e:
-                            logger.error(f"Failed to move email to {category}: {e}")
+                
+                    # One bulk move per account and folder
+                    for acc_id, by_folder in to_move.items():
+                        for category, ids in by_folder.items():
+                            try:
+                                result = connectors[acc_id].move_to_folder_bulk(ids, category)
+                                moved = result.get("moved_count", 0) if result.get("success") else 0
+                                moved_count += moved
+                                logger.info(f"📂 Moved {moved}/{len(ids)} emails to {category} ({acc_id})")
+                                # Update moved count in real-time
+                                if kwargs.get("update_progress_callback"):
+                                    kwargs["update_progress_callback"]({
+                                        "moved_count": moved_count
+                                    })
+                            except Exception as e:
+                                logger.error(f"Failed to move {len(ids)} emails to {category}: {e}")
 
-            self._cleanup_connectors(connectors)
+                self._flush_sender_history()
             
-            # Build response with all 3 categories
-            return {
-                "status": "success",
-                "total_checked": len(emails_to_check),
+                # Build response with all 3 categories
+                return {
+                    "status": "success",
+                    "total_checked": len(emails_to_check),
                 
-                # Counts
-                "spam_found": len(spam_emails),
-                "keep_found": len(keep_emails),
-                "unsure_found": len(unsure_emails),
-                "trashed_count": trashed_count,
-                "failed_count": failed_count,
-                "categorized_count": categorized_count if auto_categorize else 0,
+                    # Counts
+                    "spam_found": len(spam_emails),
+                    "keep_found": len(keep_emails),
+                    "unsure_found": len(unsure_emails),
+                    "trashed_count": trashed_count,
+                    "failed_count": failed_count,
+                    "categorized_count": categorized_count if auto_categorize else 0,
                 
-                # Details for each category
-                "spam_details": [
-                    {
-                        "from": e.get("from", "Unknown"),
-                        "subject": e.get("subject", "No subject"),
-                        "reasoning": e.get("reasoning", "")[:100]
-                    }
-                    for e in spam_emails
-                ],
+                    # Details for each category
+                    "spam_details": [
+                        {
+                            "from": e.get("from", "Unknown"),
+                            "subject": e.get("subject", "No subject"),
+                            "reasoning": e.get("reasoning", "")[:100]
+                        }
+                        for e in spam_emails
+                    ],
                 
-                "keep_details": [
-                    {
-                        "from": e.get("from", "Unknown"),
-                        "subject": e.get("subject", "No subject"),
-                        "category": e.get("auto_category", "Not categorized")
-                    }
-                    for e in keep_emails
-                ],
+                    "keep_details": [
+                        {
+                            "from": e.get("from", "Unknown"),
+                            "subject": e.get("subject", "No subject"),
+                            "category": e.get("auto_category", "Not categorized")
+                        }
+                        for e in keep_emails
+                    ],
                 
-                "unsure_details": [
-                    {
-                        "from": e.get("from", "Unknown"),
-                        "subject": e.get("subject", "No subject"),
-                        "reasoning": e.get("reasoning", "Uncertain classification")
-                    }
-                    for e in unsure_emails
-                ],
+                    "unsure_details": [
+                        {
+                            "from": e.get("from", "Unknown"),
+                            "subject": e.get("subject", "No subject"),
+                            "reasoning": e.get("reasoning", "Uncertain classification")
+                        }
+                        for e in unsure_emails
+                    ],
                 
-                # Summary message
-                "message": (
-                    f"📊 Processed {len(emails_to_check)} emails: "
-                    f"🗑️ {len(spam_emails)} spam (trashed), "
-                    f"✅ {len(keep_emails)} keep"
-                    f"{f' (categorized into folders)' if auto_categorize and categorized_count > 0 else ''}, "
-                    f"⚠️ {len(unsure_emails)} unsure (left in inbox)"
-                )
-            }
+                    # Summary message
+                    "message": (
+                        f"📊 Processed {len(emails_to_check)} emails: "
+                        f"🗑️ {len(spam_emails)} spam (trashed), "
+                        f"✅ {len(keep_emails)} keep"
+                        f"{f' (categorized into folders)' if auto_categorize and categorized_count > 0 else ''}, "
+                        f"⚠️ {len(unsure_emails)} unsure (left in inbox)"
+                    )
+                }
+            
+            finally:
+                # The pools have already waited out their work; pick up connectors from
+                # fetches the pipeline never consumed (an exception cut it short)
+                for acc_id, future in fetches:
+                    if acc_id not in connectors:
+                        result = future.result()
+                        if result is not None:
+                            connectors[acc_id] = result[0]
+                self._cleanup_connectors(connectors)
             
         except Exception as e:
-            logger.error(f"Cleanup failed: {e}", exc_info=True)
+            logger.exception("Cleanup failed: %s", e)
             return {"status": "error", "message": str(e)}
 
+    def _fetch_for_cleanup(self, acc_id: str, connector, max_emails: int) -> Optional[Tuple[Any, List[Dict]]]:
+        """
+        Connect one account and preview its oldest emails for spam cleanup
+        
+        Returns:
+            (connected connector, emails tagged with account_id), or None on failure
+        """
+        try:
+            logger.info(f"Fetching from {acc_id}...")
+            connector, success, msg = self.account_mgr.acquire_connector(acc_id, connector)
+            if not success:
+                logger.error(f"Connect failed {acc_id}: {msg}")
+                return None
+            
+            logger.info(f"✅ Connected to {acc_id}")
+            
+            try:
+                try:
+                    emails = connector.preview_emails(count=min(int(max_emails), 3000), oldest_first=True)
+                except TypeError:
+                    emails = connector.preview_emails(count=min(int(max_emails), 3000), folder="INBOX")
+            except Exception:
+                self.account_mgr.release_connector(acc_id, connector)
+                raise
+            
+            logger.info(f"Retrieved {len(emails)} from {acc_id}")
+            
+            for email in emails:
+                email["account_id"] = acc_id
+            
+            return connector, emails
+            
+        except Exception as e:
+            logger.exception("Error fetching %s: %s", acc_id, e)
+            return None
+    
+    def _delete_spam_for_account(self, acc_id: str, spam_list: List[Dict], connector) -> Tuple[int, int]:
+        """
+        Move one account's spam to trash, SPAM_DELETE_BATCH_SIZE messages per request
+        
+        Returns:
+            (trashed, failed)
+        """
+        if not connector:
+            return 0, len(spam_list)
+        
+        spam_ids = [e['id'] for e in spam_list]
+        logger.debug(f"Spam IDs to delete: {spam_ids[:3]}...")  # Show first 3
+        logger.info(f"🗑️  Deleting {len(spam_ids)} spam from {acc_id}...")
+        
+        trashed = 0
+        failed = 0
+        for start in range(0, len(spam_ids), SPAM_DELETE_BATCH_SIZE):
+            batch = spam_ids[start:start + SPAM_DELETE_BATCH_SIZE]
+            try:
+                result = connector.delete_emails(batch, permanent=False)
+                
+                if result.get('success'):
+                    deleted = result.get('deleted_count', 0)
+                    trashed += deleted
+                    failed += result.get('failed_count', 0)
+                    logger.info(f"✅ Deleted {deleted} from {acc_id}")
+                else:
+                    failed += len(batch)
+                    logger.error(f"❌ Delete failed {acc_id}: {result.get('error')}")
+                
+            except Exception as e:
+                logger.exception("Error deleting %s: %s", acc_id, e)
+                failed += len(batch)
+        
+        return trashed, failed
+    
     def _get_connectors_by_query(self, account_query):
         """Smart account matcher using AccountManager"""
-        import logging
-        logger = logging.getLogger("email_manager")
-        
-        matches = []
+        matched_ids = []
         query_lower = account_query.lower()
         
         # Get all accounts from AccountManager
@@ -911,12 +1341,9 @@ Write a clear, professional email. Include appropriate greeting and closing."""
             
             if matched:
                 logger.info(f"✅ {match_type.upper()}: '{account_query}' → {acc_id} ({acc_email})")
-                try:
-                    connector = self.account_mgr.get_connector(acc_id, cache=False)
-                    if connector:
-                        matches.append((acc_id, connector))
-                except Exception as e:
-                    logger.error(f"Failed to get connector for {acc_id}: {e}")
+                matched_ids.append(acc_id)
+        
+        matches = list(self.account_mgr.get_connectors(matched_ids).items())
         
         if not matches:
             logger.warning(f"❌ No match for '{account_query}'")
@@ -929,71 +1356,42 @@ Write a clear, professional email. Include appropriate greeting and closing."""
         """
         Universal connector factory - returns the right connector for any provider
         """
-        from server.connectors.yahoo_connector import YahooConnector
-        from server.connectors.gmail_connector import GmailConnector
-        from server.connectors.hotmail_connector import HotmailConnector
-        from server.connectors.comcast_connector import ComcastConnector
-        from server.connectors.apple_connector import AppleConnector
-        from server.security.credential_vault import CredentialVault
-        import logging
-
-        logger = logging.getLogger("email_manager")
-
         try:
-            # Get account config
-            account_config = None
-            for acc in self.config.get("accounts", []):
-                if acc["id"] == account_id:
-                    account_config = acc
-                    break
-
-            if not account_config:
-                logger.error(f"No config found for account: {account_id}")
-                return None
-
-            provider = account_config.get("provider", "").lower()
-
-            # Get credentials
-            vault = CredentialVault()
-            creds = vault.get_credentials(account_id)
-
-            if not creds:
-                logger.error(f"No credentials found for account: {account_id}")
-                return None
-
-            # Return appropriate connector
-            if provider == "yahoo":
-                return YahooConnector(creds["email"], creds["app_password"])
-
-            elif provider == "gmail":
-                return GmailConnector(account_id)
-
-            elif provider in ["hotmail", "outlook", "live", "microsoft"]:
-                return HotmailConnector(creds["email"], creds["app_password"])
-
-            elif provider == "comcast":
-                return ComcastConnector(creds["email"], creds["app_password"])
-
-            elif provider in ["apple", "icloud", "me", "mac"]:
-                return AppleConnector(creds["email"], creds["app_password"])
-
-            else:
-                logger.warning(f"Unknown provider '{provider}' for {account_id}")
-                return None
-
+            return self.account_mgr.get_connector(account_id, cache=False)
         except Exception as e:
-            logger.error(f"Error getting connector for {account_id}: {e}", exc_info=True)
+            logger.exception("Error getting connector for %s: %s", account_id, e)
             return None
 
     def _cleanup_connectors(self, connectors):
-        """Disconnect all connectors cleanly"""
-        import logging
-        logger = logging.getLogger("email_manager")
+        """Return connectors to the account pool for reuse"""
+        if not connectors:
+            return
         
-        for acc_id, conn in connectors.items():
-            try:
-                if hasattr(conn, 'disconnect'):
-                    conn.disconnect()
-                    logger.info(f"Disconnected from {acc_id}")
-            except Exception as e:
-                logger.error(f"Error disconnecting from {acc_id}: {e}")
+        # Releasing can mean a LOGOUT round trip when the pool is full, so do accounts concurrently
+        pool = ThreadPoolExecutor(max_workers=min(MAX_ACCOUNT_WORKERS, len(connectors)))
+        try:
+            futures = {
+                pool.submit(self.account_mgr.release_connector, acc_id, conn): acc_id
+                for acc_id, conn in connectors.items()
+            }
+            done, not_done = wait(futures, timeout=CONNECTOR_RELEASE_TIMEOUT)
+            for future in done:
+                acc_id = futures[future]
+                try:
+                    future.result()
+                    logger.info("Released connection for %s", acc_id)
+                except Exception as e:
+                    logger.error("Error releasing connection for %s: %s", acc_id, e)
+            for future in not_done:
+                logger.error("Releasing connection for %s timed out after %ss", futures[future], CONNECTOR_RELEASE_TIMEOUT)
+        finally:
+            # Don't wait on a hung disconnect; its thread finishes (or not) in the background
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        # Released connectors belong to the pool now; don't keep them alive through the caller's dict
+        connectors.clear()
+    
+    def close(self):
+        """Flush learned sender history and disconnect all pooled connections (call at shutdown)"""
+        self._flush_sender_history()
+        self.account_mgr.close_connectors()
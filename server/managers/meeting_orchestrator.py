@@ -2,18 +2,61 @@
 Meeting Orchestrator - Complex meeting scheduling workflows
 Location: server/managers/meeting_orchestrator.py
 """
+import json
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from sqlalchemy import text
+
 from server.managers.email_manager import EmailManager
 from server.managers.contact_manager import ContactManager
 from server.managers.calendar_block_manager import CalendarBlockManager
 from server.managers.calendar_manager import CalendarManager
+from server.draft_manager import draft_manager
 from datetime import datetime, timedelta
 
 logger = logging.getLogger("meeting_orchestrator")
 
+# Successful contact lookups kept across scheduling requests
+CONTACT_CACHE_SIZE = 1024
+CONTACT_CACHE_TTL = 300.0  # seconds
+
+# Availability checks reused while the calendar is unchanged
+AVAILABILITY_CACHE_SIZE = 512
+AVAILABILITY_CACHE_TTL = 30.0  # seconds
+
+# Built once so SQLAlchemy's compiled cache reuses it across scheduling requests
+INSERT_MEETING_SQL = text(
+    "INSERT INTO meetings (event_id, user_id, title, date, time, duration, description, attendees, status) "
+    "VALUES (:eid, :uid, :t, :d, :tm, :dur, :desc, :att, :st)"
+)
+
+INVITE_TEMPLATE = """Dear {recipient},
+
+I hope this message finds you well.
+
+I would like to invite you to a meeting to discuss {title}.
+
+Meeting Details:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Subject: {title}
+Date: {formatted_date}
+Time: {formatted_time}
+Duration: {duration} minutes
+Attendees: {attendee_names}
+
+Please confirm your availability at your earliest convenience. If this time does not work for you, kindly suggest an alternative that suits your schedule.
+
+I look forward to our discussion.
+
+Best regards,
+{user_name}
+Executive Assistant: {ea_name}"""
+
 
 class MeetingOrchestrator:
     """Orchestrates complex meeting scheduling workflows"""
@@ -22,19 +65,73 @@ class MeetingOrchestrator:
         self.email_mgr = email_mgr
         self.calendar_mgr = calendar_mgr
         self.contact_mgr = contact_mgr
+        # lowercased attendee name -> (get_contact success result, contacts revision, cached at)
+        self._contact_cache: "OrderedDict[str, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        # (date, time, duration) -> (check_availability result, calendar revision, cached at)
+        self._avail_cache: "OrderedDict[Tuple[str, str, int], Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        # Guards both caches; schedule_meeting runs on concurrent request threads
+        self._cache_lock = threading.Lock()
+    
+    def _cached_get_contact(self, name: str) -> Dict[str, Any]:
+        """get_contact, reused until contacts change or the TTL expires (failures are never cached)"""
+        key = name.lower()
+        revision = self.contact_mgr.revision
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._contact_cache.get(key)
+            if cached is not None:
+                result, cached_revision, cached_at = cached
+                if cached_revision == revision and now - cached_at < CONTACT_CACHE_TTL:
+                    self._contact_cache.move_to_end(key)
+                    return result
+                del self._contact_cache[key]
+        
+        result = self.contact_mgr.get_contact(name)
+        if result.get("status") == "success":
+            with self._cache_lock:
+                self._contact_cache[key] = (result, revision, now)
+                if len(self._contact_cache) > CONTACT_CACHE_SIZE:
+                    self._contact_cache.popitem(last=False)
+        return result
     
-    def _resolve_attendees(self, attendees: List[str]) -> Dict[str, Any]:
+    def _cached_availability(self, date: str, time_str: str, duration: int) -> Dict[str, Any]:
+        """check_availability, reused until the calendar changes or the TTL expires"""
+        key = (date, time_str, duration)
+        revision = self.calendar_mgr.revision
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._avail_cache.get(key)
+            if cached is not None:
+                result, cached_revision, cached_at = cached
+                if cached_revision == revision and now - cached_at < AVAILABILITY_CACHE_TTL:
+                    self._avail_cache.move_to_end(key)
+                    return result
+                del self._avail_cache[key]
+        
+        result = self.calendar_mgr.check_availability(date, time_str, duration)
+        if result.get("status") == "success":
+            with self._cache_lock:
+                self._avail_cache[key] = (result, revision, now)
+                if len(self._avail_cache) > AVAILABILITY_CACHE_SIZE:
+                    self._avail_cache.popitem(last=False)
+        return result
+    
+    def _resolve_attendees(self, attendees: List[str], fail_fast: bool = False) -> Dict[str, Any]:
         """
         Resolve attendee names to email addresses
         
         Args:
             attendees: List of names or emails
+            fail_fast: Stop at the first attendee that can't be resolved
             
         Returns:
             Dict with resolved emails and any errors
         """
         resolved = []
         errors = []
+        interactions = []
+        # lowercased name -> get_contact result, so repeated names are looked up once
+        lookups: Dict[str, Dict[str, Any]] = {}
         
         for attendee in attendees:
             # Already an email
@@ -46,7 +143,10 @@ class MeetingOrchestrator:
                 continue
             
             # Look up in contacts
-            result = self.contact_mgr.get_contact(attendee)
+            key = attendee.lower()
+            result = lookups.get(key)
+            if result is None:
+                result = lookups[key] = self._cached_get_contact(attendee)
             if result["status"] == "success":
                 contact = result["contact"]
                 emails = contact.get("emails", [])
@@ -55,12 +155,18 @@ class MeetingOrchestrator:
                         "name": contact["name"],
                         "email": emails[0]  # Use primary email
                     })
-                    # Record interaction
-                    self.contact_mgr.record_interaction(attendee)
+                    interactions.append(attendee)
                 else:
                     errors.append(f"Contact '{attendee}' has no email address")
             else:
                 errors.append(f"Contact '{attendee}' not found")
+            
+            if errors and fail_fast:
+                break
+        
+        # Record interactions with a single contacts file write
+        if interactions:
+            self.contact_mgr.record_interactions(interactions)
         
         return {
             "resolved": resolved,
@@ -89,7 +195,6 @@ class MeetingOrchestrator:
         user_name = config.get("user_name", "User")
         ea_name = config.get("ea_name", "JARVIS")
         
-        from datetime import datetime
         date_obj = datetime.strptime(date, "%Y-%m-%d")
         formatted_date = date_obj.strftime("%A, %B %d, %Y")
         
@@ -98,32 +203,11 @@ class MeetingOrchestrator:
         
         recipient = attendees[0]["name"] if len(attendees) == 1 else "Team"
         
-        body = f"""Dear {recipient},
-
-I hope this message finds you well.
-
-I would like to invite you to a meeting to discuss {title}.
-
-Meeting Details:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Subject: {title}
-Date: {formatted_date}
-Time: {formatted_time}
-Duration: {duration} minutes
-Attendees: {attendee_names}
-
-Please confirm your availability at your earliest convenience. If this time does not work for you, kindly suggest an alternative that suits your schedule.
-
-I look forward to our discussion.
-
-Best regards,
-{user_name}
-Executive Assistant: {ea_name}"""
-
-        return body
-
-        
-        return body
+        return INVITE_TEMPLATE.format(
+            recipient=recipient, title=title, formatted_date=formatted_date,
+            formatted_time=formatted_time, duration=duration,
+            attendee_names=attendee_names, user_name=user_name, ea_name=ea_name
+        )
     
 
     def _validate_and_fix_date(self, date_str: str, original_input: str = "") -> str:
@@ -157,8 +241,9 @@ Executive Assistant: {ea_name}"""
             return date_str
 
     def schedule_meeting(self, attendees: List[str], title: str, date: str, time: str,
-                        duration: int = 60, description: Optional[str] = None, **kwargs) -> Dict[str, Any]:
-        """Schedule a meeting with full workflow"""
+                        duration: int = 60, description: Optional[str] = None,
+                        fail_fast: bool = False, **kwargs) -> Dict[str, Any]:
+        """Schedule a meeting with full workflow (fail_fast: report only the first unresolvable attendee)"""
         try:
             logger.info(f"Scheduling meeting: {title} with {len(attendees)} attendees")
             
@@ -166,18 +251,20 @@ Executive Assistant: {ea_name}"""
             date = self._validate_and_fix_date(date, title)
             
             # Step 1: Resolve attendees
-            attendee_result = self._resolve_attendees(attendees)
+            attendee_result = self._resolve_attendees(attendees, fail_fast=fail_fast)
             if attendee_result["errors"]:
                 return {"status": "partial_error", "errors": attendee_result["errors"], "message": "Some attendees could not be resolved"}
             resolved_attendees = attendee_result["resolved"]
             
             # Step 2: Check availability
-            avail_result = self.calendar_mgr.check_availability(date, time, duration)
+            avail_result = self._cached_availability(date, time, duration)
             if not avail_result.get("available"):
                 return {"status": "error", "error": "Time slot not available", "conflicts": avail_result.get("conflicts", [])}
             
             # Step 3: Create calendar event
-            event_result = self.calendar_mgr.add_event(title=title, date=date, time=time, duration=duration, description=description or f"Meeting with {', '.join([a['name'] for a in resolved_attendees])}")
+            # Default description only built when none was given
+            event_description = description or "Meeting with " + ", ".join(a["name"] for a in resolved_attendees)
+            event_result = self.calendar_mgr.add_event(title=title, date=date, time=time, duration=duration, description=event_description)
             if event_result["status"] != "success":
                 return event_result
             event = event_result["event"]
@@ -188,14 +275,13 @@ Executive Assistant: {ea_name}"""
             # Step 5: Send invites
             invites_sent = []
             failed_invites = []
+            subject = f"Meeting Invitation: {title}"
             for attendee in resolved_attendees:
                 try:
                     # Create draft for approval
-                    from server.draft_manager import DraftManager
-                    draft_mgr = DraftManager()
-                    draft_id = draft_mgr.create_draft(
+                    draft_id = draft_manager.create_draft(
                         to=attendee["email"],
-                        subject=f"Meeting Invitation: {title}",
+                        subject=subject,
                         body=invite_body,
                         from_account="default",
                         context={"type": "meeting_invite"}
@@ -212,8 +298,6 @@ Executive Assistant: {ea_name}"""
             # Step 6: Store in database (optional)
             try:
                 from server.database.connection import get_db_session
-                from sqlalchemy import text
-                import json
                 # Check for calendar conflicts before scheduling
                 try:
                     from datetime import datetime
@@ -232,12 +316,13 @@ Executive Assistant: {ea_name}"""
                 except Exception as conflict_err:
                     logger.warning(f"Conflict check failed (proceeding anyway): {conflict_err}")
 
+                att_json = json.dumps(resolved_attendees, separators=(",", ":"))
                 with get_db_session() as db:
-                    db.execute(text("INSERT INTO meetings (event_id, user_id, title, date, time, duration, description, attendees, status) VALUES (:eid, :uid, :t, :d, :tm, :dur, :desc, :att, :st)"), 
-                              {"eid": event["id"], "uid": "default_user", "t": title, "d": date, "tm": time, "dur": duration, "desc": description or "", "att": json.dumps(resolved_attendees), "st": "scheduled"})
+                    db.execute(INSERT_MEETING_SQL,
+                              {"eid": event["id"], "uid": "default_user", "t": title, "d": date, "tm": time, "dur": duration, "desc": description or "", "att": att_json, "st": "scheduled"})
                 logger.info(f"Meeting stored in database")
-            except:
-                pass
+            except Exception as e:
+                logger.debug(f"Meeting persist failed: {e}")
             
             return {"status": "success", "meeting": {"event_id": event["id"], "title": title, "date": date, "time": time, "duration": duration, "attendees": resolved_attendees}, "invites_sent": invites_sent, "failed_invites": failed_invites, "drafts_created": [{"draft_id": inv.get("draft_id", inv.get("to")), "to": inv["to"], "name": inv["name"]} for inv in invites_sent], "message": f"Meeting scheduled. Created {len(invites_sent)} draft invitation(s) for approval. Please review in the chat."}
         except Exception as e:
@@ -264,7 +349,7 @@ Executive Assistant: {ea_name}"""
             
             # Check new time availability
             duration = event["duration_minutes"]
-            avail_result = self.calendar_mgr.check_availability(new_date, new_time, duration)
+            avail_result = self._cached_availability(new_date, new_time, duration)
             
             if not avail_result.get("available"):
                 return {
@@ -2,19 +2,73 @@
 Note Manager - Notes and task management
 Location: server/managers/note_manager.py
 """
+import functools
 import logging
-import json
 import os
-from typing import Dict, Any, List, Optional
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger("note_manager")
 
 # Data paths
 DATA_DIR = Path(os.path.expanduser("~/Library/Application Support/ExecutiveAssistant/data"))
 NOTES_DIR = DATA_DIR / "notes"
 TASKS_FILE = DATA_DIR / "notes" / "tasks.json"
+# Append-only journal of task changes since tasks.json was last written
+TASKS_LOG = DATA_DIR / "notes" / "tasks.log.jsonl"
+# Journal size that triggers folding it back into tasks.json
+TASKS_LOG_COMPACT_BYTES = 256 * 1024
+# Full-text (trigram) search index over the note files
+NOTES_INDEX_FILE = DATA_DIR / "notes" / "index.sqlite"
+# Shortest query the trigram index can answer; shorter ones scan the files
+INDEX_MIN_QUERY_CHARS = 3
+
+# Note files read concurrently by get_notes
+NOTE_READ_WORKERS = 8
+# Note files written concurrently by save_notes_batch
+NOTE_WRITE_WORKERS = 8
+# Characters read for a listing (title + 200-char preview); full reads only for content search
+NOTE_HEAD_CHARS = 4096
+
+# Task ordering for get_tasks: priority, then due date (undated last)
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+# Sort key stand-in for tasks without a due date
+FAR_FUTURE = "9999-12-31"
+
+# Anything but letters, digits, space, '_' and '-' (Unicode \w == isalnum() plus '_')
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w \-]")
+
+
+@functools.lru_cache(maxsize=1024)
+def _sanitize_filename(title: str) -> str:
+    """Create safe filename from title (pure, so memoized)"""
+    safe = _UNSAFE_FILENAME_CHARS.sub('_', title)
+    return safe.strip().replace(' ', '_')[:100]  # Limit length
+
+
+def _note_listing(filename: str, content: str, modified: float) -> Dict[str, Any]:
+    """get_notes entry for a note file (content may be just the head of the file)"""
+    # Extract title from first line if available
+    lines = content.split('\n', 1)
+    title = lines[0].replace('# ', '') if lines else filename[:-len(".txt")]
+    
+    return {
+        "title": title,
+        "filename": filename,
+        "preview": content[:200] + "..." if len(content) > 200 else content,
+        "modified": datetime.fromtimestamp(modified).isoformat()
+    }
+
+
+def _task_sort_key(task: Dict):
+    return (PRIORITY_ORDER.get(task["priority"], 1), task["due_date"] or FAR_FUTURE)
 
 
 class NoteManager:
@@ -22,31 +76,162 @@ class NoteManager:
     
     def __init__(self):
         NOTES_DIR.mkdir(parents=True, exist_ok=True)
-        self.tasks = self._load_tasks()
+        self._reindex_tasks(self._load_tasks())
+        # Guards the search index; save_notes_batch writes from several threads
+        self._index_lock = threading.Lock()
+        self._index = self._open_index()
         
+    def _reindex_tasks(self, tasks: List[Dict]):
+        """Build the task id index and reset the cached get_tasks orderings"""
+        # id -> task, in creation order; the authoritative task store
+        self._tasks_by_id = {t["id"]: t for t in tasks}
+        # completed flag -> tasks in get_tasks order
+        self._sorted_tasks: Dict[bool, List[Dict]] = {}
+    
+    @property
+    def tasks(self) -> List[Dict]:
+        """All tasks in creation order"""
+        return list(self._tasks_by_id.values())
+    
     def _load_tasks(self) -> List[Dict]:
-        """Load tasks from storage"""
+        """Load tasks from storage (tasks.json, then replay the journal)"""
+        tasks = []
         try:
             if TASKS_FILE.exists():
-                with open(TASKS_FILE, 'r') as f:
-                    return json.load(f)
-            return []
+                tasks = orjson.loads(TASKS_FILE.read_bytes())
         except Exception as e:
             logger.error(f"Error loading tasks: {e}")
-            return []
+        
+        if not TASKS_LOG.exists():
+            return tasks
+        
+        # Replay journaled changes in order; dict keeps insertion (creation) order
+        by_id = {t["id"]: t for t in tasks}
+        try:
+            with open(TASKS_LOG, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # Torn final line from a crash mid-append
+                        logger.warning("Skipping unreadable task journal entry")
+                        continue
+                    if record["op"] == "delete":
+                        by_id.pop(record["id"], None)
+                    else:
+                        by_id[record["task"]["id"]] = record["task"]
+        except Exception as e:
+            logger.error(f"Error replaying task journal: {e}")
+        
+        tasks = list(by_id.values())
+        self._compact_tasks(tasks)
+        return tasks
     
-    def _save_tasks(self):
-        """Save tasks to storage"""
+    def _append_mutation(self, record: Dict):
+        """Journal one task change ({"op": "upsert", "task": ...} or {"op": "delete", "id": ...})"""
         try:
-            with open(TASKS_FILE, 'w') as f:
-                json.dump(self.tasks, f, indent=2)
+            with open(TASKS_LOG, 'ab') as f:
+                f.write(orjson.dumps(record) + b"\n")
+                size = f.tell()
+            if size > TASKS_LOG_COMPACT_BYTES:
+                self._compact_tasks(self.tasks)
         except Exception as e:
             logger.error(f"Error saving tasks: {e}")
     
-    def _sanitize_filename(self, title: str) -> str:
-        """Create safe filename from title"""
-        safe = "".join(c if c.isalnum() or c in [' ', '_', '-'] else '_' for c in title)
-        return safe.strip().replace(' ', '_')[:100]  # Limit length
+    def _compact_tasks(self, tasks: List[Dict]):
+        """Atomically rewrite tasks.json with the current tasks and empty the journal"""
+        try:
+            tmp = TASKS_FILE.with_suffix(".json.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(orjson.dumps(tasks))
+                # Data must be on disk before the rename, or a power loss can leave an empty tasks.json
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, TASKS_FILE)
+            TASKS_LOG.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Error compacting tasks: {e}")
+    
+    def _open_index(self) -> Optional[sqlite3.Connection]:
+        """Open (and create if needed) the note search index, or None if FTS5 trigram is unavailable"""
+        try:
+            db = sqlite3.connect(str(NOTES_INDEX_FILE), isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS notes USING fts5(
+                    name, content,
+                    filename UNINDEXED, title UNINDEXED, preview UNINDEXED,
+                    modified UNINDEXED, mtime_ns UNINDEXED,
+                    tokenize='trigram'
+                )
+            """)
+            return db
+        except Exception as e:
+            logger.warning(f"Note search index unavailable, searching files directly: {e}")
+            return None
+    
+    def _index_notes(self, notes: List[Tuple[str, str, os.stat_result]], removed: Optional[List[str]] = None):
+        """
+        Upsert notes into the search index
+        
+        Args:
+            notes: (filename, full content, stat) per changed note file
+            removed: Filenames of deleted note files to drop
+        """
+        with self._index_lock:
+            self._index.execute("BEGIN")
+            try:
+                self._index.executemany(
+                    "DELETE FROM notes WHERE filename = ?",
+                    [(filename,) for filename in removed or []] + [(n[0],) for n in notes]
+                )
+                rows = []
+                for filename, content, st in notes:
+                    listing = _note_listing(filename, content, st.st_mtime)
+                    rows.append((filename[:-len(".txt")], content, filename, listing["title"],
+                                 listing["preview"], listing["modified"], st.st_mtime_ns))
+                self._index.executemany("INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._index.execute("COMMIT")
+            except Exception:
+                self._index.execute("ROLLBACK")
+                raise
+    
+    def _sync_index(self, entries: List[os.DirEntry]):
+        """Reindex note files added or changed since they were indexed (e.g. edited outside the app)"""
+        with self._index_lock:
+            indexed = dict(self._index.execute("SELECT filename, mtime_ns FROM notes"))
+        
+        stale = [e for e in entries if indexed.pop(e.name, None) != e.stat().st_mtime_ns]
+        # Whatever is left in indexed no longer exists on disk
+        if not stale and not indexed:
+            return
+        
+        def read_full(entry: os.DirEntry):
+            try:
+                with open(entry.path, 'r') as f:
+                    return entry.name, f.read(), entry.stat()
+            except Exception as e:
+                logger.error(f"Error reading note {entry.path}: {e}")
+                return None
+        
+        changed = []
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(NOTE_READ_WORKERS, len(stale))) as pool:
+                changed = [n for n in pool.map(read_full, stale) if n is not None]
+        self._index_notes(changed, removed=list(indexed))
+    
+    def _search_index(self, entries: List[os.DirEntry], query: str) -> List[Dict[str, Any]]:
+        """Substring search over note names and contents via the trigram index"""
+        self._sync_index(entries)
+        phrase = '"' + query.replace('"', '""') + '"'
+        with self._index_lock:
+            rows = self._index.execute(
+                "SELECT title, filename, preview, modified FROM notes WHERE notes MATCH ?", (phrase,)
+            ).fetchall()
+        return [
+            {"title": title, "filename": filename, "preview": preview, "modified": modified}
+            for title, filename, preview, modified in rows
+        ]
     
     def save_note(self, content: str, title: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
@@ -60,22 +245,32 @@ class NoteManager:
             Saved note info
         """
         try:
+            now = datetime.now()
+            timestamp = now.isoformat()
             if not title:
                 # Generate title from timestamp
-                title = f"note_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                title = f"note_{now.strftime('%Y%m%d_%H%M%S')}"
             
-            filename = self._sanitize_filename(title) + ".txt"
+            filename = _sanitize_filename(title) + ".txt"
             filepath = NOTES_DIR / filename
             
-            # Add metadata header
-            note_content = f"""# {title}
-Created: {datetime.now().isoformat()}
-
-{content}
-"""
-            
-            with open(filepath, 'w') as f:
-                f.write(note_content)
+            # Metadata header + content, encoded once and written with a single write(2)
+            note_content = f"# {title}\nCreated: {timestamp}\n\n{content}\n"
+            payload = note_content.encode("utf-8")
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            
+            if self._index is not None:
+                try:
+                    self._index_notes([(filename, note_content, os.stat(filepath))])
+                except Exception as e:
+                    # The next search re-syncs it from the file's mtime
+                    logger.warning(f"Error indexing note {filename}: {e}")
             
             logger.info(f"Saved note: {title}")
             
@@ -84,13 +279,55 @@ Created: {datetime.now().isoformat()}
                 "title": title,
                 "filename": filename,
                 "path": str(filepath),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
             
         except Exception as e:
             logger.error(f"Error saving note: {e}")
             return {"status": "error", "error": str(e)}
     
+    def save_notes_batch(self, notes: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """
+        Save many notes concurrently (bulk import)
+        
+        Args:
+            notes: List of {"content": ..., "title": ...} dicts (title optional)
+            
+        Returns:
+            Per-note save results and counts
+        """
+        try:
+            # Untitled notes would all get the same timestamp title; number them instead
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            jobs = [
+                (note.get("content", ""), note.get("title") or f"note_{stamp}_{i + 1}")
+                for i, note in enumerate(notes)
+            ]
+            
+            results = []
+            if jobs:
+                with ThreadPoolExecutor(max_workers=min(NOTE_WRITE_WORKERS, len(jobs))) as pool:
+                    results = list(pool.map(lambda job: self.save_note(*job), jobs))
+                
+                # One directory fsync makes all the new entries durable
+                dir_fd = os.open(NOTES_DIR, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            
+            saved = sum(1 for r in results if r["status"] == "success")
+            return {
+                "status": "success",
+                "results": results,
+                "saved_count": saved,
+                "failed_count": len(results) - saved
+            }
+            
+        except Exception as e:
+            logger.error(f"Error saving notes batch: {e}")
+            return {"status": "error", "error": str(e)}
+    
     def get_notes(self, query: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
         Retrieve notes
@@ -102,33 +339,20 @@ Created: {datetime.now().isoformat()}
             List of notes
         """
         try:
-            notes = []
+            query_lower = query.lower() if query else None
+            entries = [
+                entry for entry in os.scandir(NOTES_DIR)
+                if entry.name.endswith(".txt") and entry.is_file()
+            ]
             
-            for filepath in NOTES_DIR.glob("*.txt"):
-                try:
-                    with open(filepath, 'r') as f:
-                        content = f.read()
-                    
-                    # Skip if query provided and doesn't match
-                    if query:
-                        query_lower = query.lower()
-                        if (query_lower not in filepath.stem.lower() and 
-                            query_lower not in content.lower()):
-                            continue
-                    
-                    # Extract title from first line if available
-                    lines = content.split('\n')
-                    title = lines[0].replace('# ', '') if lines else filepath.stem
-                    
-                    notes.append({
-                        "title": title,
-                        "filename": filepath.name,
-                        "preview": content[:200] + "..." if len(content) > 200 else content,
-                        "modified": datetime.fromtimestamp(filepath.stat().st_mtime).isoformat()
-                    })
-                except Exception as e:
-                    logger.error(f"Error reading note {filepath}: {e}")
-                    continue
+            notes = []
+            if query and self._index is not None and len(query) >= INDEX_MIN_QUERY_CHARS:
+                notes = self._search_index(entries, query)
+            elif entries:
+                with ThreadPoolExecutor(max_workers=min(NOTE_READ_WORKERS, len(entries))) as pool:
+                    for note in pool.map(lambda entry: self._read_note(entry, query_lower), entries):
+                        if note is not None:
+                            notes.append(note)
             
             # Sort by modification time (newest first)
             notes.sort(key=lambda n: n["modified"], reverse=True)
@@ -143,10 +367,32 @@ Created: {datetime.now().isoformat()}
             logger.error(f"Error getting notes: {e}")
             return {"status": "error", "error": str(e)}
     
+    def _read_note(self, entry: os.DirEntry, query_lower: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Listing info for one note file, or None if it doesn't match the query
+        
+        Only the head of the file is read unless the query has to be
+        searched for in the content (i.e. it isn't in the filename).
+        """
+        try:
+            stem = entry.name[:-len(".txt")]
+            needs_content_search = bool(query_lower) and query_lower not in stem.lower()
+            
+            with open(entry.path, 'r') as f:
+                content = f.read() if needs_content_search else f.read(NOTE_HEAD_CHARS)
+            
+            if needs_content_search and query_lower not in content.lower():
+                return None
+            
+            return _note_listing(entry.name, content, entry.stat().st_mtime)
+        except Exception as e:
+            logger.error(f"Error reading note {entry.path}: {e}")
+            return None
+    
     def get_note_content(self, title: str) -> Dict[str, Any]:
         """Get full content of a specific note"""
         try:
-            filename = self._sanitize_filename(title) + ".txt"
+            filename = _sanitize_filename(title) + ".txt"
             filepath = NOTES_DIR / filename
             
             if not filepath.exists():
@@ -194,8 +440,9 @@ Created: {datetime.now().isoformat()}
                 "completed_at": None
             }
             
-            self.tasks.append(task_obj)
-            self._save_tasks()
+            self._tasks_by_id[task_obj["id"]] = task_obj
+            self._sorted_tasks.pop(False, None)
+            self._append_mutation({"op": "upsert", "task": task_obj})
             
             logger.info(f"Created task: {task}")
             
@@ -219,14 +466,12 @@ Created: {datetime.now().isoformat()}
             List of tasks
         """
         try:
-            filtered = [t for t in self.tasks if t["completed"] == completed]
-            
-            # Sort by priority and due date
-            priority_order = {"high": 0, "medium": 1, "low": 2}
-            filtered.sort(key=lambda t: (
-                priority_order.get(t["priority"], 1),
-                t["due_date"] or "9999-12-31"
-            ))
+            # Sorted by priority and due date, cached until the tasks change
+            ordered = self._sorted_tasks.get(completed)
+            if ordered is None:
+                ordered = sorted((t for t in self._tasks_by_id.values() if t["completed"] == completed), key=_task_sort_key)
+                self._sorted_tasks[completed] = ordered
+            filtered = list(ordered)
             
             return {
                 "status": "success",
@@ -241,14 +486,15 @@ Created: {datetime.now().isoformat()}
     def complete_task(self, task_id: str) -> Dict[str, Any]:
         """Mark a task as completed"""
         try:
-            task = next((t for t in self.tasks if t["id"] == task_id), None)
+            task = self._tasks_by_id.get(task_id)
             
             if not task:
                 return {"status": "error", "error": f"Task {task_id} not found"}
             
             task["completed"] = True
             task["completed_at"] = datetime.now().isoformat()
-            self._save_tasks()
+            self._sorted_tasks.clear()
+            self._append_mutation({"op": "upsert", "task": task})
             
             return {
                 "status": "success",
@@ -262,13 +508,13 @@ Created: {datetime.now().isoformat()}
     def delete_task(self, task_id: str) -> Dict[str, Any]:
         """Delete a task"""
         try:
-            task = next((t for t in self.tasks if t["id"] == task_id), None)
+            task = self._tasks_by_id.pop(task_id, None)
             
             if not task:
                 return {"status": "error", "error": f"Task {task_id} not found"}
             
-            self.tasks.remove(task)
-            self._save_tasks()
+            self._sorted_tasks.pop(task["completed"], None)
+            self._append_mutation({"op": "delete", "id": task_id})
             
             return {
                 "status": "success",
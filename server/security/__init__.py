@@ -1,20 +1,33 @@
 """
 Security module initialization
 """
-from server.security.credential_vault import CredentialVault
+import os
+
+from server.security.credential_vault import CredentialVault, get_vault
 from server.security.oauth2_handler import OAuth2Handler
 
+# Opt-in API key enforcement: the bundled UI does not send X-API-Key yet,
+# so checking stays off unless REQUIRE_API_KEY=1 is set
+REQUIRE_API_KEY = os.environ.get("REQUIRE_API_KEY", "").strip().lower() in ("1", "true", "yes")
+
+
 # Simple API key check function
 def require_api_key(api_key: str = None):
     """
-    Verify API key (placeholder - add real implementation later)
-    For now, allow all requests
+    Verify API key when REQUIRE_API_KEY is enabled; otherwise allow all requests
+
+    Args:
+        api_key: Value of the X-API-Key header (may be None)
     """
-    # TODO: Implement real API key verification
-    pass
+    if not REQUIRE_API_KEY:
+        return
+    from server.security import api_key as _api_key
+    _api_key.require_api_key(api_key)
 
 __all__ = [
     'CredentialVault',
+    'get_vault',
     'OAuth2Handler',
-    'require_api_key'
+    'require_api_key',
+    'REQUIRE_API_KEY'
 ]
@@ -4,19 +4,26 @@ and a config.env fallback in ~/ExecutiveAssistant/config.env.
 
 Provide require_api_key(x_api_key) which raises fastapi.HTTPException(401) on mismatch.
 """
+import hmac
 import os
+import re
+import threading
 from typing import Optional
 
-try:
-    import keyring
-except Exception:
-    keyring = None  # keyring is optional at import time; requirements.txt will include it
-
 from fastapi import HTTPException
 
 SERVICE_NAME = "ExecutiveAssistant"
 KEYCHAIN_USERNAME = "api_key"  # service/account used with keyring.get_password
 
+# Expected key memoized for the process lifetime (None = no key configured)
+_UNSET = object()
+_expected_key_cache = _UNSET
+_expected_key_bytes: Optional[bytes] = None  # UTF-8 form for the constant-time compare
+_expected_key_lock = threading.Lock()
+
+# API_KEY=value line in config.env (commented-out lines don't match)
+_API_KEY_LINE_RE = re.compile(r"^[ \t]*API_KEY[ \t]*=(.*)$", re.MULTILINE)
+
 
 def _get_from_env() -> Optional[str]:
     v = os.environ.get("API_KEY")
@@ -26,7 +33,9 @@ def _get_from_env() -> Optional[str]:
 
 
 def _get_from_keyring() -> Optional[str]:
-    if keyring is None:
+    try:
+        import keyring  # optional; only needed once thanks to the key memoization
+    except Exception:
         return None
     try:
         val = keyring.get_password(SERVICE_NAME, KEYCHAIN_USERNAME)
@@ -35,28 +44,27 @@ def _get_from_keyring() -> Optional[str]:
         return None
 
 
+def _parse_config_api_key(text: str) -> Optional[str]:
+    """API_KEY value from config.env text (first occurrence wins)."""
+    m = _API_KEY_LINE_RE.search(text)
+    if not m:
+        return None
+    return m.group(1).strip().strip('"').strip("'")
+
+
 def _get_from_config() -> Optional[str]:
     cfg = os.path.expanduser("~/ExecutiveAssistant/config.env")
     if not os.path.exists(cfg):
         return None
     try:
+        # Read once per key lookup; get_expected_api_key memoizes the result
         with open(cfg, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                if k.strip() == "API_KEY":
-                    return v.strip().strip('"').strip("'")
+            return _parse_config_api_key(f.read())
     except Exception:
         return None
-    return None
 
 
-def get_expected_api_key() -> Optional[str]:
-    """Return expected API key from env, keychain, or config (first found)."""
+def _lookup_expected_api_key() -> Optional[str]:
     for getter in (_get_from_env, _get_from_keyring, _get_from_config):
         try:
             val = getter()
@@ -67,6 +75,26 @@ def get_expected_api_key() -> Optional[str]:
     return None
 
 
+def get_expected_api_key() -> Optional[str]:
+    """Return expected API key from env, keychain, or config (first found), looked up once."""
+    global _expected_key_cache, _expected_key_bytes
+    if _expected_key_cache is _UNSET:
+        with _expected_key_lock:
+            if _expected_key_cache is _UNSET:
+                key = _lookup_expected_api_key()
+                _expected_key_bytes = key.encode("utf-8") if key else None
+                _expected_key_cache = key
+    return _expected_key_cache
+
+
+def _reset_expected_api_key_cache():
+    """Forget the memoized key (tests, or after rotating the key)."""
+    global _expected_key_cache, _expected_key_bytes
+    with _expected_key_lock:
+        _expected_key_cache = _UNSET
+        _expected_key_bytes = None
+
+
 def require_api_key(x_api_key: Optional[str]):
     """
     Raises HTTPException(401) if a key is expected and mismatched.
@@ -79,5 +107,6 @@ def require_api_key(x_api_key: Optional[str]):
         return
     if not x_api_key:
         raise HTTPException(status_code=401, detail="Missing API key header (X-API-Key)")
-    if x_api_key != expected:
+    expected_bytes = _expected_key_bytes or expected.encode("utf-8")  # reset may race the read
+    if not hmac.compare_digest(x_api_key.encode("utf-8"), expected_bytes):
         raise HTTPException(status_code=401, detail="Invalid API key")
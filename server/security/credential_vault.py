@@ -2,13 +2,15 @@
 Credential Vault - Secure credential storage using macOS Keychain
 Location: server/security/credential_vault.py
 """
+import functools
 import logging
-import keyring
-import json
-from typing import Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import os
-from cryptography.fernet import Fernet
+
+import orjson
 
 logger = logging.getLogger("credential_vault")
 
@@ -19,19 +21,35 @@ KEYCHAIN_SERVICE = "ExecutiveAssistant"
 DATA_DIR = Path(os.path.expanduser("~/Library/Application Support/ExecutiveAssistant/data"))
 ACCOUNTS_METADATA = DATA_DIR / "config" / "accounts.json"
 
+# Token endpoint calls made concurrently by refresh_expired_tokens
+TOKEN_REFRESH_WORKERS = 8
+
+
+def _keychain_key(account_id: str, credential_type: str) -> str:
+    """Keychain account name for one credential (format shared by every vault call)"""
+    return f"{account_id}_{credential_type}"
+
+
+@functools.lru_cache(maxsize=1)
+def _keyring():
+    """keyring, imported on first credential access (backend discovery is slow)"""
+    import keyring
+    return keyring
+
 
 class CredentialVault:
     """Secure credential storage using macOS Keychain"""
     
     def __init__(self):
         self.accounts_metadata = self._load_accounts_metadata()
+        # Shared process-wide (see get_vault), so metadata updates are serialized
+        self._lock = threading.RLock()
         
     def _load_accounts_metadata(self) -> Dict:
         """Load account metadata (NOT credentials)"""
         try:
             if ACCOUNTS_METADATA.exists():
-                with open(ACCOUNTS_METADATA, 'r') as f:
-                    return json.load(f)
+                return orjson.loads(ACCOUNTS_METADATA.read_bytes())
             return {}
         except Exception as e:
             logger.error(f"Error loading accounts metadata: {e}")
@@ -41,11 +59,38 @@ class CredentialVault:
         """Save account metadata"""
         try:
             ACCOUNTS_METADATA.parent.mkdir(parents=True, exist_ok=True)
-            with open(ACCOUNTS_METADATA, 'w') as f:
-                json.dump(self.accounts_metadata, f, indent=2)
+            # Temp file + rename, so a crash mid-write can't truncate the only copy
+            tmp = ACCOUNTS_METADATA.with_suffix(".json.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(orjson.dumps(self.accounts_metadata))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, ACCOUNTS_METADATA)
         except Exception as e:
             logger.error(f"Error saving accounts metadata: {e}")
     
+    def _record_credential(self, account_id: str, provider: str, email: str,
+                           credential_type: str, additional_data: Optional[Dict] = None):
+        """Update account metadata for a stored credential (caller holds the lock and saves)"""
+        # Store metadata (NOT credentials)
+        if account_id not in self.accounts_metadata:
+            self.accounts_metadata[account_id] = {
+                "provider": provider,
+                "email": email,
+                "credential_types": [],
+                "created_at": None,
+                "updated_at": None
+            }
+        
+        if credential_type not in self.accounts_metadata[account_id]["credential_types"]:
+            self.accounts_metadata[account_id]["credential_types"].append(credential_type)
+        
+        # Store additional data if provided
+        if additional_data:
+            self.accounts_metadata[account_id]["additional_data"] = additional_data
+        
+        self.accounts_metadata[account_id]["updated_at"] = None  # Will be set by caller
+    
     def store_credentials(self, account_id: str, provider: str, email: str,
                          credential_type: str, credential_value: str,
                          additional_data: Optional[Dict] = None) -> bool:
@@ -65,29 +110,12 @@ class CredentialVault:
         """
         try:
             # Store credential in Keychain
-            keychain_key = f"{account_id}_{credential_type}"
-            keyring.set_password(KEYCHAIN_SERVICE, keychain_key, credential_value)
-            
-            # Store metadata (NOT credentials)
-            if account_id not in self.accounts_metadata:
-                self.accounts_metadata[account_id] = {
-                    "provider": provider,
-                    "email": email,
-                    "credential_types": [],
-                    "created_at": None,
-                    "updated_at": None
-                }
+            keychain_key = _keychain_key(account_id, credential_type)
+            _keyring().set_password(KEYCHAIN_SERVICE, keychain_key, credential_value)
             
-            if credential_type not in self.accounts_metadata[account_id]["credential_types"]:
-                self.accounts_metadata[account_id]["credential_types"].append(credential_type)
-            
-            # Store additional data if provided
-            if additional_data:
-                self.accounts_metadata[account_id]["additional_data"] = additional_data
-            
-            self.accounts_metadata[account_id]["updated_at"] = None  # Will be set by caller
-            
-            self._save_accounts_metadata()
+            with self._lock:
+                self._record_credential(account_id, provider, email, credential_type, additional_data)
+                self._save_accounts_metadata()
             
             logger.info(f"Stored {credential_type} for {account_id} in Keychain")
             return True
@@ -108,8 +136,8 @@ class CredentialVault:
             Credential value or None
         """
         try:
-            keychain_key = f"{account_id}_{credential_type}"
-            credential = keyring.get_password(KEYCHAIN_SERVICE, keychain_key)
+            keychain_key = _keychain_key(account_id, credential_type)
+            credential = _keyring().get_password(KEYCHAIN_SERVICE, keychain_key)
             
             if credential:
                 logger.info(f"Retrieved {credential_type} for {account_id}")
@@ -122,6 +150,37 @@ class CredentialVault:
             logger.error(f"Error retrieving credentials: {e}")
             return None
     
+    def get_credentials_batch(self, account_ids: List[str], credential_type: str) -> Dict[str, Optional[str]]:
+        """
+        Retrieve one credential type for several accounts
+        
+        Accounts whose metadata doesn't list the credential type are skipped
+        without a Keychain lookup.
+        
+        Args:
+            account_ids: Account identifiers
+            credential_type: Type of credential to retrieve
+            
+        Returns:
+            Dict of account_id -> credential value or None
+        """
+        credentials = {}
+        for account_id in account_ids:
+            metadata = self.accounts_metadata.get(account_id, {})
+            if credential_type not in metadata.get("credential_types", []):
+                credentials[account_id] = None
+                continue
+            try:
+                keychain_key = _keychain_key(account_id, credential_type)
+                credentials[account_id] = _keyring().get_password(KEYCHAIN_SERVICE, keychain_key)
+            except Exception as e:
+                logger.error(f"Error retrieving credentials for {account_id}: {e}")
+                credentials[account_id] = None
+        
+        found = sum(1 for value in credentials.values() if value)
+        logger.info(f"Retrieved {credential_type} for {found}/{len(account_ids)} accounts")
+        return credentials
+    
     def delete_credentials(self, account_id: str) -> bool:
         """
         Delete all credentials for an account
@@ -133,23 +192,25 @@ class CredentialVault:
             Success boolean
         """
         try:
-            if account_id not in self.accounts_metadata:
-                logger.warning(f"Account {account_id} not found")
-                return False
+            with self._lock:
+                if account_id not in self.accounts_metadata:
+                    logger.warning(f"Account {account_id} not found")
+                    return False
+                
+                # Remove metadata
+                credential_types = self.accounts_metadata.pop(account_id).get("credential_types", [])
+                self._save_accounts_metadata()
             
-            # Delete all credential types
-            credential_types = self.accounts_metadata[account_id].get("credential_types", [])
+            # Delete all credential types; Keychain round-trips happen outside the lock
+            # so other accounts' vault calls aren't held up behind them
+            keyring = _keyring()
             for cred_type in credential_types:
-                keychain_key = f"{account_id}_{cred_type}"
+                keychain_key = _keychain_key(account_id, cred_type)
                 try:
                     keyring.delete_password(KEYCHAIN_SERVICE, keychain_key)
                 except Exception as e:
                     logger.warning(f"Could not delete {cred_type}: {e}")
             
-            # Remove metadata
-            del self.accounts_metadata[account_id]
-            self._save_accounts_metadata()
-            
             logger.info(f"Deleted credentials for {account_id}")
             return True
             
@@ -183,11 +244,14 @@ class CredentialVault:
             from datetime import datetime, timedelta
             
             # Store tokens in Keychain
-            self.store_credentials(account_id, "", "", "oauth_access_token", access_token)
-            self.store_credentials(account_id, "", "", "oauth_refresh_token", refresh_token)
+            keyring = _keyring()
+            keyring.set_password(KEYCHAIN_SERVICE, _keychain_key(account_id, "oauth_access_token"), access_token)
+            keyring.set_password(KEYCHAIN_SERVICE, _keychain_key(account_id, "oauth_refresh_token"), refresh_token)
             
-            # Update expiry in metadata
-            if account_id in self.accounts_metadata:
+            # Token types and expiry in metadata, written once
+            with self._lock:
+                self._record_credential(account_id, "", "", "oauth_access_token")
+                self._record_credential(account_id, "", "", "oauth_refresh_token")
                 expiry = (datetime.now() + timedelta(seconds=expires_in)).isoformat()
                 self.accounts_metadata[account_id]["token_expiry"] = expiry
                 self._save_accounts_metadata()
@@ -199,6 +263,74 @@ class CredentialVault:
             logger.error(f"Error updating OAuth tokens: {e}")
             return False
     
+    def refresh_expired_tokens(self, account_ids: Optional[List[str]] = None) -> Dict[str, bool]:
+        """
+        Refresh expired OAuth tokens for several accounts at once
+        
+        Token endpoint calls run concurrently and accounts.json is written once.
+        
+        Args:
+            account_ids: Accounts to consider (default: all)
+            
+        Returns:
+            Dict of account_id -> refreshed successfully, for expired OAuth accounts only
+        """
+        from datetime import datetime, timedelta
+        from server.security.oauth2_handler import OAuth2Handler
+        
+        candidates = []
+        for account_id in (account_ids if account_ids is not None else list(self.accounts_metadata)):
+            metadata = self.accounts_metadata.get(account_id)
+            if metadata and "oauth_refresh_token" in metadata.get("credential_types", []) \
+                    and self.is_token_expired(account_id):
+                candidates.append((account_id, metadata))
+        if not candidates:
+            return {}
+        
+        def refresh(candidate):
+            account_id, metadata = candidate
+            try:
+                additional_data = metadata.get("additional_data", {})
+                client_id = additional_data.get("client_id")
+                client_secret = additional_data.get("client_secret")
+                refresh_token = self.get_credentials(account_id, "oauth_refresh_token")
+                if not refresh_token or not client_id or not client_secret:
+                    logger.error(f"Missing OAuth2 credentials for {account_id}")
+                    return None
+                
+                tokens = OAuth2Handler(metadata.get("provider", ""), client_id, client_secret) \
+                    .refresh_access_token(refresh_token)
+                if not tokens:
+                    return None
+                
+                keyring = _keyring()
+                keyring.set_password(KEYCHAIN_SERVICE, _keychain_key(account_id, "oauth_access_token"), tokens["access_token"])
+                keyring.set_password(KEYCHAIN_SERVICE, _keychain_key(account_id, "oauth_refresh_token"), tokens["refresh_token"])
+                return tokens
+            except Exception as e:
+                logger.error(f"Token refresh error for {account_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(TOKEN_REFRESH_WORKERS, len(candidates))) as pool:
+            results = list(pool.map(refresh, candidates))
+        
+        refreshed = {}
+        now = datetime.now()
+        with self._lock:
+            for (account_id, _), tokens in zip(candidates, results):
+                refreshed[account_id] = tokens is not None
+                if tokens is None or account_id not in self.accounts_metadata:
+                    continue
+                self._record_credential(account_id, "", "", "oauth_access_token")
+                self._record_credential(account_id, "", "", "oauth_refresh_token")
+                expiry = (now + timedelta(seconds=tokens["expires_in"])).isoformat()
+                self.accounts_metadata[account_id]["token_expiry"] = expiry
+            if any(refreshed.values()):
+                self._save_accounts_metadata()
+        
+        logger.info(f"Refreshed OAuth tokens for {sum(refreshed.values())}/{len(refreshed)} expired accounts")
+        return refreshed
+    
     def is_token_expired(self, account_id: str) -> bool:
         """Check if OAuth token is expired"""
         try:
@@ -216,4 +348,10 @@ class CredentialVault:
             
         except Exception as e:
             logger.error(f"Error checking token expiry: {e}")
-            return True
\ No newline at end of file
+            return True
+
+
+@functools.lru_cache(maxsize=1)
+def get_vault() -> CredentialVault:
+    """Process-wide CredentialVault, so accounts.json is read once and every manager sees the same accounts"""
+    return CredentialVault()
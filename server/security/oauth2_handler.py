@@ -2,46 +2,57 @@
 OAuth2 Handler - OAuth2 flow for Gmail and Hotmail
 Location: server/security/oauth2_handler.py
 """
+import atexit
+import functools
 import logging
 import webbrowser
 import http.server
-import socketserver
 import urllib.parse
+from types import MappingProxyType
 from typing import Dict, Any, Optional, Tuple
-from threading import Thread
-import time
+from threading import Event, Thread
 
 from authlib.integrations.requests_client import OAuth2Session
-import requests
+import httpx
 
 logger = logging.getLogger("oauth2_handler")
 
-# OAuth2 configurations
-GMAIL_CONFIG = {
+# OAuth2 configurations (read-only; handlers merge in their client credentials)
+GMAIL_CONFIG = MappingProxyType({
     "client_id": None,  # Set during account setup
     "client_secret": None,
     "auth_uri": "https://accounts.google.com/o/oauth2/v2/auth",
     "token_uri": "https://oauth2.googleapis.com/token",
-    "scopes": [
+    "scopes": (
         "https://www.googleapis.com/auth/gmail.readonly",
         "https://www.googleapis.com/auth/gmail.send",
         "https://www.googleapis.com/auth/gmail.modify"
-    ],
+    ),
     "redirect_uri": "http://localhost:8888/oauth2callback"
-}
+})
 
-HOTMAIL_CONFIG = {
+HOTMAIL_CONFIG = MappingProxyType({
     "client_id": None,  # Set during account setup
     "client_secret": None,
     "auth_uri": "https://login.microsoftonline.com/common/oauth2/v2.0/authorize",
     "token_uri": "https://login.microsoftonline.com/common/oauth2/v2.0/token",
-    "scopes": [
+    "scopes": (
         "https://outlook.office.com/Mail.Read",
         "https://outlook.office.com/Mail.Send",
         "offline_access"
-    ],
+    ),
     "redirect_uri": "http://localhost:8888/oauth2callback"
-}
+})
+
+PROVIDER_CONFIGS = {"gmail": GMAIL_CONFIG, "hotmail": HOTMAIL_CONFIG}
+
+
+@functools.lru_cache(maxsize=1)
+def _http_client() -> httpx.Client:
+    """Shared keep-alive client for token endpoints, so refreshes reuse the TLS connection"""
+    client = httpx.Client(timeout=30.0, limits=httpx.Limits(max_keepalive_connections=8))
+    atexit.register(client.close)
+    return client
 
 
 class OAuth2CallbackHandler(http.server.SimpleHTTPRequestHandler):
@@ -49,6 +60,8 @@ class OAuth2CallbackHandler(http.server.SimpleHTTPRequestHandler):
     
     auth_code = None
     auth_error = None
+    # Set once the callback has delivered a code or an error
+    done = Event()
     
     def do_GET(self):
         """Handle OAuth2 callback"""
@@ -66,6 +79,7 @@ class OAuth2CallbackHandler(http.server.SimpleHTTPRequestHandler):
             <p>You can close this window and return to the application.</p>
             </body></html>
             """)
+            OAuth2CallbackHandler.done.set()
         elif 'error' in query:
             OAuth2CallbackHandler.auth_error = query['error'][0]
             self.send_response(400)
@@ -77,6 +91,7 @@ class OAuth2CallbackHandler(http.server.SimpleHTTPRequestHandler):
             <p>Error: {query['error'][0]}</p>
             </body></html>
             """.encode())
+            OAuth2CallbackHandler.done.set()
         
         # Suppress log messages
         def log_message(self, format, *args):
@@ -97,15 +112,11 @@ class OAuth2Handler:
         """
         self.provider = provider.lower()
         
-        if self.provider == "gmail":
-            self.config = GMAIL_CONFIG.copy()
-        elif self.provider == "hotmail":
-            self.config = HOTMAIL_CONFIG.copy()
-        else:
+        base_config = PROVIDER_CONFIGS.get(self.provider)
+        if base_config is None:
             raise ValueError(f"Unsupported provider: {provider}")
         
-        self.config["client_id"] = client_id
-        self.config["client_secret"] = client_secret
+        self.config = {**base_config, "client_id": client_id, "client_secret": client_secret}
         
         self.session = None
     
@@ -135,40 +146,36 @@ class OAuth2Handler:
             # Start local callback server
             OAuth2CallbackHandler.auth_code = None
             OAuth2CallbackHandler.auth_error = None
+            OAuth2CallbackHandler.done.clear()
             
-            server = socketserver.TCPServer(("localhost", 8888), OAuth2CallbackHandler)
+            # Threaded so favicon/secondary requests can't hold up the callback
+            server = http.server.ThreadingHTTPServer(("localhost", 8888), OAuth2CallbackHandler)
             server_thread = Thread(target=server.serve_forever)
             server_thread.daemon = True
             server_thread.start()
             
-            # Open browser for authorization
-            logger.info("Opening browser for authorization...")
-            webbrowser.open(authorization_url)
-            
-            # Wait for callback (timeout 5 minutes)
-            timeout = 300
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                if OAuth2CallbackHandler.auth_code:
-                    # Success - exchange code for tokens
-                    server.shutdown()
-                    
-                    tokens = self._exchange_code_for_tokens(OAuth2CallbackHandler.auth_code)
-                    if tokens:
-                        return True, tokens, None
-                    else:
-                        return False, None, "Failed to exchange authorization code for tokens"
+            try:
+                # Open browser for authorization
+                logger.info("Opening browser for authorization...")
+                webbrowser.open(authorization_url)
                 
-                elif OAuth2CallbackHandler.auth_error:
-                    server.shutdown()
-                    return False, None, f"Authorization error: {OAuth2CallbackHandler.auth_error}"
-                
-                time.sleep(0.5)
-            
-            # Timeout
-            server.shutdown()
-            return False, None, "Authorization timeout - user did not complete flow"
+                # Wait for callback (timeout 5 minutes)
+                timeout = 300
+                if not OAuth2CallbackHandler.done.wait(timeout=timeout):
+                    return False, None, "Authorization timeout - user did not complete flow"
+            finally:
+                server.shutdown()
+                server.server_close()  # Release port 8888 right away
+            
+            if OAuth2CallbackHandler.auth_error:
+                return False, None, f"Authorization error: {OAuth2CallbackHandler.auth_error}"
+            
+            # Success - exchange code for tokens
+            tokens = self._exchange_code_for_tokens(OAuth2CallbackHandler.auth_code)
+            if tokens:
+                return True, tokens, None
+            else:
+                return False, None, "Failed to exchange authorization code for tokens"
             
         except Exception as e:
             logger.error(f"OAuth2 flow error: {e}")
@@ -211,7 +218,7 @@ class OAuth2Handler:
                 "grant_type": "refresh_token"
             }
             
-            response = requests.post(self.config["token_uri"], data=data)
+            response = _http_client().post(self.config["token_uri"], data=data)
             response.raise_for_status()
             
             token_data = response.json()
@@ -239,7 +246,7 @@ class OAuth2Handler:
             else:
                 return False
             
-            response = requests.post(revoke_url, data={"token": token})
+            response = _http_client().post(revoke_url, data={"token": token})
             return response.status_code == 200
             
         except Exception as e:
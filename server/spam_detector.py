@@ -3,36 +3,152 @@ AI-powered spam detector using Ollama LLM
 Categorizes emails as spam/keep/unsure with reasoning
 """
 import logging
-from typing import List, Dict
-from server.llm.ollama_adapter import OllamaAdapter
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+import orjson
+
+from server.llm.ollama_adapter import OllamaAdapter, OLLAMA_HTTP, LLM_MAX_IN_FLIGHT, LLM_SLOTS
+from server.spam_rules import sender_verdict
 
 logger = logging.getLogger("spam_detector")
 
+# Llama 3.2 3B instruct (Q4_K_M), the model the installer already pulls: categorizing
+# from sender/subject doesn't need a 7B, and the 3B is ~2-3x faster per email
+SPAM_DETECTOR_MODEL = os.environ.get("SPAM_DETECTOR_MODEL", "llama3.2:3b")
+# Comma-separated Ollama servers to spread categorization over (default: the local daemon)
+SPAM_DETECTOR_OLLAMA_URLS = [u.strip() for u in os.environ.get("SPAM_DETECTOR_OLLAMA_URLS", "").split(",") if u.strip()]
+# Sampling options for every spam request. One context size for single and batched
+# prompts (a 10-email batch fits): Ollama reloads the model when num_ctx changes.
+SPAM_NUM_CTX = 2048
+SPAM_LLM_OPTIONS = {"temperature": 0.0, "num_ctx": SPAM_NUM_CTX}
+# Output cap for a single-email answer (CATEGORY line + one-sentence REASONING)
+SPAM_NUM_PREDICT = 48
+SPAM_SINGLE_OPTIONS = {**SPAM_LLM_OPTIONS, "num_predict": SPAM_NUM_PREDICT}
+
+# Identical for every email and sent first, so Ollama's prompt cache reuses its
+# evaluated tokens and only the per-email details at the end are prefilled
+_SPAM_INSTRUCTIONS = """**Instructions:**
+- SPAM: Promotional emails, newsletters, automated notifications, marketing, social media updates, etc.
+- KEEP: Personal emails, important business correspondence, financial statements, receipts
+- UNSURE: Can't determine with confidence
+"""
+SPAM_PROMPT_PREFIX = """You are an email categorization assistant. Analyze the email below and categorize it as SPAM, KEEP, or UNSURE.
+
+""" + _SPAM_INSTRUCTIONS + """
+**Response format (use EXACTLY this format):**
+CATEGORY: [SPAM|KEEP|UNSURE]
+REASONING: [One short sentence]
+"""
+# Several emails per request (batch_categorize), answered as JSON
+SPAM_BATCH_PROMPT_PREFIX = """You are an email categorization assistant. Categorize each numbered email below as SPAM, KEEP, or UNSURE.
+
+""" + _SPAM_INSTRUCTIONS + """
+**Response format:** a JSON object with one entry per email, in order:
+{"results": [{"id": 1, "category": "SPAM", "reasoning": "a few words"}, ...]}
+"""
+# Output token budget per email in a batched request
+SPAM_BATCH_TOKENS_PER_EMAIL = 48
+
+def _domain_verdict(email: Dict) -> Optional[Tuple[str, str]]:
+    """(category, reasoning) from the sender rules, or None to ask the LLM"""
+    return sender_verdict(email.get("from", ""))
+
+
+# Verdicts remembered per (sender domain, normalized subject), so recurring
+# templated mail ("Your order #123 has shipped") skips the LLM
+VERDICT_CACHE_SIZE = 2048
+# First word of the "CATEGORY:" line (past brackets/markdown) and first line of
+# "REASONING:" in LLM answers
+_CATEGORY_RE = re.compile(r"^[ \t]*CATEGORY:[^A-Za-z\n]*([A-Za-z]+)", re.IGNORECASE | re.MULTILINE)
+_CATEGORY_MAP = {"SPAM": "spam", "KEEP": "keep", "UNSURE": "unsure"}
+_REASONING_RE = re.compile(r"REASONING:\s*([^\n]*)", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _verdict_key(email: Dict) -> Tuple[str, str]:
+    """Sender domain and subject with numbers and spacing normalized away"""
+    domain = email.get("from", "").rsplit("@", 1)[-1].strip(" >").lower()
+    subject = _SPACES_RE.sub(" ", _DIGITS_RE.sub("#", email.get("subject", "").lower())).strip()
+    return domain, subject
+
 class SpamDetector:
     """Uses Ollama to intelligently categorize emails"""
     
-    def __init__(self, model_name: str = "qwen2.5:7b-instruct"):
-        self.ollama = OllamaAdapter()
+    def __init__(self, model_name: str = SPAM_DETECTOR_MODEL, ollama_urls: Optional[List[str]] = None):
+        """
+        Args:
+            model_name: Ollama model used for categorization
+            ollama_urls: Ollama servers (replicas) to spread requests over; defaults to
+                SPAM_DETECTOR_OLLAMA_URLS, else the local daemon
+        """
+        urls = ollama_urls or SPAM_DETECTOR_OLLAMA_URLS or [OLLAMA_HTTP]
+        self.replicas = [OllamaAdapter(base_url=url) for url in urls]
+        self.ollama = self.replicas[0]
         self.model = model_name
+        # LLM_MAX_IN_FLIGHT request slots per replica; a request takes whichever slot frees
+        # first, so faster replicas pick up more of the work
+        self._replica_slots: "queue.Queue[OllamaAdapter]" = queue.Queue()
+        for _ in range(LLM_MAX_IN_FLIGHT):
+            for adapter in self.replicas:
+                self._replica_slots.put(adapter)
+        # (domain, normalized subject) -> (category, reasoning), LRU; batch_categorize fills it from threads
+        self._verdicts: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._verdicts_lock = threading.Lock()
+    
+    def _cached_verdict(self, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        with self._verdicts_lock:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self._verdicts.move_to_end(key)
+            return verdict
+    
+    def _remember_verdict(self, key: Tuple[str, str], category: str, reasoning: str):
+        with self._verdicts_lock:
+            self._verdicts[key] = (category, reasoning)
+            if len(self._verdicts) > VERDICT_CACHE_SIZE:
+                self._verdicts.popitem(last=False)
+    
+    def _generate(self, prompt: str, **kwargs) -> str:
+        """generate() on the first replica with a free slot"""
+        adapter = self._replica_slots.get()
+        try:
+            if adapter.base_url == OLLAMA_HTTP:
+                # The local daemon is shared with the rest of the process
+                with LLM_SLOTS:
+                    return adapter.generate(model=self.model, prompt=prompt, **kwargs)
+            return adapter.generate(model=self.model, prompt=prompt, **kwargs)
+        finally:
+            self._replica_slots.put(adapter)
     
     def categorize_email(self, email: Dict) -> Dict:
         """
         Categorize a single email using AI
         Returns: {"category": "spam"|"keep"|"unsure", "reasoning": "...", ...}
         """
+        verdict = _domain_verdict(email)
+        if verdict is not None:
+            return {**email, "category": verdict[0], "reasoning": verdict[1]}
+        
+        key = _verdict_key(email)
+        verdict = self._cached_verdict(key)
+        if verdict is not None:
+            return {**email, "category": verdict[0], "reasoning": verdict[1]}
+        
         prompt = self._build_prompt(email)
         
         try:
-            response = self.ollama.generate(
-                model=self.model,
-                prompt=prompt,
-                temperature=0.1  # Low temp for consistent categorization
+            response = self._generate(
+                prompt,
+                options=SPAM_SINGLE_OPTIONS  # Deterministic, short answer
             )
             
-            # DEBUG: Print what we got
-            print(f"\n?? DEBUG - Raw Ollama response type: {type(response)}")
-            print(f"?? DEBUG - Raw Ollama response: {response[:500] if isinstance(response, str) else response}")
-            
             # FIX: Handle Ollama response object properly
             if isinstance(response, dict):
                 # If response is a dict, extract the content
@@ -44,11 +160,14 @@ class SpamDetector:
                 # Fallback to string conversion
                 response_text = str(response)
             
-            print(f"?? DEBUG - Extracted text: {response_text[:300] if response_text else 'EMPTY!'}")
-            
             category, reasoning = self._parse_response(response_text)
             
-            print(f"?? DEBUG - Parsed category: {category}, reasoning: {reasoning[:100] if reasoning else 'NONE'}\n")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Ollama raw: %s -> %s (%s)", response_text[:300], category, reasoning[:100])
+            
+            # Only confident verdicts; "unsure" may just be a failed/empty response
+            if category != "unsure":
+                self._remember_verdict(key, category, reasoning)
             
             return {
                 **email,
@@ -58,7 +177,6 @@ class SpamDetector:
         
         except Exception as e:
             logger.error(f"Categorization failed for {email.get('id')}: {e}")
-            print(f"? EXCEPTION: {e}")
             return {
                 **email,
                 "category": "unsure",
@@ -68,83 +186,111 @@ class SpamDetector:
     def batch_categorize(self, emails: List[Dict], 
                          batch_size: int = 10, progress_callback=None) -> List[Dict]:
         """
-        Categorize multiple emails in batches
+        Categorize multiple emails, batch_size emails per LLM request
+        
+        Sender rules and remembered verdicts are applied first; the rest are
+        packed into numbered prompts, several in flight on each Ollama replica
+        (the local daemon's share capped process-wide by LLM_SLOTS). A batch
+        whose answer can't be used is redone per email.
         Shows progress for large batches
         """
-        results = []
         total = len(emails)
+        results: List[Optional[Dict]] = [None] * total
         
         # Initialize real-time counters
-        spam_count = 0
-        keep_count = 0
-        unsure_count = 0
+        counts = {"spam": 0, "keep": 0, "unsure": 0}
+        done = 0
 
         logger.info(f"Categorizing {total} emails...")
-
-        for i in range(0, total, batch_size):
-            batch = emails[i:i+batch_size]
-
-            for email in batch:
-                result = self.categorize_email(email)
-                results.append(result)
-                
-                # Update counters immediately
-                category = result.get("category")
-                if category == "spam":
-                    spam_count += 1
-                elif category == "keep":
-                    keep_count += 1
-                elif category == "unsure":
-                    unsure_count += 1
-
-                # Report progress with counts if callback provided
-                if progress_callback:
-                    done = len(results)
-                    logger.info(f"🔔 Callback firing: {done}/{total} (Spam: {spam_count}, Keep: {keep_count}, Unsure: {unsure_count})")
-                    progress_callback({
-                        "current": done,
-                        "total": total,
-                        "spam_count": spam_count,
-                        "keep_count": keep_count,
-                        "unsure_count": unsure_count
-                    })
-
-            # Progress logging
-            done = min(i + batch_size, total)
-            logger.info(f"Progress: {done}/{total} emails categorized")
+        
+        def report(result: Dict):
+            nonlocal done
+            done += 1
+            category = result.get("category")
+            if category in counts:
+                counts[category] += 1
             
-            # Progress logging
-            done = min(i + batch_size, total)
-            logger.info(f"Progress: {done}/{total} emails categorized")
+            # Report progress with counts if callback provided
+            if progress_callback:
+                logger.info(f"🔔 Callback firing: {done}/{total} (Spam: {counts['spam']}, Keep: {counts['keep']}, Unsure: {counts['unsure']})")
+                progress_callback({
+                    "current": done,
+                    "total": total,
+                    "spam_count": counts["spam"],
+                    "keep_count": counts["keep"],
+                    "unsure_count": counts["unsure"]
+                })
+        
+        pending = []
+        for i, email in enumerate(emails):
+            verdict = _domain_verdict(email) or self._cached_verdict(_verdict_key(email))
+            if verdict is None:
+                pending.append(i)
+            else:
+                results[i] = {**email, "category": verdict[0], "reasoning": verdict[1]}
+                report(results[i])
         
-        # Summary
-        spam_count = sum(1 for r in results if r.get("category") == "spam")
-        keep_count = sum(1 for r in results if r.get("category") == "keep")
-        unsure_count = sum(1 for r in results if r.get("category") == "unsure")
+        chunks = [pending[j:j + batch_size] for j in range(0, len(pending), batch_size)]
+        if chunks:
+            workers = min(LLM_MAX_IN_FLIGHT * len(self.replicas), len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for chunk, chunk_results in zip(chunks, pool.map(
+                        lambda chunk: self._categorize_chunk([emails[i] for i in chunk]), chunks)):
+                    for i, result in zip(chunk, chunk_results):
+                        results[i] = result
+                        report(result)
+                    # Progress logging
+                    logger.info(f"Progress: {done}/{total} emails categorized")
         
-        logger.info(f"? Done: {spam_count} spam, {keep_count} keep, {unsure_count} unsure")
+        logger.info(f"? Done: {counts['spam']} spam, {counts['keep']} keep, {counts['unsure']} unsure")
+        
+        return results
+    
+    def _categorize_chunk(self, emails: List[Dict]) -> List[Dict]:
+        """Categorize several emails with one LLM request, per email if the answer is unusable"""
+        prompt = self._build_batch_prompt(emails)
+        try:
+            response = self._generate(
+                prompt,
+                format="json",
+                options={**SPAM_LLM_OPTIONS, "num_predict": SPAM_BATCH_TOKENS_PER_EMAIL * len(emails)}
+            )
+            verdicts = {int(v["id"]): v for v in orjson.loads(response)["results"]}
+            if sorted(verdicts) != list(range(1, len(emails) + 1)):
+                raise ValueError(f"{len(verdicts)} verdicts for {len(emails)} emails")
+        except Exception as e:
+            logger.warning(f"Batch spam categorization failed ({e}), categorizing {len(emails)} emails individually")
+            return [self.categorize_email(email) for email in emails]
         
+        results = []
+        for n, email in enumerate(emails, 1):
+            category = str(verdicts[n].get("category", "")).lower()
+            if category not in ("spam", "keep", "unsure"):
+                category = "unsure"
+            reasoning = str(verdicts[n].get("reasoning") or "No reasoning provided")[:200]
+            if category != "unsure":
+                self._remember_verdict(_verdict_key(email), category, reasoning)
+            results.append({**email, "category": category, "reasoning": reasoning})
         return results
     
+    def _build_batch_prompt(self, emails: List[Dict]) -> str:
+        """Numbered multi-email prompt asking for a JSON verdict per email"""
+        lines = [
+            f"{n}. From: {email.get('from', 'Unknown')} | Subject: {email.get('subject', 'No subject')} | "
+            f"Date: {email.get('date', 'Unknown')} | Size: {email.get('size_kb', 0)} KB"
+            for n, email in enumerate(emails, 1)
+        ]
+        return SPAM_BATCH_PROMPT_PREFIX + "\n**Emails:**\n" + "\n".join(lines) + "\n\nRespond now:"
+    
     def _build_prompt(self, email: Dict) -> str:
-        """Build categorization prompt for the LLM"""
-        return f"""You are an email categorization assistant. Analyze this email and categorize it as SPAM, KEEP, or UNSURE.
-
+        """Build categorization prompt for the LLM (shared instructions first, email last)"""
+        return SPAM_PROMPT_PREFIX + f"""
 **Email Details:**
 From: {email.get('from', 'Unknown')}
 Subject: {email.get('subject', 'No subject')}
 Date: {email.get('date', 'Unknown')}
 Size: {email.get('size_kb', 0)} KB
 
-**Instructions:**
-- SPAM: Promotional emails, newsletters, automated notifications, marketing, social media updates, etc.
-- KEEP: Personal emails, important business correspondence, financial statements, receipts
-- UNSURE: Can't determine with confidence
-
-**Response format (use EXACTLY this format):**
-CATEGORY: [SPAM|KEEP|UNSURE]
-REASONING: [Brief explanation]
-
 Respond now:"""
     
     def _parse_response(self, response: str) -> tuple:
@@ -152,28 +298,13 @@ Respond now:"""
         Parse LLM response into category and reasoning
         Returns: (category, reasoning)
         """
-        response = response.strip().upper()
-        
-        # Extract category
-        category = "unsure"  # default
-        if "CATEGORY:" in response:
-            for line in response.split('\n'):
-                if line.strip().startswith("CATEGORY:"):
-                    cat_value = line.split(":", 1)[1].strip()
-                    if "SPAM" in cat_value:
-                        category = "spam"
-                    elif "KEEP" in cat_value:
-                        category = "keep"
-                    elif "UNSURE" in cat_value:
-                        category = "unsure"
-                    break
+        # Extract category ("unsure" when missing or not one of the three)
+        match = _CATEGORY_RE.search(response)
+        category = _CATEGORY_MAP.get(match.group(1).upper(), "unsure") if match else "unsure"
         
         # Extract reasoning
-        reasoning = ""
-        if "REASONING:" in response:
-            parts = response.split("REASONING:", 1)
-            if len(parts) > 1:
-                reasoning = parts[1].strip().split('\n')[0][:200]  # First 200 chars
+        match = _REASONING_RE.search(response)
+        reasoning = match.group(1)[:200].strip() if match else ""  # First 200 chars
         
         if not reasoning:
             reasoning = "No reasoning provided"
@@ -0,0 +1,43 @@
+"""
+Sender rules that decide spam/keep without the LLM
+Location: server/spam_rules.py
+
+Dependency-free so both server/spam_detector.py and the standalone
+spam_detector.py script can share them.
+"""
+import re
+from typing import Optional, Tuple
+
+# Bulk-marketing senders decided without the LLM. Kept to mail-marketing platforms
+# and marketing mailboxes: no-reply senders also send receipts and statements.
+SPAM_DOMAINS = frozenset({
+    "mailchimp.com", "mcsv.net", "rsgsv.net", "mcdlv.net", "list-manage.com",
+    "constantcontact.com", "ccsend.com", "ccemails.com",
+    "klaviyomail.com", "hubspotemail.net", "mktomail.com", "exacttarget.com",
+})
+KEEP_DOMAINS = frozenset()  # e.g. your bank's statement domain
+SPAM_SENDER_RE = re.compile(r"\b(newsletters?|marketing|promotions?|offers|deals)@", re.IGNORECASE)
+
+
+def sender_verdict(sender: str) -> Optional[Tuple[str, str]]:
+    """
+    Apply the sender rules to a From address
+
+    Args:
+        sender: From header value ("Name <user@host>" or a bare address)
+
+    Returns:
+        (category, reasoning) with category "spam" or "keep", or None to ask the LLM
+    """
+    domain = sender.rsplit("@", 1)[-1].strip(" >").lower()
+    # Match the domain and its parents (bounce.mailchimp.com -> mailchimp.com)
+    labels = domain.split(".")
+    for i in range(len(labels) - 1):
+        parent = ".".join(labels[i:])
+        if parent in KEEP_DOMAINS:
+            return "keep", f"Sender rule: {parent} is a known-good domain"
+        if parent in SPAM_DOMAINS:
+            return "spam", f"Sender rule: {parent} is a bulk-marketing platform"
+    if SPAM_SENDER_RE.search(sender):
+        return "spam", "Sender rule: marketing mailbox"
+    return None
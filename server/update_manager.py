@@ -1,10 +1,18 @@
-﻿from pathlib import Path
+﻿import os
+from pathlib import Path
 APP_DIR = Path.home() / "ExecutiveAssistant"
 def list_available_updates():
     up = APP_DIR / "updates"
-    if not up.exists(): return []
-    return [p.name for p in up.glob("*.tar.gz")]
+    # scandir entries carry the file type, so no stat per entry
+    try:
+        with os.scandir(up) as it:
+            return [e.name for e in it if e.name.endswith(".tar.gz") and e.is_file()]
+    except FileNotFoundError:
+        return []
 def list_backups():
     b = APP_DIR / "backups"
-    if not b.exists(): return []
-    return [p.name for p in b.iterdir() if p.is_dir()]
+    try:
+        with os.scandir(b) as it:
+            return [e.name for e in it if e.is_dir()]
+    except FileNotFoundError:
+        return []
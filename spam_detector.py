@@ -2,18 +2,50 @@
 AI-Powered Spam Detection using Ollama
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
+from server.spam_rules import sender_verdict
+
 logger = logging.getLogger("spam_detector")
 
+# Requests in flight at once; Ollama only runs them in parallel with OLLAMA_NUM_PARALLEL > 1
+MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+
+# Identical for every email and sent first, so Ollama's prompt cache reuses it
+SPAM_PROMPT_PREFIX = """Categorize the email at the end as spam, keep, or unsure.
+Categories: spam=promo/newsletters/marketing; keep=personal/financial/receipts; unsure=can't tell
+
+Reply ONLY with JSON in this format:
+{"category": "spam"|"keep"|"unsure", "confidence": 0.0-1.0, "reason": "a few words"}
+"""
+# The JSON answer is ~40 tokens; a tight cap bounds the decode time per email
+SPAM_NUM_PREDICT = 48
+
 class SpamDetector:
     """Uses local Ollama LLM to categorize emails"""
     
     def __init__(self, ollama_url: str = "http://localhost:11434"):
         self.ollama_url = ollama_url
         self.model = "llama3.2:3b"
+        # Everything but the prompt is the same for every request
+        self._base_payload = {
+            "model": self.model,
+            "stream": False,
+            # Constrain decoding to a JSON object, no preamble tokens
+            "format": "json",
+            "options": {
+                "temperature": 0.0,
+                "num_predict": SPAM_NUM_PREDICT
+            }
+        }
+        # Keep-alive connections reused across emails; pool sized for batch_categorize's threads
+        self.session = requests.Session()
+        self.session.mount(ollama_url, HTTPAdapter(pool_connections=1, pool_maxsize=max(MAX_IN_FLIGHT, 1)))
     
     def categorize_email(self, from_addr: str, subject: str) -> Dict:
         """
@@ -21,41 +53,19 @@ class SpamDetector:
         Returns: {category: "spam"|"keep"|"unsure", confidence: float, reason: str}
         """
         
-        prompt = f"""Analyze this email and categorize it as spam, keep, or unsure.
-
+        # Bulk-marketing senders are decided without the LLM (rules shared with the server)
+        verdict = sender_verdict(from_addr)
+        if verdict:
+            return {"category": verdict[0], "confidence": 1.0, "reason": verdict[1]}
+        
+        prompt = SPAM_PROMPT_PREFIX + f"""
 From: {from_addr}
-Subject: {subject}
-
-Reply ONLY with JSON in this format:
-{{"category": "spam"|"keep"|"unsure", "confidence": 0.0-1.0, "reason": "brief explanation"}}
-
-Spam indicators:
-- Unknown/suspicious sender domains
-- Marketing/promotional language
-- Offers, deals, discounts
-- "Act now", "Limited time"
-- Generic greetings
-
-Keep indicators:
-- Personal correspondence
-- Known contacts
-- Important services (banks, utilities)
-- Purchase confirmations
-
-Be cautious - when uncertain, mark as "unsure"."""
+Subject: {subject}"""
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 100
-                    }
-                },
+                json={**self._base_payload, "prompt": prompt},
                 timeout=30
             )
             
@@ -63,14 +73,17 @@ Be cautious - when uncertain, mark as "unsure"."""
                 result = response.json()
                 text = result.get("response", "").strip()
                 
-                # Extract JSON from response
-                json_start = text.find("{")
-                json_end = text.rfind("}") + 1
+                try:
+                    category_data = json.loads(text)
+                except ValueError:
+                    # Server/model that ignored "format": pull the JSON out of the text
+                    json_start = text.find("{")
+                    json_end = text.rfind("}") + 1
+                    category_data = None
+                    if json_start >= 0 and json_end > json_start:
+                        category_data = json.loads(text[json_start:json_end])
                 
-                if json_start >= 0 and json_end > json_start:
-                    json_str = text[json_start:json_end]
-                    category_data = json.loads(json_str)
-                    
+                if isinstance(category_data, dict):
                     return {
                         "category": category_data.get("category", "unsure").lower(),
                         "confidence": float(category_data.get("confidence", 0.5)),
@@ -92,18 +105,20 @@ Be cautious - when uncertain, mark as "unsure"."""
             }
     
     def batch_categorize(self, emails: List[Dict]) -> List[Dict]:
-        """Categorize multiple emails"""
-        results = []
+        """Categorize multiple emails (concurrently, results in input order)"""
+        if not emails:
+            return []
         
-        for email_item in emails:
+        def categorize(email_item: Dict) -> Dict:
             from_addr = email_item.get("from", "")
             subject = email_item.get("subject", "")
             
             category_info = self.categorize_email(from_addr, subject)
             
-            results.append({
+            return {
                 **email_item,
                 **category_info
-            })
+            }
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(MAX_IN_FLIGHT, len(emails))) as pool:
+            return list(pool.map(categorize, emails))